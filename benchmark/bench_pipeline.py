@@ -0,0 +1,351 @@
+"""偽 AquesTalk サーバーを使ったパイプラインのベンチマーク。
+
+VoiceGenerator / VoiceManager / LiveYukkuriRunner のそれぞれについて
+スループット・time-to-first-audio・文間ギャップを計測し、JSON で出力する。
+口パクイベントについては、合成後から /sound_events の送信文字列までの
+1 文あたりのメモリ確保を、以前の dict のイベントと SoundEvent で比べる。
+Linux CI でも aquestalk-server.exe なしで実行できる。
+
+使い方::
+
+    python benchmark/bench_pipeline.py --output bench_pipeline.json
+    python benchmark/bench_pipeline.py --compare bench_pipeline.json
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmark.fake_aquestalk_server import FakeAquesTalkServer
+from benchmark.simulated_audio_player import SimulatedAudioPlayer
+from source.speak.speak_job import SpeakJob
+from source.voice.speaker.aquestalk_generator import AquesTalkGenerator
+from source.voice.speaker.viseme_track import viseme_track
+from source.voice.speaker.voice_generator import VoiceGenerator
+from source.visualizer.visualize_manager import VisualizeManager
+from source.voice.voice_manager import VoiceManager
+
+from configuration.person_settings import (
+    VISEME_TRACK_ENABLED,
+)
+
+BENCH_TEXTS = [
+    "こんにちは。",
+    "今日もゆっくりしていってね！",
+    "この湖こんなに広かったかしら？　霧で見通しが悪くて困ったわ。もしかして私って方向音痴？",
+    "草",
+    "888",
+    "お賽銭箱はあっちよ。入れてくれたら嬉しいわ。",
+    "今日の配信はここまで。みんな、また明日ね！",
+    "かわいい",
+]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """件数・平均・分位点をまとめる。"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+
+    def _q(q: float) -> float:
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered),
+        'p50': _q(0.5),
+        'p95': _q(0.95),
+        'p99': _q(0.99),
+        'max': ordered[-1],
+    }
+
+
+def _gaps_by_job(records: list[tuple[str | None, float, float]]
+                 ) -> list[float]:
+    """同じジョブ内で、前の文の再生終了から次の文の再生開始までの間隔。"""
+    gaps: list[float] = []
+    last_end: dict[str | None, float] = {}
+    for job_id, start, end in records:
+        if job_id in last_end:
+            gaps.append(start - last_end[job_id])
+        last_end[job_id] = end
+    return gaps
+
+
+def bench_voice_generator(url: str, texts: list[str]) -> dict:
+    generator = VoiceGenerator(AquesTalkGenerator(url, launch_server=False))
+    first_chunk: list[float] = []
+    chars = 0
+    sentences = 0
+    started = time.monotonic()
+    for text in texts:
+        t0 = time.monotonic()
+        for i, _ in enumerate(generator.generate_sequential(text)):
+            if i == 0:
+                first_chunk.append(time.monotonic() - t0)
+            sentences += 1
+        chars += len(text)
+    elapsed = time.monotonic() - started
+    return {
+        'elapsed_seconds': elapsed,
+        'sentences_per_second': sentences / elapsed,
+        'chars_per_second': chars / elapsed,
+        'time_to_first_chunk_seconds': summarize(first_chunk),
+    }
+
+
+def bench_voice_manager(url: str, texts: list[str], speedup: float) -> dict:
+    player = SimulatedAudioPlayer(speedup)
+    manager = VoiceManager(
+        VoiceGenerator(AquesTalkGenerator(url, launch_server=False)), player)
+    ttfa: list[float] = []
+    started = time.monotonic()
+    for text in texts:
+        job = SpeakJob(text)
+        manager.speak(text, job)
+        ttfa.append(job.marks['first_audio'] - job.enqueued_at)
+        while manager.dequeue_sound() is not None:
+            pass
+    elapsed = time.monotonic() - started
+    manager.close()
+    return {
+        'elapsed_seconds': elapsed,
+        'utterances_per_second': len(texts) / elapsed,
+        'time_to_first_audio_seconds': summarize(ttfa),
+        'inter_sentence_gap_seconds': summarize(_gaps_by_job(player.records)),
+    }
+
+
+def bench_runner(url: str, texts: list[str], speedup: float) -> dict:
+    from source.live_yukkuri_runner import LiveYukkuriRunner
+
+    player = SimulatedAudioPlayer(speedup)
+    manager = VoiceManager(
+        VoiceGenerator(AquesTalkGenerator(url, launch_server=False)), player)
+    runner = LiveYukkuriRunner(voice_manager=manager)
+    runner.start_workers()
+    client = runner.outbound_app.test_client()
+
+    posted_at: dict[str, float] = {}
+    started = time.monotonic()
+    for text in texts:
+        t0 = time.monotonic()
+        response = client.post('/speak', json={'text': text})
+        posted_at[response.get_json()['job_id']] = t0
+    runner.join_speak_queue()
+    elapsed = time.monotonic() - started
+    manager.close()
+
+    first_start: dict[str, float] = {}
+    for job_id, start, _ in player.records:
+        if job_id is not None:
+            first_start.setdefault(job_id, start)
+    ttfa = [first_start[j] - t for j, t in posted_at.items()
+            if j in first_start]
+    ordered = sorted(player.records, key=lambda r: r[1])
+    # ジョブをまたぐ無音区間（前の発話の終了から次の発話の開始まで）
+    utterance_gaps = [b[1] - a[2] for a, b in zip(ordered, ordered[1:])
+                      if a[0] != b[0]]
+    return {
+        'elapsed_seconds': elapsed,
+        'utterances_per_second': len(texts) / elapsed,
+        'time_to_first_audio_seconds': summarize(ttfa),
+        'inter_sentence_gap_seconds': summarize(_gaps_by_job(player.records)),
+        'inter_utterance_gap_seconds': summarize(utterance_gaps),
+    }
+
+
+def _legacy_sound_events(analyzed: list[tuple], visualizer: VisualizeManager
+                         ) -> None:
+    """以前の口パクイベントの流れを再現する。
+
+    音量値を list で持つ dict を作り、forwarder で内部キーを除いたコピーを
+    作ってから各クライアントのキューへ入れる。
+    """
+    for values, sample_time in analyzed:
+        sound_values = values.tolist()
+        data: dict = {'sample_time': sample_time, 'job_id': None,
+                      'sound_values': sound_values}
+        if VISEME_TRACK_ENABLED:
+            data['mouth_levels'] = viseme_track(sound_values, sample_time)
+        data['enqueued_at'] = time.monotonic()
+        visualizer.enqueue_visualizer_sound(
+            {k: v for k, v in data.items() if k != 'enqueued_at'})
+
+
+def _sound_events(analyzed: list[tuple], visualizer: VisualizeManager,
+                  manager: VoiceManager) -> None:
+    """SoundEvent を VoiceManager のキューからクライアントのキューへ渡す。"""
+    for values, sample_time in analyzed:
+        manager.enqueue_sound(values, sample_time)
+        # LiveYukkuriRunner の forwarder と同じく、コピーせずに渡す
+        visualizer.enqueue_visualizer_sound(manager.dequeue_sound())
+
+
+def _legacy_sse_message(data: dict) -> str:
+    """以前の /sound_events と同じく、クライアントごとに JSON にする。"""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f'data: {payload}\n\n'
+
+
+def _measure_sound_events(fan_out, serialize, visualizer: VisualizeManager,
+                          clients: int, sentences: int) -> dict:
+    queues = [visualizer.subscribe_visualizer_sound()
+              for _ in range(clients)]
+    messages: list[str] = []
+    delivered: list = []
+    tracemalloc.start()
+    try:
+        base = tracemalloc.take_snapshot()
+        base_bytes = tracemalloc.get_traced_memory()[0]
+        fan_out()
+        queued = tracemalloc.take_snapshot()
+        queued_bytes = tracemalloc.get_traced_memory()[0] - base_bytes
+        # 送信待ちのメッセージとして各クライアントの分を保持する
+        # （取り出したイベントも保持し、メッセージの分だけを数える）
+        for sound_queue in queues:
+            while (data := visualizer.wait_and_dequeue_visualizer_sound(
+                    0.0, sound_queue)) is not None:
+                delivered.append(data)
+                messages.append(serialize(data))
+        sent_bytes = (tracemalloc.get_traced_memory()[0] - base_bytes
+                      - queued_bytes)
+    finally:
+        tracemalloc.stop()
+        for sound_queue in queues:
+            visualizer.unsubscribe_visualizer_sound(sound_queue)
+    blocks = sum(stat.count_diff
+                 for stat in queued.compare_to(base, 'filename'))
+    return {
+        'queued_blocks_per_sentence': blocks / sentences,
+        'queued_bytes_per_sentence': queued_bytes / sentences,
+        'message_bytes_per_sentence': sent_bytes / sentences,
+    }
+
+
+def bench_sound_events(url: str, texts: list[str], clients: int) -> dict:
+    """口パクイベントを *clients* 個の visualizer クライアントへ配るときの
+    1 文あたりのメモリ確保。合成・解析は計測の前に済ませる。"""
+    generator = VoiceGenerator(AquesTalkGenerator(url, launch_server=False))
+    analyzed = [(values, sample_time) for text in texts
+                for _, values, sample_time
+                in generator.generate_sequential(text)]
+    manager = VoiceManager(generator, SimulatedAudioPlayer())
+    visualizer = VisualizeManager(str(Path(__file__).resolve().parents[1]))
+    try:
+        legacy = _measure_sound_events(
+            lambda: _legacy_sound_events(analyzed, visualizer),
+            _legacy_sse_message, visualizer, clients, len(analyzed))
+        current = _measure_sound_events(
+            lambda: _sound_events(analyzed, visualizer, manager),
+            visualizer.sse_message, visualizer, clients, len(analyzed))
+    finally:
+        manager.close()
+    return {
+        'clients': clients,
+        'sentences': len(analyzed),
+        'legacy_dict': legacy,
+        'sound_event': current,
+        'saved': {key: legacy[key] - current[key] for key in legacy},
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=Path(__file__).resolve().parents[1],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _flatten(data: dict, prefix: str = '') -> dict[str, float]:
+    flat: dict[str, float] = {}
+    for key, value in data.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + '.'))
+        elif isinstance(value, (int, float)):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """2 つの結果の数値項目を並べて差分（%）を表示する。"""
+    old = _flatten(baseline.get('results', {}))
+    new = _flatten(current.get('results', {}))
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name], new[name]
+        delta = (after - before) / before * 100 if before else 0.0
+        print(f'{name:70s} {before:12.4f} -> {after:12.4f} ({delta:+.1f}%)')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='テキスト集合を繰り返す回数')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--latency-per-char', type=float, default=0.002)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--seconds-per-char', type=float, default=0.12)
+    parser.add_argument('--playback-speedup', type=float, default=10.0,
+                        help='再生待機を何倍速で模擬するか')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--visualizer-clients', type=int, default=2,
+                        help='口パクイベントを受け取るクライアント数')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='結果 JSON の出力先（省略時は標準出力）')
+    parser.add_argument('--compare', type=Path, default=None,
+                        help='比較対象の結果 JSON')
+    args = parser.parse_args()
+
+    texts = BENCH_TEXTS * args.repeat
+    config = {k: v for k, v in vars(args).items()
+              if k not in ('output', 'compare')}
+    with FakeAquesTalkServer(latency=args.latency,
+                             latency_per_char=args.latency_per_char,
+                             jitter=args.jitter,
+                             seconds_per_char=args.seconds_per_char,
+                             seed=args.seed) as server:
+        results = {
+            'voice_generator': bench_voice_generator(server.url, texts),
+            'voice_manager': bench_voice_manager(
+                server.url, texts, args.playback_speedup),
+            'runner': bench_runner(server.url, texts, args.playback_speedup),
+            'sound_events': bench_sound_events(
+                server.url, texts, args.visualizer_clients),
+        }
+
+    report = {
+        'benchmark': 'pipeline',
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'results': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output is not None:
+        args.output.write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text(encoding='utf-8')), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""無音除去のベンチマーク。
+
+文ごとの WAV の前後の無音を切り詰めたときに、発話全体の長さと
+最初の音が出るまでの時間（time-to-first-sound）がどれだけ短くなるか、
+および切り詰め処理そのものの所要時間を計測して JSON で出力する。
+
+既定では偽 AquesTalk サーバーと同じ方法で無音付きの WAV を生成する。
+``--wav-dir`` を指定すると、実際の aquestalk-server で保存した WAV を使う。
+
+使い方::
+
+    python benchmark/bench_silence_trim.py --leading-silence 0.15 --trailing-silence 0.3
+    python benchmark/bench_silence_trim.py --wav-dir recorded_wavs
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import json
+import platform
+import time
+from datetime import datetime, timezone
+
+from benchmark.bench_pipeline import BENCH_TEXTS, _git_commit, summarize
+from benchmark.fake_aquestalk_server import generate_speech_wav
+from benchmark.simulated_audio_player import wav_duration
+from source.voice.speaker.silence_trimmer import speech_bounds, trim_silence
+from source.voice.speaker.voice_generator import VoiceGenerator
+
+from configuration.person_settings import (
+    SILENCE_TRIM_MARGIN,
+    SILENCE_TRIM_THRESHOLD,
+    VOICE_SPEED,
+)
+
+
+def _first_sound_offset(audio: bytes, threshold: float) -> float:
+    """再生開始から最初の有音フレームまでの秒数。"""
+    duration = wav_duration(audio)
+    bounds = speech_bounds(audio, threshold)
+    if bounds is None:
+        return duration
+    first, _, n_frames = bounds
+    return duration * first / n_frames
+
+
+def bench_utterances(utterances: list[list[bytes]], threshold: float,
+                     margin: float) -> dict:
+    """発話（文ごとの WAV のリスト）ごとに切り詰め前後の長さを比較する。"""
+    before_totals: list[float] = []
+    after_totals: list[float] = []
+    before_first: list[float] = []
+    after_first: list[float] = []
+    trim_times: list[float] = []
+    for sentences in utterances:
+        trimmed = []
+        for audio in sentences:
+            started = time.perf_counter()
+            trimmed.append(trim_silence(audio, threshold, margin))
+            trim_times.append(time.perf_counter() - started)
+        before_totals.append(sum(wav_duration(a) for a in sentences))
+        after_totals.append(sum(wav_duration(a) for a in trimmed))
+        before_first.append(_first_sound_offset(sentences[0], threshold))
+        after_first.append(_first_sound_offset(trimmed[0], threshold))
+
+    return {
+        'utterances': len(utterances),
+        'sentences': len(trim_times),
+        'speech_seconds_before': summarize(before_totals),
+        'speech_seconds_after': summarize(after_totals),
+        'speech_seconds_saved_total': sum(before_totals) - sum(after_totals),
+        'time_to_first_sound_before': summarize(before_first),
+        'time_to_first_sound_after': summarize(after_first),
+        'trim_seconds_per_sentence': summarize(trim_times),
+    }
+
+
+def _generated_utterances(args: argparse.Namespace) -> list[list[bytes]]:
+    return [
+        [generate_speech_wav(sentence, VOICE_SPEED,
+                             seconds_per_char=args.seconds_per_char,
+                             leading_silence=args.leading_silence,
+                             trailing_silence=args.trailing_silence)
+         for sentence in VoiceGenerator._split_sentences(text)]
+        for text in BENCH_TEXTS
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--leading-silence', type=float, default=0.15)
+    parser.add_argument('--trailing-silence', type=float, default=0.3)
+    parser.add_argument('--seconds-per-char', type=float, default=0.12)
+    parser.add_argument('--threshold', type=float,
+                        default=SILENCE_TRIM_THRESHOLD)
+    parser.add_argument('--margin', type=float, default=SILENCE_TRIM_MARGIN)
+    parser.add_argument('--wav-dir', type=Path, default=None,
+                        help='実際の合成結果の WAV を置いたディレクトリ'
+                             '（1 ファイル = 1 発話として扱う）')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='結果 JSON の出力先（省略時は標準出力）')
+    args = parser.parse_args()
+
+    if args.wav_dir is not None:
+        utterances = [[path.read_bytes()]
+                      for path in sorted(args.wav_dir.glob('*.wav'))]
+    else:
+        utterances = _generated_utterances(args)
+
+    report = {
+        'benchmark': 'silence_trim',
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {k: (str(v) if isinstance(v, Path) else v)
+                   for k, v in vars(args).items() if k != 'output'},
+        'results': bench_utterances(utterances, args.threshold, args.margin),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output is not None:
+        args.output.write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""起動時間のベンチマーク。
+
+偽 AquesTalk サーバーを別プロセスで起動（exe の起動時間とコールドスタートを模擬）し、
+LiveYukkuriRunner の生成から /ready が ready になるまでの時間と、
+ready 直後の最初の合成時間を計測して JSON で出力する。
+
+使い方::
+
+    python benchmark/bench_startup.py --startup-delay 1.5 --first-request-latency 0.8
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import json
+import platform
+import socket
+import subprocess
+import time
+from datetime import datetime, timezone
+
+FAKE_SERVER = Path(__file__).resolve().parent / 'fake_aquestalk_server.py'
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def bench_startup(startup_delay: float, first_request_latency: float) -> dict:
+    t0 = time.monotonic()
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, str(FAKE_SERVER), '--port', str(port),
+         '--startup-delay', str(startup_delay),
+         '--first-request-latency', str(first_request_latency)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        # 重い import も起動時間に含める
+        from source.live_yukkuri_runner import LiveYukkuriRunner
+        from source.voice.speaker.aquestalk_generator import AquesTalkGenerator
+        from source.voice.speaker.audio_player import AudioPlayer
+        from source.voice.speaker.voice_generator import VoiceGenerator
+        from source.voice.voice_manager import VoiceManager
+        imported = time.monotonic()
+
+        generator = AquesTalkGenerator(f'http://127.0.0.1:{port}',
+                                       launch_server=False)
+        runner = LiveYukkuriRunner(voice_manager=VoiceManager(
+            VoiceGenerator(generator), AudioPlayer()))
+        constructed = time.monotonic()
+
+        runner.start_subsystems()
+        ready = runner.wait_until_ready(timeout=30.0)
+        ready_at = time.monotonic()
+
+        generator.generate_audio('こんにちは')
+        first_synthesis = time.monotonic() - ready_at
+
+        snapshot = runner.readiness()
+        durations = {name: info.get('duration')
+                     for name, info in snapshot['subsystems'].items()}
+        return {
+            'ready': ready,
+            'import_seconds': imported - t0,
+            'construct_seconds': constructed - imported,
+            'time_to_ready_seconds': ready_at - t0,
+            'subsystem_seconds': durations,
+            # 各サブシステムを順番に起動した場合の所要時間の目安
+            'sequential_estimate_seconds': (constructed - t0) + sum(
+                d for d in durations.values() if d is not None),
+            'first_synthesis_after_ready_seconds': first_synthesis,
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--startup-delay', type=float, default=1.0)
+    parser.add_argument('--first-request-latency', type=float, default=0.5)
+    parser.add_argument('--output', type=Path, default=None)
+    args = parser.parse_args()
+
+    results = bench_startup(args.startup_delay, args.first_request_latency)
+    from benchmark.bench_pipeline import _git_commit
+
+    report = {
+        'benchmark': 'startup',
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'startup_delay': args.startup_delay,
+                   'first_request_latency': args.first_request_latency},
+        'results': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output is not None:
+        args.output.write_text(text + '\n', encoding='utf-8')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
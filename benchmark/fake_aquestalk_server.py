@@ -0,0 +1,216 @@
+"""aquestalk-server の代わりに使うローカルの偽 TTS サーバー。
+
+OpenAI 互換の ``POST /v1/audio/speech`` を実装し、入力文字数に比例した長さの
+WAV を返す。応答遅延・1 文字あたりの音声長・ジッタを指定できるため、
+Windows / aquestalk-server.exe なしでパイプラインのベンチマークやテストができる。
+
+単体で起動する場合::
+
+    python benchmark/fake_aquestalk_server.py --port 8080 --latency 0.1
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import io
+import math
+import random
+import threading
+import time
+import wave
+from array import array
+
+from flask import Flask, Response, request
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+DEFAULT_SAMPLE_RATE = 8000
+DEFAULT_SECONDS_PER_CHAR = 0.12
+# 1 文字（1 音節）内の母音部分の割合。残りは子音相当の小さな音量にする
+VOWEL_RATIO = 0.7
+TONE_FREQUENCY = 220.0
+AMPLITUDE = 12000
+
+
+def generate_speech_wav(text: str,
+                        speed: float = 1.0,
+                        seconds_per_char: float = DEFAULT_SECONDS_PER_CHAR,
+                        sample_rate: int = DEFAULT_SAMPLE_RATE,
+                        leading_silence: float = 0.0,
+                        trailing_silence: float = 0.0) -> bytes:
+    """文字ごとに振幅の山を持つ 16bit モノラル WAV を生成する。
+
+    句読点は無音として扱う。*speed* が大きいほど音声は短くなる。
+    """
+    syllable_frames = max(1, int(seconds_per_char / max(speed, 0.01)
+                                 * sample_rate))
+    samples = array('h', bytes(2 * int(leading_silence * sample_rate)))
+    step = 2.0 * math.pi * TONE_FREQUENCY / sample_rate
+    phase = 0
+    for index, char in enumerate(text):
+        if char in '。、？！!?,. 　':
+            samples.extend(array('h', bytes(2 * syllable_frames)))
+            continue
+        # 文字ごとに音量を変え、口パクの段階が変化するようにする
+        peak = AMPLITUDE * (0.5 + 0.5 * ((index * 7919) % 11) / 10)
+        vowel_frames = int(syllable_frames * VOWEL_RATIO)
+        for i in range(syllable_frames):
+            envelope = 1.0 if i < vowel_frames else 0.1
+            samples.append(int(peak * envelope * math.sin(phase * step)))
+            phase += 1
+    samples.extend(array('h', bytes(2 * int(trailing_silence * sample_rate))))
+    if sys.byteorder != 'little':
+        samples.byteswap()
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs) -> None:
+        pass
+
+
+class FakeAquesTalkServer:
+    """スレッドで動作する偽 AquesTalk サーバー。
+
+    Args:
+        port: 0 の場合は空きポートを自動で選ぶ
+        latency: 応答までの固定遅延（秒）
+        latency_per_char: 入力 1 文字あたりの追加遅延（秒）
+        jitter: 0〜jitter 秒の一様乱数遅延を加える
+        seconds_per_char: speed=1.0 のときの 1 文字あたりの音声長（秒）
+        leading_silence / trailing_silence: 前後に付ける無音（秒）
+        first_request_latency: 最初のリクエストだけに加える遅延（コールドスタートの模擬）
+    """
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 latency: float = 0.0,
+                 latency_per_char: float = 0.0,
+                 jitter: float = 0.0,
+                 seconds_per_char: float = DEFAULT_SECONDS_PER_CHAR,
+                 sample_rate: int = DEFAULT_SAMPLE_RATE,
+                 leading_silence: float = 0.0,
+                 trailing_silence: float = 0.0,
+                 first_request_latency: float = 0.0,
+                 seed: int | None = None) -> None:
+        self.latency = latency
+        self.latency_per_char = latency_per_char
+        self.jitter = jitter
+        self.seconds_per_char = seconds_per_char
+        self.sample_rate = sample_rate
+        self.leading_silence = leading_silence
+        self.trailing_silence = trailing_silence
+        self.first_request_latency = first_request_latency
+        self.request_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.app = Flask(__name__)
+        self._register_routes()
+        self._server = make_server(host, port, self.app, threaded=True,
+                                   request_handler=_QuietRequestHandler)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f'http://{self._server.host}:{self._server.port}'
+
+    def _register_routes(self) -> None:
+        app = self.app
+
+        @app.route('/', methods=['GET'])
+        def index():
+            return {'status': 'ok'}, 200
+
+        @app.route('/v1/audio/speech', methods=['POST'])
+        def speech():
+            data = request.get_json(force=True)
+            text = str(data.get('input', ''))
+            speed = float(data.get('speed') or 1.0)
+
+            with self._lock:
+                self.request_count += 1
+                extra = self._random.random() * self.jitter
+                if self.request_count == 1:
+                    extra += self.first_request_latency
+            delay = self.latency + self.latency_per_char * len(text) + extra
+            if delay > 0:
+                time.sleep(delay)
+
+            audio = generate_speech_wav(
+                text, speed, self.seconds_per_char, self.sample_rate,
+                self.leading_silence, self.trailing_silence)
+            return Response(audio, mimetype='audio/wav')
+
+    def start(self) -> FakeAquesTalkServer:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            daemon=True,
+            name='fake-aquestalk-server',
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> FakeAquesTalkServer:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--latency-per-char', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--seconds-per-char', type=float,
+                        default=DEFAULT_SECONDS_PER_CHAR)
+    parser.add_argument('--leading-silence', type=float, default=0.0)
+    parser.add_argument('--trailing-silence', type=float, default=0.0)
+    parser.add_argument('--first-request-latency', type=float, default=0.0)
+    parser.add_argument('--startup-delay', type=float, default=0.0,
+                        help='待ち受け開始までの遅延（exe の起動時間の模擬）')
+    args = parser.parse_args()
+
+    if args.startup_delay > 0:
+        time.sleep(args.startup_delay)
+
+    server = FakeAquesTalkServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        latency_per_char=args.latency_per_char,
+        jitter=args.jitter,
+        seconds_per_char=args.seconds_per_char,
+        leading_silence=args.leading_silence,
+        trailing_silence=args.trailing_silence,
+        first_request_latency=args.first_request_latency,
+    )
+    print(f'fake aquestalk-server: {server.url}', flush=True)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""/speak に負荷を掛け、エンドツーエンドのレイテンシを計測する CLI。
+
+起動中の run.py に対して一定間隔・バースト・ログ再生のいずれかのパターンで
+テキストを送り、/sound_events で口パクイベントを受信するまでの時間と
+/status のキュー長の推移を記録する。
+
+使い方::
+
+    python benchmark/load_generator.py --pattern constant --rate 2 --duration 30
+    python benchmark/load_generator.py --pattern bursty --burst-size 20 --burst-interval 5
+    python benchmark/load_generator.py --pattern replay --replay-file traffic.jsonl --replay-speed 4
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import itertools
+import json
+import threading
+import time
+
+import httpx
+
+from benchmark.bench_pipeline import BENCH_TEXTS, summarize
+from configuration.communication_settings import (
+    OUTBOUND_PORT,
+    VISUALIZER_PORT,
+)
+
+STATUS_POLL_INTERVAL = 0.5
+
+
+def constant_arrivals(rate: float, duration: float) -> list[float]:
+    """1/rate 秒ごとの到着時刻。"""
+    count = int(rate * duration)
+    return [i / rate for i in range(count)]
+
+
+def bursty_arrivals(burst_size: int, burst_interval: float,
+                    duration: float) -> list[float]:
+    """burst_interval 秒ごとに burst_size 件がまとめて到着する。"""
+    arrivals: list[float] = []
+    t = 0.0
+    while t < duration:
+        arrivals.extend([t] * burst_size)
+        t += burst_interval
+    return arrivals
+
+
+def load_replay_log(path: Path) -> list[tuple[float, str, str]]:
+    """JSON Lines のログを (t, op, text) のリストとして読み込む。
+
+    各行は ``{"t": 経過秒数, "op": "speak" | "stop", "text": ...}`` 形式。
+    ``op`` を省略した行は speak として扱う。
+    """
+    events: list[tuple[float, str, str]] = []
+    with path.open(encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            events.append((float(record['t']), record.get('op', 'speak'),
+                           record.get('text', '')))
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+def queue_growth_rate(samples: list[tuple[float, int]]) -> float:
+    """キュー長の時系列に最小二乗で直線を当てはめた傾き（件/秒）。"""
+    if len(samples) < 2:
+        return 0.0
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_d = sum(d for _, d in samples) / n
+    var = sum((t - mean_t) ** 2 for t, _ in samples)
+    if var == 0:
+        return 0.0
+    cov = sum((t - mean_t) * (d - mean_d) for t, d in samples)
+    return cov / var
+
+
+class LoadGenerator:
+    """/speak への送信、/sound_events の購読、/status のポーリングを行う。"""
+
+    def __init__(self, base_url: str, events_url: str) -> None:
+        self._base_url = base_url.rstrip('/')
+        self._events_url = events_url
+        self._client = httpx.Client(timeout=10.0)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        self.sent_at: dict[str, float] = {}
+        self.first_event_at: dict[str, float] = {}
+        self.ack_latencies: list[float] = []
+        self.rejected = 0
+        self.errors = 0
+        self.queue_samples: list[tuple[float, int]] = []
+        self._started = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # background threads
+    # ------------------------------------------------------------------
+
+    def _listen_events(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                with httpx.stream('GET', self._events_url,
+                                  timeout=httpx.Timeout(5.0, read=None)) as response:
+                    for line in response.iter_lines():
+                        if self._stop_event.is_set():
+                            return
+                        if not line.startswith('data: '):
+                            continue
+                        received = time.monotonic()
+                        try:
+                            data = json.loads(line[len('data: '):])
+                        except ValueError:
+                            continue
+                        if not isinstance(data, dict):
+                            continue
+                        # まとめて読み上げた場合は元ジョブの ID が job_ids に入る
+                        job_ids = data.get('job_ids') or [data.get('job_id')]
+                        with self._lock:
+                            for job_id in job_ids:
+                                if job_id is not None:
+                                    self.first_event_at.setdefault(
+                                        str(job_id), received)
+            except Exception as exc:
+                print(f'[load-generator] sound_events error: {exc}', flush=True)
+                self._stop_event.wait(1.0)
+
+    def _poll_status(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                response = self._client.get(f'{self._base_url}/status')
+                depth = int(response.json().get('queue_depth', 0))
+                with self._lock:
+                    self.queue_samples.append(
+                        (time.monotonic() - self._started, depth))
+            except Exception:
+                pass
+            self._stop_event.wait(STATUS_POLL_INTERVAL)
+
+    # ------------------------------------------------------------------
+    # sending
+    # ------------------------------------------------------------------
+
+    def _speak(self, text: str) -> None:
+        sent = time.monotonic()
+        try:
+            response = self._client.post(
+                f'{self._base_url}/speak', json={'text': text})
+        except Exception:
+            self.errors += 1
+            return
+        self.ack_latencies.append(time.monotonic() - sent)
+        if response.status_code != 200:
+            self.rejected += 1
+            return
+        job_id = response.json().get('job_id')
+        if job_id is not None:
+            with self._lock:
+                self.sent_at[str(job_id)] = sent
+
+    def _stop(self) -> None:
+        try:
+            self._client.post(f'{self._base_url}/voice_output_stop_flag',
+                              json={'voice_output_stop_flag': True})
+        except Exception:
+            self.errors += 1
+
+    def run(self, schedule: list[tuple[float, str, str]],
+            drain_timeout: float) -> dict:
+        """*schedule* の (t, op, text) に従って送信し、結果をまとめて返す。"""
+        listener = threading.Thread(
+            target=self._listen_events, daemon=True, name='load-sse')
+        poller = threading.Thread(
+            target=self._poll_status, daemon=True, name='load-status')
+        listener.start()
+        poller.start()
+        # SSE 接続が確立するまで少し待つ
+        time.sleep(0.5)
+
+        self._started = time.monotonic()
+        for t, op, text in schedule:
+            delay = self._started + t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if op == 'stop':
+                self._stop()
+            else:
+                self._speak(text)
+        send_elapsed = time.monotonic() - self._started
+
+        deadline = time.monotonic() + drain_timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                pending = set(self.sent_at) - set(self.first_event_at)
+            if not pending:
+                break
+            time.sleep(0.2)
+        total_elapsed = time.monotonic() - self._started
+        self._stop_event.set()
+
+        return self._report(len(schedule), send_elapsed, total_elapsed)
+
+    def _final_states(self, job_ids: list[str]) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for job_id in job_ids:
+            try:
+                response = self._client.get(
+                    f'{self._base_url}/speak_status/{job_id}')
+                state = response.json()['job']['state']
+            except Exception:
+                state = 'unknown'
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def _report(self, offered: int, send_elapsed: float,
+                total_elapsed: float) -> dict:
+        with self._lock:
+            latencies = [self.first_event_at[j] - t
+                         for j, t in self.sent_at.items()
+                         if j in self.first_event_at]
+            missing = [j for j in self.sent_at if j not in self.first_event_at]
+            samples = list(self.queue_samples)
+        return {
+            'offered': offered,
+            'accepted': len(self.sent_at),
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'offered_rate': offered / send_elapsed if send_elapsed else 0.0,
+            'completed_rate': len(latencies) / total_elapsed if total_elapsed else 0.0,
+            'end_to_end_latency_seconds': summarize(latencies),
+            'ack_latency_seconds': summarize(self.ack_latencies),
+            'queue_depth_max': max((d for _, d in samples), default=0),
+            'queue_growth_per_second': queue_growth_rate(samples),
+            'missing_mouth_events': len(missing),
+            'missing_job_states': self._final_states(missing),
+        }
+
+
+def build_schedule(args: argparse.Namespace) -> list[tuple[float, str, str]]:
+    if args.texts_file is not None:
+        texts = [line.strip() for line in
+                 args.texts_file.read_text(encoding='utf-8').splitlines()
+                 if line.strip()]
+    else:
+        texts = BENCH_TEXTS
+    text_cycle = itertools.cycle(texts)
+
+    if args.pattern == 'replay':
+        if args.replay_file is None:
+            raise SystemExit('--replay-file is required for --pattern replay')
+        return [(t / args.replay_speed, op, text)
+                for t, op, text in load_replay_log(args.replay_file)]
+    if args.pattern == 'bursty':
+        arrivals = bursty_arrivals(
+            args.burst_size, args.burst_interval, args.duration)
+    else:
+        arrivals = constant_arrivals(args.rate, args.duration)
+    return [(t, 'speak', next(text_cycle)) for t in arrivals]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url',
+                        default=f'http://127.0.0.1:{OUTBOUND_PORT}')
+    parser.add_argument('--events-url',
+                        default=f'http://127.0.0.1:{VISUALIZER_PORT}/sound_events')
+    parser.add_argument('--pattern', choices=('constant', 'bursty', 'replay'),
+                        default='constant')
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help='constant: 1 秒あたりの送信件数')
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help='constant / bursty: 送信を続ける秒数')
+    parser.add_argument('--burst-size', type=int, default=10)
+    parser.add_argument('--burst-interval', type=float, default=5.0)
+    parser.add_argument('--replay-file', type=Path, default=None)
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='replay: 何倍速で再生するか')
+    parser.add_argument('--texts-file', type=Path, default=None,
+                        help='1 行 1 テキストの送信テキスト一覧')
+    parser.add_argument('--drain-timeout', type=float, default=120.0,
+                        help='送信後、口パクイベントの到着を待つ最大秒数')
+    parser.add_argument('--output', type=Path, default=None)
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args.base_url, args.events_url)
+    report = generator.run(build_schedule(args), args.drain_timeout)
+    report['config'] = {k: str(v) if isinstance(v, Path) else v
+                        for k, v in vars(args).items() if k != 'output'}
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output is not None:
+        args.output.write_text(text + '\n', encoding='utf-8')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""記録した実配信のトラフィックをランナーに再生し、レイテンシを計測する CLI。
+
+``TRAFFIC_CAPTURE_DIRECTORY`` で記録した JSON Lines（/speak と停止要求の到着
+時刻）を、偽 AquesTalk サーバーと音を出さないプレイヤーを組み込んだ
+LiveYukkuriRunner へ同じ間隔で送り直す。aquestalk-server.exe なしで
+実行でき、合成の遅延とジッタは固定値なので、同じログ・同じ設定なら
+結果を比較できる。
+
+``--speed`` を指定すると到着間隔・再生時間・ttl を 1/speed に縮めて
+加速再生する（合成の遅延は縮めない）。比較は同じ speed の結果同士で行う。
+
+使い方::
+
+    python benchmark/replay_traffic.py traffic.jsonl --speed 4 --output replay.json
+    python benchmark/replay_traffic.py traffic.jsonl --speed 4 --compare replay.json
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import json
+import platform
+import threading
+import time
+from datetime import datetime, timezone
+
+from benchmark.bench_pipeline import _git_commit, compare, summarize
+from benchmark.fake_aquestalk_server import FakeAquesTalkServer
+from benchmark.load_generator import queue_growth_rate
+from benchmark.simulated_audio_player import SimulatedAudioPlayer
+from source.live_yukkuri_runner import LiveYukkuriRunner
+from source.voice.speaker.aquestalk_generator import AquesTalkGenerator
+from source.voice.speaker.voice_generator import VoiceGenerator
+from source.voice.voice_manager import VoiceManager
+
+STATUS_SAMPLE_INTERVAL = 0.1
+
+
+def load_trace(path: Path) -> list[dict]:
+    """記録を到着順の辞書のリストとして読み込む。``op`` の既定は speak。"""
+    records: list[dict] = []
+    with path.open(encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            record['t'] = float(record['t'])
+            record.setdefault('op', 'speak')
+            records.append(record)
+    records.sort(key=lambda r: r['t'])
+    return records
+
+
+class TrafficReplayer:
+    """記録を *runner* の outbound API へ送り、各ジョブの結果を集計する。"""
+
+    def __init__(self, runner: LiveYukkuriRunner, speed: float = 1.0) -> None:
+        self._runner = runner
+        self._speed = speed
+        self._client = runner.outbound_app.test_client()
+        self._stop_event = threading.Event()
+        self.job_ids: list[str] = []
+        self.send_lags: list[float] = []
+        self.queue_samples: list[tuple[float, int]] = []
+        self._started = time.monotonic()
+
+    def _sample_status(self) -> None:
+        client = self._runner.outbound_app.test_client()
+        while not self._stop_event.is_set():
+            depth = client.get('/status').get_json()['queue_depth']
+            self.queue_samples.append(
+                (time.monotonic() - self._started, depth))
+            self._stop_event.wait(STATUS_SAMPLE_INTERVAL)
+
+    def _send(self, record: dict) -> None:
+        if record['op'] == 'stop':
+            self._client.post('/voice_output_stop_flag',
+                              json={'voice_output_stop_flag': True})
+            return
+        payload: dict = {'text': record.get('text', '')}
+        if record.get('ttl') is not None:
+            payload['ttl'] = record['ttl'] / self._speed
+        response = self._client.post('/speak', json=payload)
+        if response.status_code == 200:
+            self.job_ids.append(response.get_json()['job_id'])
+
+    def run(self, trace: list[dict], drain_timeout: float) -> dict:
+        """*trace* を送り終え、すべてのジョブが終わるまで待って結果を返す。"""
+        sampler = threading.Thread(
+            target=self._sample_status, daemon=True, name='replay-status')
+        self._started = time.monotonic()
+        sampler.start()
+        for record in trace:
+            scheduled = self._started + record['t'] / self._speed
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.send_lags.append(max(0.0, time.monotonic() - scheduled))
+            self._send(record)
+        send_elapsed = time.monotonic() - self._started
+
+        drain = threading.Thread(
+            target=self._runner.join_speak_queue, daemon=True,
+            name='replay-drain')
+        drain.start()
+        drain.join(drain_timeout)
+        total_elapsed = time.monotonic() - self._started
+        self._stop_event.set()
+        sampler.join()
+        return self._report(len(trace), send_elapsed, total_elapsed,
+                            drained=not drain.is_alive())
+
+    def _report(self, offered: int, send_elapsed: float,
+                total_elapsed: float, drained: bool) -> dict:
+        states: dict[str, int] = {}
+        first_audio: list[float] = []
+        completion: list[float] = []
+        for job_id in self.job_ids:
+            response = self._client.get(f'/speak_status/{job_id}')
+            if response.status_code != 200:
+                states['unknown'] = states.get('unknown', 0) + 1
+                continue
+            job = response.get_json()['job']
+            states[job['state']] = states.get(job['state'], 0) + 1
+            # marks は受け付けからの経過秒数
+            if 'first_audio' in job['marks']:
+                first_audio.append(job['marks']['first_audio'])
+            if 'finished' in job['marks']:
+                completion.append(job['marks']['finished'])
+        samples = list(self.queue_samples)
+        return {
+            'offered': offered,
+            'accepted': len(self.job_ids),
+            'drained': drained,
+            'send_elapsed_seconds': send_elapsed,
+            'total_elapsed_seconds': total_elapsed,
+            'job_states': states,
+            'time_to_first_audio_seconds': summarize(first_audio),
+            'completion_seconds': summarize(completion),
+            'send_lag_seconds': summarize(self.send_lags),
+            'queue_depth_max': max((d for _, d in samples), default=0),
+            'queue_growth_per_second': queue_growth_rate(samples),
+        }
+
+
+def replay(trace: list[dict], server_url: str, speed: float,
+           drain_timeout: float) -> dict:
+    """偽サーバー *server_url* と模擬プレイヤーで組み立てたランナーへ再生する。"""
+    manager = VoiceManager(
+        VoiceGenerator(AquesTalkGenerator(server_url, launch_server=False)),
+        SimulatedAudioPlayer(speed))
+    runner = LiveYukkuriRunner(voice_manager=manager)
+    runner.start_workers()
+    try:
+        return TrafficReplayer(runner, speed).run(trace, drain_timeout)
+    finally:
+        manager.close()
+        runner.stop_workers()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('trace', type=Path, help='記録した JSON Lines')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='何倍速で再生するか')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--latency-per-char', type=float, default=0.002)
+    parser.add_argument('--seconds-per-char', type=float, default=0.12)
+    parser.add_argument('--drain-timeout', type=float, default=300.0,
+                        help='送信後、全ジョブの完了を待つ最大秒数')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='結果 JSON の出力先（省略時は標準出力）')
+    parser.add_argument('--compare', type=Path, default=None,
+                        help='比較対象の結果 JSON')
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace)
+    with FakeAquesTalkServer(latency=args.latency,
+                             latency_per_char=args.latency_per_char,
+                             jitter=0.0,
+                             seconds_per_char=args.seconds_per_char) as server:
+        results = replay(trace, server.url, args.speed, args.drain_timeout)
+
+    report = {
+        'benchmark': 'replay',
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {k: str(v) if isinstance(v, Path) else v
+                   for k, v in vars(args).items()
+                   if k not in ('output', 'compare')},
+        'results': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output is not None:
+        args.output.write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text(encoding='utf-8')), report)
+
+
+if __name__ == '__main__':
+    main()
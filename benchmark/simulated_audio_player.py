@@ -0,0 +1,58 @@
+"""AudioPlayer の代わりに使う、実際には音を出さないプレイヤー。"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import io
+import threading
+import time
+import wave
+
+from source.speak.speak_job import SpeakJob
+
+
+def wav_duration(audio_bytes: bytes) -> float:
+    with wave.open(io.BytesIO(audio_bytes), 'rb') as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+class SimulatedAudioPlayer:
+    """WAV の再生時間ぶん待機し、再生区間を記録する。
+
+    Args:
+        speedup: 待機時間を 1/speedup に縮める（ベンチマーク短縮用）
+    """
+
+    def __init__(self, speedup: float = 1.0) -> None:
+        self._speedup = speedup
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        # (job_id, start, end) の再生区間（time.monotonic 基準）
+        self.records: list[tuple[str | None, float, float]] = []
+
+    def wait_until_ready(self) -> None:
+        pass
+
+    def play(self, audio_bytes: bytes, job: SpeakJob | None = None) -> bool:
+        duration = wav_duration(audio_bytes) / self._speedup
+        self._stop_event.clear()
+        start = time.monotonic()
+        if job is not None:
+            job.marks.setdefault('first_audio', start)
+        stopped = self._stop_event.wait(duration)
+        end = time.monotonic()
+        with self._lock:
+            self.records.append(
+                (job.job_id if job is not None else None, start, end))
+        return not stopped
+
+    def stop(self) -> bool:
+        self._stop_event.set()
+        return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records.clear()
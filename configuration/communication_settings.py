@@ -7,5 +7,49 @@ SPEAK_URL = f"http://127.0.0.1:{OUTBOUND_PORT}/speak"
 # Visualizer server
 VISUALIZER_PORT = 50201
 
+# Room router (python run.py --router): listens on OUTBOUND_PORT and sends
+# each /speak to one of ROUTER_WORKERS runner processes chosen by its "room"
+ROUTER_WORKERS = 2
+ROUTER_DEFAULT_ROOM = "default"  # room of requests that do not name one
+ROUTER_REQUEST_TIMEOUT = 5.0  # seconds, per request forwarded to a worker
+# a worker that keeps exiting is restarted at most once per backoff, which
+# doubles up to MAX and returns to INITIAL once the worker answers again
+ROUTER_RESTART_BACKOFF_INITIAL = 0.5  # seconds
+ROUTER_RESTART_BACKOFF_MAX = 30.0  # seconds
+
 # Audio player
 AUDIO_PLAYER_PORT = 50202
+
+# Admin endpoints (/admin/...) accept requests only from localhost
+# unless this is True
+ADMIN_ALLOW_REMOTE = False
+
+# Reload configuration/person_settings.py when it changes, checking every
+# this many seconds (None: reload only via POST /admin/settings/reload)
+PERSON_SETTINGS_WATCH_INTERVAL: float | None = None
+
+# Where synthesized audio is played
+#   "host":    play on this PC through the audio player server (winsound)
+#   "browser": send the audio with each mouth event and play it in the
+#              visualizer page with Web Audio (no host player process)
+AUDIO_OUTPUT_MODE = "host"
+
+# Record every /speak and stop request with its arrival time to a JSON Lines
+# file in this directory (one file per run) for replay with
+# benchmark/replay_traffic.py (None: do not record)
+TRAFFIC_CAPTURE_DIRECTORY: str | None = None
+
+# Journal accepted /speak texts to this file (relative to the repository) so
+# that texts not yet spoken are read after a crash or restart (None: off)
+SPEAK_JOURNAL_PATH: str | None = None
+# Rewrite the journal without finished texts after this many have finished
+SPEAK_JOURNAL_COMPACT_THRESHOLD = 1000
+
+# How the audio player server plays audio
+#   "winsound": one WAV at a time in a child process (Windows only)
+#   "mixer":    mix any number of overlapping sounds with per-sound gain
+#               into one output stream (requires the sounddevice package)
+AUDIO_PLAYER_BACKEND = "winsound"
+AUDIO_MIXER_SAMPLE_RATE = 48000
+AUDIO_MIXER_CHANNELS = 2
+AUDIO_MIXER_BLOCK_FRAMES = 1024  # frames mixed per block (~21 ms at 48 kHz)
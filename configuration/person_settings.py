@@ -13,8 +13,83 @@ MOUSE_DELAY_TIME = 0.5
 VOICE_SPEED = 1.2
 SAMPLE_INTERVAL = 0.1  # seconds
 VOICE_SCALE_FACTOR = 1.5
+# Trim the silence AquesTalk pads around each sentence
+SILENCE_TRIM_ENABLED = True
+SILENCE_TRIM_THRESHOLD = 0.02  # fraction of full scale regarded as silence
+SILENCE_TRIM_MARGIN = 0.03  # seconds of silence kept before / after speech
+# Mouth shapes: smooth the volume, quantize it to the 6 mouth images with
+# hysteresis and send the level changes as mouth_levels alongside sound_values
+VISEME_TRACK_ENABLED = True
+VISEME_ATTACK_TIME = 0.02  # seconds for the mouth to follow a louder sample
+VISEME_RELEASE_TIME = 0.08  # seconds for the mouth to follow a quieter one
+VISEME_HYSTERESIS = 0.3  # fraction of a level to overshoot before switching
+# Filler: when the first sentence of a text is still being synthesized this
+# many seconds after the voice went silent, play one of these pre-rendered
+# lines (with mouth movement) first
+FILLER_ENABLED = False
+FILLER_DELAY = 0.7  # seconds (0 or less disables the filler)
+FILLER_TEXTS = ["えーっと"]
 SERVER_EXE = Path(__file__).resolve().parents[1] / "aquestalk-server.exe"
 AQUESTALK_URL = "http://localhost:8080"
+AQUESTALK_SERVER_ARGS: list[str] = []
+
+# aquestalk-server supervisor
+# seconds per synthesis request (None: the openai client's default, 600 s).
+# Long texts can take a while to synthesize; keep this well above that.
+AQUESTALK_REQUEST_TIMEOUT: float | None = None
+# Give up on a sentence when no response (including the hedge and failover
+# retry) arrived within this many seconds (None: wait indefinitely)
+AQUESTALK_REQUEST_DEADLINE: float | None = None
+# Hedging: when a request takes longer than the HEDGE_QUANTILE of recent
+# requests, send it again to the warm standby (AQUESTALK_STANDBY_URL) and use
+# whichever answers first. Nothing is hedged without a healthy standby.
+AQUESTALK_HEDGE_ENABLED = False
+AQUESTALK_HEDGE_QUANTILE = 0.95
+AQUESTALK_HEDGE_MIN_DELAY = 0.1  # seconds
+AQUESTALK_HEDGE_INITIAL_DELAY = 1.0  # seconds, until MIN_SAMPLES requests
+AQUESTALK_HEDGE_MIN_SAMPLES = 20
+AQUESTALK_HEALTH_CHECK_INTERVAL = 1.0  # seconds
+AQUESTALK_HEALTH_FAILURE_THRESHOLD = 3  # consecutive failed probes = hung
+AQUESTALK_RESTART_BACKOFF_INITIAL = 0.2  # seconds
+AQUESTALK_RESTART_BACKOFF_MAX = 10.0  # seconds
+# warm standby: a second server process to switch to (None to disable).
+# Set the args to whatever makes aquestalk-server listen on this URL's port.
+AQUESTALK_STANDBY_URL: str | None = None
+AQUESTALK_STANDBY_SERVER_ARGS: list[str] = ["--port", "8081"]
+# args that make aquestalk-server listen on "{port}", e.g. ["--port", "{port}"]
+# if your aquestalk-server accepts that flag. python run.py --router starts
+# one server per runner with these and refuses to start while this is None,
+# so that runners never end up sharing one server on the default port.
+AQUESTALK_PORT_SERVER_ARGS: list[str] | None = None
+
+# Deadline for queued texts: a text still waiting in the queue this many
+# seconds after arriving is dropped (None to disable). Only the wait in the
+# queue counts; a text taken from the queue in time is always read in full.
+# /speak can override it per request with "ttl".
+SPEAK_TTL: float | None = None
+# initial guess of speaking time until real jobs have been measured
+SPEAK_ESTIMATE_SECONDS_PER_CHAR = 0.15
+SPEAK_ESTIMATE_OVERHEAD = 0.3  # seconds per utterance (synthesis, start-up)
+# Reject new texts with 429 when everything accepted so far plus the new
+# text is estimated to take longer than this many seconds (None: no limit)
+SPEAK_MAX_QUEUE_ETA: float | None = None
+# Speak faster while the queue is long (off by default: it changes the
+# character's voice under load): the speed rises from VOICE_SPEED at
+# BACKLOG_LOW seconds of estimated backlog (at VOICE_SPEED) to
+# VOICE_SPEED * MAX_RATIO at BACKLOG_HIGH, changing by at most STEP per text
+SPEAK_ADAPTIVE_SPEED_ENABLED = False
+SPEAK_ADAPTIVE_SPEED_BACKLOG_LOW = 10.0  # seconds
+SPEAK_ADAPTIVE_SPEED_BACKLOG_HIGH = 60.0  # seconds
+SPEAK_ADAPTIVE_SPEED_MAX_RATIO = 1.5
+SPEAK_ADAPTIVE_SPEED_STEP = 0.1
+
+# Merge bursts of short chat messages into one utterance
+SPEAK_COALESCE_ENABLED = False
+SPEAK_COALESCE_WINDOW = 0.3  # seconds after the first message to wait for more
+SPEAK_COALESCE_MAX_MESSAGE_LENGTH = 10  # longer messages are spoken on their own
+SPEAK_COALESCE_MAX_LENGTH = 40  # characters per merged utterance
+SPEAK_COALESCE_SEPARATOR = "、"  # between merged messages
+SPEAK_COALESCE_TERMINATOR = "。"  # appended to the merged utterance
 
 # text for speak replacer
 TEXT_FOR_SPEAK_REPLACEMENTS = {
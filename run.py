@@ -1,9 +1,70 @@
-from source.live_yukkuri_runner import LiveYukkuriRunner
+import argparse
+import atexit
+from pathlib import Path
+
+from source.live_yukkuri_runner import BASE_DIRECTORY, LiveYukkuriRunner
+
+
+def _worker_runner(args: argparse.Namespace) -> LiveYukkuriRunner:
+    """ルーターから起動されたワーカーとして、指定のポートで組み立てる。"""
+    from source.speak.speak_journal import SpeakJournal
+    from configuration.communication_settings import AUDIO_OUTPUT_MODE
+    from configuration.person_settings import AQUESTALK_PORT_SERVER_ARGS
+    from source.voice.speaker.aquestalk_generator import AquesTalkGenerator
+    from source.voice.speaker.audio_player import AudioPlayer
+    from source.voice.speaker.voice_generator import VoiceGenerator
+    from source.voice.voice_manager import VoiceManager
+
+    kwargs = {}
+    voice_generator = audio_player = None
+    if args.aquestalk_port is not None:
+        if AQUESTALK_PORT_SERVER_ARGS is None:
+            raise SystemExit('--aquestalk-port needs AQUESTALK_PORT_SERVER_ARGS'
+                             ' in configuration/person_settings.py')
+        port = str(args.aquestalk_port)
+        voice_generator = VoiceGenerator(AquesTalkGenerator(
+            f'http://localhost:{port}',
+            server_args=[arg.format(port=port)
+                         for arg in AQUESTALK_PORT_SERVER_ARGS]))
+    if args.audio_player_port is not None and AUDIO_OUTPUT_MODE != 'browser':
+        audio_player = AudioPlayer(args.audio_player_port)
+    if voice_generator is not None or audio_player is not None:
+        kwargs['voice_manager'] = VoiceManager(voice_generator, audio_player)
+    if args.outbound_port is not None:
+        kwargs['outbound_port'] = args.outbound_port
+    if args.visualizer_port is not None:
+        kwargs['visualizer_port'] = args.visualizer_port
+    if args.journal is not None:
+        journal = SpeakJournal(Path(BASE_DIRECTORY) / args.journal)
+        atexit.register(journal.close)
+        kwargs['speak_journal'] = journal
+    return LiveYukkuriRunner(**kwargs)
 
 
 def main() -> None:
-    runner = LiveYukkuriRunner()
-    runner.run()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--router', action='store_true',
+                        help='ルームごとに読み上げを振り分けるルーターとして起動する')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='ルーターが起動するランナーの数')
+    parser.add_argument('--outbound-port', type=int, default=None)
+    parser.add_argument('--visualizer-port', type=int, default=None)
+    parser.add_argument('--aquestalk-port', type=int, default=None)
+    parser.add_argument('--audio-player-port', type=int, default=None)
+    parser.add_argument('--journal', default=None,
+                        help='ジャーナルのパス（BASE_DIRECTORY からの相対）')
+    args = parser.parse_args()
+
+    if args.router:
+        from source.router.room_router import RoomRouter
+        kwargs = {} if args.workers is None else {'count': args.workers}
+        try:
+            router = RoomRouter.spawn_local(**kwargs)
+        except ValueError as exc:
+            parser.error(str(exc))
+        router.run()
+        return
+    _worker_runner(args).run()
 
 
 if __name__ == '__main__':
@@ -76,7 +76,7 @@ echo.
 :: Install libraries in the virtual environment
 set "VENV_PYTHON=%VENV_DIR%\Scripts\python.exe"
 "%VENV_PYTHON%" -m pip install --upgrade pip
-"%VENV_PYTHON%" -m pip install flask openai
+"%VENV_PYTHON%" -m pip install flask openai numpy sounddevice
 if errorlevel 1 (
     echo ERROR: Failed to install required libraries.
     pause
@@ -6,25 +6,73 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+import atexit
 import json
 import queue
+import socket
 import threading
-from flask import Flask, request, jsonify
+import time
+from collections import deque
+from flask import Flask, Response, request, jsonify
 
 from source.voice.voice_manager import VoiceManager
+from source.voice.speech_pipeline import Utterance
+from source.voice.sound_event import SoundEvent
 from source.visualizer.visualize_manager import VisualizeManager
+from source.monitoring.metrics import (
+    METRICS,
+    PROMETHEUS_CONTENT_TYPE,
+    SPEAK_JOBS_TOTAL,
+    STAGE_SECONDS,
+    TTS_HEDGE_WINS_TOTAL,
+    TTS_HEDGED_TOTAL,
+    TTS_REQUESTS_TOTAL,
+)
+from source.monitoring.memory_usage import current_rss_bytes, peak_rss_bytes
+from source.monitoring.profiler import SamplingProfiler, dump_thread_stacks
+from source.monitoring.readiness import ReadinessTracker
+from source.monitoring.traffic_recorder import TrafficRecorder
+from source.speak.deadline_scheduler import DeadlineScheduler
+from source.speak.job_registry import JobRegistry
+from source.speak.speak_coalescer import SpeakCoalescer
+from source.speak.speak_job import SpeakJob
+from source.speak.speak_journal import SpeakJournal
+from source.speak.speech_rate import SPEECH_RATE
+from source.settings.live_settings import LIVE_SETTINGS
 
 from configuration.communication_settings import (
+    ADMIN_ALLOW_REMOTE,
     HOST_NAME,
     OUTBOUND_PORT,
+    PERSON_SETTINGS_WATCH_INTERVAL,
+    SPEAK_JOURNAL_PATH,
+    TRAFFIC_CAPTURE_DIRECTORY,
+    VISUALIZER_PORT,
 )
 from configuration.person_settings import (
     MATERIAL_NAME,
-    MOUSE_DELAY_TIME
+    SPEAK_COALESCE_ENABLED,
+    SPEAK_TTL,
 )
 
 BASE_DIRECTORY = str(Path(__file__).resolve().parents[1])
 SOUND_QUEUE_CHECK_INTERVAL = 0.05
+PROFILE_DEFAULT_SECONDS = 10.0
+PROFILE_MAX_SECONDS = 60.0
+LOCAL_ADDRESSES = ('127.0.0.1', '::1', 'localhost')
+PORT_STARTUP_TIMEOUT = 10.0
+PORT_POLL_INTERVAL = 0.02
+
+
+def _wait_for_port(port: int, timeout: float = PORT_STARTUP_TIMEOUT) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(PORT_POLL_INTERVAL)
+    raise RuntimeError(f'port {port} did not open')
 
 
 class LiveYukkuriRunner:
@@ -39,31 +87,70 @@ class LiveYukkuriRunner:
 
     def __init__(self,
                  host: str = HOST_NAME,
-                 outbound_port: int = OUTBOUND_PORT) -> None:
+                 outbound_port: int = OUTBOUND_PORT,
+                 visualizer_port: int = VISUALIZER_PORT,
+                 voice_manager: VoiceManager | None = None,
+                 traffic_recorder: TrafficRecorder | None = None,
+                 deadline_scheduler: DeadlineScheduler | None = None,
+                 speak_journal: SpeakJournal | None = None) -> None:
         self._host = host
         self._outbound_port = outbound_port
 
+        # サブシステムの起動状態（/ready で公開）
+        self._readiness = ReadinessTracker()
+
         self._image_directory = os.path.join(
             BASE_DIRECTORY, 'material', MATERIAL_NAME)
 
         # コア機能
-        self._voice_manager = VoiceManager()
+        self._voice_manager = voice_manager or VoiceManager()
+
+        # 受け付けた /speak と停止要求の記録（再生による性能検証用）
+        if traffic_recorder is None and TRAFFIC_CAPTURE_DIRECTORY:
+            traffic_recorder = TrafficRecorder.in_directory(
+                Path(BASE_DIRECTORY) / TRAFFIC_CAPTURE_DIRECTORY)
+        self._traffic_recorder = traffic_recorder
+        # 受付・完了のジャーナル（異常終了後に未読のテキストを読み上げる）
+        if speak_journal is None and SPEAK_JOURNAL_PATH:
+            speak_journal = SpeakJournal(
+                Path(BASE_DIRECTORY) / SPEAK_JOURNAL_PATH)
+            atexit.register(speak_journal.close)
+        self._speak_journal = speak_journal
 
         # speak テキストキュー（非同期読み上げ用）
-        self._speak_text_queue: queue.Queue[str] = queue.Queue()
+        self._speak_text_queue: queue.Queue[SpeakJob] = queue.Queue()
         self._speak_worker_thread: threading.Thread | None = None
+        # /speak_status で参照する直近のジョブ
+        self._job_registry = JobRegistry()
+        # 期限までに読み始められないジョブを破棄する
+        self._deadline_scheduler = deadline_scheduler or DeadlineScheduler()
+        # 受付済みで未完了のジョブの推定読み上げ秒数（キューの完了見込み用）
+        self._backlog_estimates: dict[str, float] = {}
+        self._backlog_seconds = 0.0
+        # 音声パイプラインへ投入済みのジョブと、その元ジョブの推定秒数の合計
+        self._speaking_estimates: dict[SpeakJob, float] = {}
+        self._backlog_lock = threading.Lock()
+        # 短いメッセージをまとめる段（無効なら None）
+        self._coalescer = SpeakCoalescer() if SPEAK_COALESCE_ENABLED else None
+        # キューから取り出したが、まとめられずに次に回したジョブ
+        self._speak_carry: deque[SpeakJob | None] = deque()
+        self._speak_carry_lock = threading.Lock()
 
         # VoiceManager のキュー監視スレッド制御
         self._sound_forwarder_stop_event = threading.Event()
         self._sound_forwarder_thread: threading.Thread | None = None
         # Visualizer manager
         self.visualize_manager = VisualizeManager(
-            BASE_DIRECTORY)
+            BASE_DIRECTORY, visualizer_port)
 
         # Outbound Flask app
         self.outbound_app = Flask(__name__ + '_outbound')
 
+        self._profile_lock = threading.Lock()
+
         self._register_outbound_routes()
+        self._register_admin_routes()
+        self._register_metrics()
 
     # ------------------------------------------------------------------
     # Visualizer server routes
@@ -75,16 +162,20 @@ class LiveYukkuriRunner:
 
         def _speak_loop() -> None:
             while True:
-                text = self._speak_text_queue.get()
-                if text is None:
+                with self._speak_carry_lock:
+                    carried = bool(self._speak_carry)
+                    job = self._speak_carry.popleft() if carried else None
+                if not carried:
+                    job = self._speak_text_queue.get()
+                if job is None:
                     break
-                try:
-                    self.visualize_manager.set_voice_output_stop_flag(False)
-                    self._voice_manager.speak(text)
-                except Exception as exc:
-                    print(f'[speak-worker] Error: {exc}', flush=True)
-                finally:
-                    self._speak_text_queue.task_done()
+                jobs = [job]
+                if self._coalescer is not None:
+                    jobs, leftover = self._coalescer.collect(
+                        job, self._speak_text_queue)
+                    with self._speak_carry_lock:
+                        self._speak_carry.extend(leftover)
+                self._speak_jobs(jobs)
 
         self._speak_worker_thread = threading.Thread(
             target=_speak_loop,
@@ -93,6 +184,144 @@ class LiveYukkuriRunner:
         )
         self._speak_worker_thread.start()
 
+    def _speak_jobs(self, jobs: list[SpeakJob]) -> None:
+        """*jobs* を音声パイプラインへ投入する。複数ある場合はまとめて 1 つの発話にする。
+
+        前で読み上げ中の発話の残りの推定時間を足しても期限までに読み始め
+        られないジョブは破棄する。音声パイプラインでも前処理の開始時と
+        最初の文の再生直前に同じ判定を行う。再生の完了は待たないため、
+        前の発話の再生中に次の発話の合成が始まる。各ジョブの
+        ``task_done`` は読み上げの完了時に呼ぶ。
+        """
+        admitted = []
+        ahead = self._speaking_eta()
+        for job in jobs:
+            job.mark('dequeued')
+            STAGE_SECONDS.observe(
+                job.elapsed('enqueued', 'dequeued'), stage='queue_wait')
+            if self._deadline_scheduler.admit(job, ahead=ahead):
+                job.state = SpeakJob.SPEAKING
+                admitted.append(job)
+                # 取り出した時点の推定（校正・話速の変化を反映）に更新する
+                self._add_backlog(job)
+            else:
+                job.state = SpeakJob.EXPIRED
+                job.mark('finished')
+                SPEAK_JOBS_TOTAL.inc(state=job.state)
+                self._release_jobs([job])
+                self._speak_text_queue.task_done()
+        jobs = admitted
+        if not jobs:
+            return
+        speak_job = (self._coalescer.combine(jobs)
+                     if self._coalescer is not None else jobs[0])
+        if speak_job is not jobs[0]:
+            speak_job.mark('dequeued')
+        speak_job.state = SpeakJob.SPEAKING
+        with self._backlog_lock:
+            self._speaking_estimates[speak_job] = sum(
+                self._backlog_estimates.get(job.job_id, 0.0) for job in jobs)
+        # 読み上げ待ちが長いほど速く話す（この発話を含む残り時間で決める）
+        speak_job.speed = SPEECH_RATE.update(self.queue_eta())
+
+        def _admit(stage: str) -> bool:
+            # 再生の直前は前の発話を読み上げ終えている
+            ahead = (self._speaking_eta(before=speak_job)
+                     if stage == 'preprocess' else 0.0)
+            return self._deadline_scheduler.admit(speak_job, ahead=ahead)
+
+        try:
+            self.visualize_manager.set_voice_output_stop_flag(False)
+            utterance = self._voice_manager.speak_async(
+                speak_job.text, speak_job, admit=_admit)
+        except Exception as exc:
+            print(f'[speak-worker] Error: {exc}', flush=True)
+            self._finish_jobs(speak_job, jobs, SpeakJob.FAILED)
+            return
+
+        def _on_done(done: Utterance) -> None:
+            if done.error is not None:
+                print(f'[speak-worker] Error: {done.error}', flush=True)
+                state = SpeakJob.FAILED
+            elif done.expired:
+                state = SpeakJob.EXPIRED
+            elif done.cancelled:
+                state = SpeakJob.CANCELLED
+            else:
+                state = SpeakJob.DONE
+            self._finish_jobs(speak_job, jobs, state)
+
+        utterance.add_done_callback(_on_done)
+
+    def _finish_jobs(self, speak_job: SpeakJob, jobs: list[SpeakJob],
+                     state: str) -> None:
+        speak_job.state = state
+        speak_job.mark('finished')
+        for job in jobs:
+            # まとめて読み上げた場合は各段階の時刻と結果を元ジョブへ反映する
+            for stage, t in speak_job.marks.items():
+                job.marks.setdefault(stage, t)
+            job.speed = speak_job.speed
+            job.state = state
+            SPEAK_JOBS_TOTAL.inc(state=job.state)
+        self._deadline_scheduler.record_finished(speak_job, jobs)
+        with self._backlog_lock:
+            self._speaking_estimates.pop(speak_job, None)
+        self._release_jobs(jobs)
+        for _ in jobs:
+            self._speak_text_queue.task_done()
+
+    def _add_backlog(self, job: SpeakJob) -> None:
+        """*job* の推定読み上げ秒数をキューの完了見込みに加える（再推定も兼ねる）。"""
+        estimate = self._deadline_scheduler.estimator.estimate(job.text)
+        with self._backlog_lock:
+            previous = self._backlog_estimates.get(job.job_id, 0.0)
+            self._backlog_estimates[job.job_id] = estimate
+            self._backlog_seconds += estimate - previous
+
+    def _release_jobs(self, jobs: list[SpeakJob]) -> None:
+        """終わったジョブを完了見込みから外し、ジャーナルに完了を記録する。"""
+        if self._speak_journal is not None:
+            self._speak_journal.record_finished(jobs)
+        with self._backlog_lock:
+            for job in jobs:
+                self._backlog_seconds -= self._backlog_estimates.pop(
+                    job.job_id, 0.0)
+            if not self._backlog_estimates:
+                # 浮動小数点の誤差を持ち越さない
+                self._backlog_seconds = 0.0
+
+    def _speaking_eta(self, before: SpeakJob | None = None) -> float:
+        """音声パイプラインへ投入済みの発話を読み上げ終えるまでの推定秒数。
+
+        *before* を渡すと、それより前に投入した発話の分だけを数える。
+        """
+        now = time.monotonic()
+        eta = 0.0
+        with self._backlog_lock:
+            for speak_job, estimate in self._speaking_estimates.items():
+                if speak_job is before:
+                    break
+                started = speak_job.marks.get('first_audio')
+                if started is not None:
+                    estimate -= min(now - started, estimate)
+                eta += estimate
+        return eta
+
+    def queue_eta(self) -> float:
+        """受付済みのテキストをすべて読み上げ終えるまでの推定秒数。
+
+        再生中の発話は再生開始からの経過時間を差し引く。
+        """
+        now = time.monotonic()
+        with self._backlog_lock:
+            eta = self._backlog_seconds
+            for speak_job, estimate in self._speaking_estimates.items():
+                started = speak_job.marks.get('first_audio')
+                if started is not None:
+                    eta -= min(now - started, estimate)
+        return max(0.0, eta)
+
     def _start_sound_forwarder(self) -> None:
         if self._sound_forwarder_thread is not None:
             return
@@ -101,27 +330,20 @@ class LiveYukkuriRunner:
             while not self._sound_forwarder_stop_event.is_set():
                 data = self._voice_manager.dequeue_sound()
                 if data is not None:
-                    delay = MOUSE_DELAY_TIME
+                    # ブラウザ再生モードでは音声と口パクが同じイベントで届き、
+                    # ブラウザ側で同じ時計に合わせるため遅延させない
+                    delay = (0.0 if data.audio is not None
+                             else LIVE_SETTINGS.current.mouse_delay_time)
 
                     if delay > 0.0:
                         def _enqueue_later(d=data) -> None:
-                            # Remove 'delay' key when forwarding to visualizer
-                            if isinstance(d, dict) and 'delay' in d:
-                                payload = {k: v for k,
-                                           v in d.items() if k != 'delay'}
-                            else:
-                                payload = d
-                            self.visualize_manager.enqueue_visualizer_sound(
-                                payload)
+                            self._forward_to_visualizer(d)
 
                         timer = threading.Timer(delay, _enqueue_later)
                         timer.daemon = True
                         timer.start()
                     else:
-                        if isinstance(data, dict) and 'delay' in data:
-                            data = {k: v for k, v in data.items() if k !=
-                                    'delay'}
-                        self.visualize_manager.enqueue_visualizer_sound(data)
+                        self._forward_to_visualizer(data)
 
                 self._sound_forwarder_stop_event.wait(
                     SOUND_QUEUE_CHECK_INTERVAL)
@@ -133,6 +355,12 @@ class LiveYukkuriRunner:
         )
         self._sound_forwarder_thread.start()
 
+    def _forward_to_visualizer(self, event: SoundEvent) -> None:
+        # イベントはコピーせずにそのまま各クライアントのキューへ渡す
+        STAGE_SECONDS.observe(
+            time.monotonic() - event.enqueued_at, stage='forwarder')
+        self.visualize_manager.enqueue_visualizer_sound(event)
+
     # ------------------------------------------------------------------
     # Outbound server routes
     # ------------------------------------------------------------------
@@ -143,13 +371,66 @@ class LiveYukkuriRunner:
 
         @app.route('/speak', methods=['POST'])
         def speak():
-            data = request.get_json(force=True)
+            data = request.get_json(force=True, silent=True)
+            if not isinstance(data, dict):
+                return jsonify({'status': 'error',
+                                'message': 'JSON object is required'}), 400
             text = data.get('text', '')
             if not text:
                 return jsonify({'status': 'error', 'message': 'text is required'}), 400
-
-            self._speak_text_queue.put(text)
-            return jsonify({'status': 'ok', 'queued': True})
+            ttl = data.get('ttl', SPEAK_TTL)
+            if ttl is not None and (
+                    isinstance(ttl, bool) or not isinstance(ttl, (int, float))
+                    or ttl <= 0):
+                return jsonify({'status': 'error', 'message': 'invalid ttl'}), 400
+
+            if self._traffic_recorder is not None:
+                self._traffic_recorder.record_speak(text, ttl)
+            # 読み上げが始まるまでの推定秒数。間に合わないなら受け付けない
+            queue_eta = self.queue_eta()
+            reason = self._deadline_scheduler.accept(text, ttl, queue_eta)
+            if reason is not None:
+                return jsonify({'status': 'error', 'message': reason,
+                                'queue_eta_seconds': queue_eta}), 429
+
+            job = SpeakJob(text, ttl=ttl)
+            if self._speak_journal is not None:
+                try:
+                    self._speak_journal.record_enqueue(job, ttl)
+                except OSError as exc:
+                    return jsonify({'status': 'error', 'message': str(exc)}), 503
+            self._job_registry.add(job)
+            self._add_backlog(job)
+            self._speak_text_queue.put(job)
+            return jsonify({'status': 'ok', 'queued': True, 'job_id': job.job_id,
+                            'queue_eta_seconds': queue_eta})
+
+        @app.route('/speak_status/<job_id>', methods=['GET'])
+        def speak_status(job_id: str):
+            job = self._job_registry.get(job_id)
+            if job is None:
+                return jsonify({'status': 'error', 'message': 'unknown job_id'}), 404
+            return jsonify({'status': 'ok', 'job': job.to_dict()})
+
+        @app.route('/status', methods=['GET'])
+        def status():
+            return jsonify({
+                'status': 'ok',
+                'queue_depth': self._speak_text_queue.qsize(),
+                'queue_eta_seconds': self.queue_eta(),
+                'jobs': self._job_registry.count_by_state(),
+            })
+
+        @app.route('/ready', methods=['GET'])
+        def ready():
+            snapshot = self._readiness.snapshot()
+            return jsonify({'status': 'ok', **snapshot}), (
+                200 if snapshot['ready'] else 503)
+
+        @app.route('/metrics', methods=['GET'])
+        def metrics():
+            return Response(METRICS.render(),
+                            content_type=PROMETHEUS_CONTENT_TYPE)
 
         @app.route('/voice_output_stop_flag', methods=['POST', 'PUT'])
         def voice_output_stop_flag():
@@ -180,6 +461,8 @@ class LiveYukkuriRunner:
 
             if flag is None:
                 flag = True
+            if flag and self._traffic_recorder is not None:
+                self._traffic_recorder.record_stop()
 
             try:
                 voice_manager.set_voice_output_stop_flag(flag)
@@ -199,15 +482,149 @@ class LiveYukkuriRunner:
 
             return jsonify({'status': 'ok', 'voice_output_stop_flag': flag})
 
+    # ------------------------------------------------------------------
+    # Admin routes
+    # ------------------------------------------------------------------
+
+    def _register_admin_routes(self) -> None:
+        app = self.outbound_app
+
+        @app.before_request
+        def restrict_admin():
+            if not request.path.startswith('/admin/') or ADMIN_ALLOW_REMOTE:
+                return None
+            if request.remote_addr not in LOCAL_ADDRESSES:
+                return jsonify({'status': 'error',
+                                'message': 'admin endpoints are local only'}), 403
+            return None
+
+        @app.route('/admin/threads', methods=['GET'])
+        def admin_threads():
+            return Response(dump_thread_stacks(),
+                            content_type='text/plain; charset=utf-8')
+
+        @app.route('/admin/settings', methods=['GET'])
+        def admin_settings():
+            return jsonify({'status': 'ok',
+                            'settings': LIVE_SETTINGS.current.to_dict()})
+
+        @app.route('/admin/settings/reload', methods=['POST'])
+        def admin_settings_reload():
+            """person_settings.py を読み直し、実行中のまま設定を差し替える。"""
+            try:
+                settings, changed = LIVE_SETTINGS.reload()
+            except Exception as exc:
+                return jsonify({'status': 'error', 'message': str(exc)}), 400
+            return jsonify({'status': 'ok', 'changed': changed,
+                            'settings': settings.to_dict()})
+
+        @app.route('/admin/profile', methods=['GET', 'POST'])
+        def admin_profile():
+            """全スレッドを指定秒数サンプリングし、結果をファイルとして返す。
+
+            Query params:
+                seconds: 計測時間（最大 PROFILE_MAX_SECONDS）
+                format: ``collapsed``（既定）または ``pstats``
+            """
+            try:
+                seconds = float(request.args.get(
+                    'seconds', PROFILE_DEFAULT_SECONDS))
+            except ValueError:
+                return jsonify({'status': 'error', 'message': 'invalid seconds'}), 400
+            seconds = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+            output_format = request.args.get('format', 'collapsed')
+            if output_format not in ('collapsed', 'pstats'):
+                return jsonify({'status': 'error', 'message': 'invalid format'}), 400
+
+            if not self._profile_lock.acquire(blocking=False):
+                return jsonify({'status': 'error',
+                                'message': 'profiling already in progress'}), 409
+            try:
+                profiler = SamplingProfiler()
+                profiler.run(seconds)
+            finally:
+                self._profile_lock.release()
+
+            if output_format == 'pstats':
+                response = Response(profiler.pstats_bytes(),
+                                    content_type='application/octet-stream')
+                filename = 'live_yukkuri.pstats'
+            else:
+                response = Response(profiler.collapsed(),
+                                    content_type='text/plain; charset=utf-8')
+                filename = 'live_yukkuri.collapsed.txt'
+            response.headers['Content-Disposition'] = (
+                f'attachment; filename={filename}')
+            return response
+
+    def _register_metrics(self) -> None:
+        """キュー長・スレッド数を scrape 時に評価するゲージとして登録する。"""
+        METRICS.set_gauge_callback(
+            'live_yukkuri_speak_text_queue_depth',
+            'Number of texts waiting in the speak queue.',
+            self._speak_text_queue.qsize)
+        METRICS.set_gauge_callback(
+            'live_yukkuri_speak_queue_eta_seconds',
+            'Estimated seconds until every accepted text has been spoken.',
+            self.queue_eta)
+        METRICS.set_gauge_callback(
+            'live_yukkuri_voice_speed',
+            'Voice speed used for the next utterance.',
+            SPEECH_RATE.speed)
+        METRICS.set_gauge_callback(
+            'live_yukkuri_tts_hedge_rate',
+            'Fraction of TTS requests that were hedged.',
+            lambda: (TTS_HEDGED_TOTAL.value()
+                     / max(1.0, TTS_REQUESTS_TOTAL.value())))
+        METRICS.set_gauge_callback(
+            'live_yukkuri_tts_hedge_win_rate',
+            'Fraction of hedged TTS requests won by the duplicate.',
+            lambda: (TTS_HEDGE_WINS_TOTAL.value()
+                     / max(1.0, TTS_HEDGED_TOTAL.value())))
+        METRICS.set_gauge_callback(
+            'live_yukkuri_sound_queue_depth',
+            'Number of mouth events waiting for the forwarder.',
+            self._voice_manager.sound_queue_size)
+        METRICS.set_gauge_callback(
+            'live_yukkuri_speech_pipeline_queue_depth',
+            'Number of utterances and sentences buffered between pipeline stages.',
+            self._voice_manager.pipeline_queue_size)
+        METRICS.set_gauge_callback(
+            'live_yukkuri_visualizer_queue_depth',
+            'Number of mouth events waiting for visualizer clients.',
+            self.visualize_manager.visualizer_queue_size)
+        METRICS.set_gauge_callback(
+            'live_yukkuri_visualizer_clients',
+            'Number of connected /sound_events clients.',
+            self.visualize_manager.visualizer_client_count)
+        METRICS.set_gauge_callback(
+            'live_yukkuri_threads',
+            'Number of live Python threads.',
+            threading.active_count)
+        METRICS.set_gauge_callback(
+            'live_yukkuri_resident_memory_bytes',
+            'Current resident memory of the runner process.',
+            lambda: current_rss_bytes() or 0)
+        METRICS.set_gauge_callback(
+            'live_yukkuri_resident_memory_high_water_mark_bytes',
+            'Peak resident memory of the runner process since start.',
+            lambda: peak_rss_bytes() or 0)
+
     # ------------------------------------------------------------------
     # Run
     # ------------------------------------------------------------------
 
     def run(self, debug: bool = False) -> None:
-        """outbound サーバーをバックグラウンドスレッドで起動後、visualizer を起動する。"""
+        """outbound サーバーをバックグラウンドスレッドで起動後、visualizer を起動する。
 
-        self._start_speak_worker()
-        self._start_sound_forwarder()
+        音声合成・再生サーバー・Web サーバーの起動は並行して進め、
+        状態は /ready で確認できる。
+        """
+
+        self.start_subsystems()
+        self.start_workers()
+        if PERSON_SETTINGS_WATCH_INTERVAL:
+            LIVE_SETTINGS.start_watching(PERSON_SETTINGS_WATCH_INTERVAL)
 
         def run_outbound():
             self.outbound_app.run(
@@ -216,15 +633,77 @@ class LiveYukkuriRunner:
         outbound_thread = threading.Thread(target=run_outbound, daemon=True)
         outbound_thread.start()
 
-        timer = threading.Timer(1.0, self.visualize_manager.print_open_message)
-        timer.daemon = True
-        timer.start()
+        def _wait_visualizer() -> None:
+            _wait_for_port(self.visualize_manager.port)
+            self.visualize_manager.print_open_message()
+
+        self._readiness.start_in_background('visualizer', _wait_visualizer)
 
         self.visualize_manager.run(
             debug=debug,
             use_reloader=False,
         )
 
+    def start_subsystems(self) -> None:
+        """音声合成と再生サーバーの起動待ちを並行して開始する。
+
+        音声合成はサーバー起動後にウォームアップ合成まで行う。
+        """
+        self._readiness.start_in_background(
+            'synthesis', self._voice_manager.warm_up_synthesis)
+        self._readiness.start_in_background(
+            'audio_output', self._voice_manager.wait_audio_output_ready)
+
+    def wait_until_ready(self, timeout: float) -> bool:
+        """すべてのサブシステムが ready になるまで待つ。"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._readiness.is_ready():
+                return True
+            time.sleep(PORT_POLL_INTERVAL)
+        return self._readiness.is_ready()
+
+    def readiness(self) -> dict:
+        return self._readiness.snapshot()
+
+    def start_workers(self) -> None:
+        """speak worker と sound forwarder を起動する（サーバーは起動しない）。"""
+        self._recover_journal()
+        self._start_speak_worker()
+        self._start_sound_forwarder()
+
+    def stop_workers(self) -> None:
+        """speak worker と sound forwarder を終了させる。
+
+        speak worker はキューに残っているテキストを読み上げ終えてから終了する。
+        """
+        thread, self._speak_worker_thread = self._speak_worker_thread, None
+        if thread is not None:
+            self._speak_text_queue.put(None)  # type: ignore[arg-type]
+            thread.join()
+            # 終了要求の分
+            self._speak_text_queue.task_done()
+        self._sound_forwarder_stop_event.set()
+        thread, self._sound_forwarder_thread = \
+            self._sound_forwarder_thread, None
+        if thread is not None:
+            thread.join()
+
+    def _recover_journal(self) -> None:
+        """前回読み上げ終わらなかったテキストを受付順にキューへ戻す。"""
+        if self._speak_journal is None:
+            return
+        for key, text, ttl in self._speak_journal.recover():
+            job = SpeakJob(text, ttl=ttl)
+            self._speak_journal.adopt(job, key)
+            self._job_registry.add(job)
+            self._add_backlog(job)
+            self._speak_text_queue.put(job)
+
+    def join_speak_queue(self) -> None:
+        """キュー内のテキストがすべて読み上げ終わるまで待つ。"""
+        self._speak_text_queue.join()
+
     def _clear_speak_text_queue(self) -> None:
         """Clear all pending items in the speak text queue.
 
@@ -232,9 +711,16 @@ class LiveYukkuriRunner:
         request. Calls `task_done()` for each removed item to keep the
         queue internal counters consistent.
         """
+        stop_requested = False
         try:
             while True:
                 item = self._speak_text_queue.get_nowait()
+                if item is None:
+                    stop_requested = True
+                else:
+                    item.state = SpeakJob.CANCELLED
+                    SPEAK_JOBS_TOTAL.inc(state=item.state)
+                    self._release_jobs([item])
                 try:
                     self._speak_text_queue.task_done()
                 except Exception:
@@ -242,3 +728,20 @@ class LiveYukkuriRunner:
                     pass
         except queue.Empty:
             pass
+        if stop_requested:
+            # 終了要求は取り消さない（stop_workers が待ち続けないように）
+            self._speak_text_queue.put(None)  # type: ignore[arg-type]
+
+        with self._speak_carry_lock:
+            carried = list(self._speak_carry)
+            self._speak_carry.clear()
+        for item in carried:
+            if item is None:
+                # 終了要求は取り消さない
+                with self._speak_carry_lock:
+                    self._speak_carry.append(None)
+                continue
+            item.state = SpeakJob.CANCELLED
+            SPEAK_JOBS_TOTAL.inc(state=item.state)
+            self._release_jobs([item])
+            self._speak_text_queue.task_done()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import os
+
+
+def _windows_memory_counters():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    ok = kernel32.K32GetProcessMemoryInfo(
+        kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+    if not ok:
+        raise OSError('GetProcessMemoryInfo failed')
+    return counters
+
+
+def current_rss_bytes() -> int | None:
+    """現在の常駐メモリ（RSS / Working Set）をバイト数で返す。取得できなければ None。"""
+    try:
+        if sys.platform == 'win32':
+            return int(_windows_memory_counters().WorkingSetSize)
+        if sys.platform.startswith('linux'):
+            with open('/proc/self/statm', encoding='ascii') as f:
+                resident_pages = int(f.read().split()[1])
+            return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return None
+    return None
+
+
+def peak_rss_bytes() -> int | None:
+    """プロセス開始以降の常駐メモリの最大値（high-water mark）を返す。"""
+    try:
+        if sys.platform == 'win32':
+            return int(_windows_memory_counters().PeakWorkingSetSize)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux は KiB、macOS はバイト単位
+        return int(peak) if sys.platform == 'darwin' else int(peak) * 1024
+    except Exception:
+        return None
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+# 秒単位のレイテンシ用デフォルトバケット
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+SUMMARY_WINDOW_SIZE = 1024
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return (value.replace('\\', '\\\\')
+            .replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _format_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ''
+    body = ','.join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs)
+    return '{' + body + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help_text}',
+                 f'# TYPE {self.name} {self.metric_type}']
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """単調増加するカウンタ。"""
+
+    metric_type = 'counter'
+
+    def __init__(self, name: str, help_text: str) -> None:
+        super().__init__(name, help_text)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f'{self.name}{_format_labels(k)} {_format_value(v)}'
+                for k, v in items]
+
+
+class Gauge(_Metric):
+    """現在値を表すゲージ。
+
+    *callback* を指定した場合は scrape 時にだけ評価されるため、
+    キュー長やスレッド数の監視で常時コストが掛からない。
+    """
+
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, help_text: str,
+                 callback: Callable[[], float] | None = None) -> None:
+        super().__init__(name, help_text)
+        self._callback = callback
+        self._values: dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def value(self, **labels: str) -> float:
+        if self._callback is not None and not labels:
+            return float(self._callback())
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def _render_samples(self) -> list[str]:
+        if self._callback is not None:
+            try:
+                value = float(self._callback())
+            except Exception:
+                return []
+            return [f'{self.name} {_format_value(value)}']
+        with self._lock:
+            items = list(self._values.items())
+        return [f'{self.name}{_format_labels(k)} {_format_value(v)}'
+                for k, v in items]
+
+
+class Histogram(_Metric):
+    """累積バケット方式のヒストグラム。observe はロック内で O(log n)。"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, help_text: str,
+                 buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> None:
+        super().__init__(name, help_text)
+        self._bounds = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self._values: dict[LabelKey, list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self._bounds) + 3)
+                self._values[key] = state
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            state = self._values.get(_label_key(labels))
+            return int(state[-1]) if state else 0
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = []
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self._bounds + (float('inf'),), state):
+                cumulative += count
+                le = (('le', _format_value(bound)),)
+                lines.append(
+                    f'{self.name}_bucket{_format_labels(key, le)} '
+                    f'{_format_value(cumulative)}')
+            lines.append(
+                f'{self.name}_sum{_format_labels(key)} {_format_value(state[-2])}')
+            lines.append(
+                f'{self.name}_count{_format_labels(key)} {_format_value(state[-1])}')
+        return lines
+
+
+class Summary(_Metric):
+    """直近 *window* 件の観測値から分位点 (p50/p95/p99 など) を出すサマリ。
+
+    分位点の計算は scrape 時のみ行う。
+    """
+
+    metric_type = 'summary'
+
+    def __init__(self, name: str, help_text: str,
+                 quantiles: tuple[float, ...] = DEFAULT_QUANTILES,
+                 window: int = SUMMARY_WINDOW_SIZE) -> None:
+        super().__init__(name, help_text)
+        self._quantiles = quantiles
+        self._samples: deque[float] = deque(maxlen=window)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._samples.append(value)
+            self._sum += value
+            self._count += 1
+
+    def count(self) -> int:
+        with self._lock:
+            return self._count
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(int(q * len(samples)), len(samples) - 1)
+        return samples[index]
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            samples = sorted(self._samples)
+            total, count = self._sum, self._count
+        lines = []
+        if samples:
+            for q in self._quantiles:
+                index = min(int(q * len(samples)), len(samples) - 1)
+                lines.append(
+                    f'{self.name}{_format_labels((), (("quantile", str(q)),))} '
+                    f'{_format_value(samples[index])}')
+        lines.append(f'{self.name}_sum {_format_value(total)}')
+        lines.append(f'{self.name}_count {_format_value(count)}')
+        return lines
+
+
+class MetricsRegistry:
+    """メトリクスを名前で管理し、Prometheus テキスト形式で出力するレジストリ。
+
+    同名のメトリクスを再登録した場合は既存のものを返す。
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory: Callable[[], _Metric]) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get_or_create(  # type: ignore[return-value]
+            name, lambda: Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str,
+              callback: Callable[[], float] | None = None) -> Gauge:
+        return self._get_or_create(  # type: ignore[return-value]
+            name, lambda: Gauge(name, help_text, callback))
+
+    def histogram(self, name: str, help_text: str,
+                  buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(  # type: ignore[return-value]
+            name, lambda: Histogram(name, help_text, buckets))
+
+    def summary(self, name: str, help_text: str,
+                quantiles: tuple[float, ...] = DEFAULT_QUANTILES) -> Summary:
+        return self._get_or_create(  # type: ignore[return-value]
+            name, lambda: Summary(name, help_text, quantiles))
+
+    def set_gauge_callback(self, name: str, help_text: str,
+                           callback: Callable[[], float]) -> Gauge:
+        """scrape 時に評価されるゲージを登録（既存なら置き換え）する。"""
+        gauge = Gauge(name, help_text, callback)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# プロセス全体で共有するレジストリ
+METRICS = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# パイプライン各段の所要時間（秒）
+STAGE_SECONDS = METRICS.histogram(
+    'live_yukkuri_stage_seconds',
+    'Duration of each speak pipeline stage in seconds.')
+TIME_TO_FIRST_AUDIO_SECONDS = METRICS.histogram(
+    'live_yukkuri_time_to_first_audio_seconds',
+    'Time from /speak enqueue to the start of the first audio playback.')
+TIME_TO_FIRST_AUDIO_RECENT = METRICS.summary(
+    'live_yukkuri_time_to_first_audio_recent_seconds',
+    'Quantiles of recent time-to-first-audio samples.')
+TTS_CANCELLED_TOTAL = METRICS.counter(
+    'live_yukkuri_tts_cancelled_total',
+    'Number of TTS requests abandoned because their job was cancelled.')
+TTS_WASTED_SECONDS_TOTAL = METRICS.counter(
+    'live_yukkuri_tts_wasted_seconds_total',
+    'Synthesis time whose result was discarded after cancellation.')
+TTS_REQUESTS_TOTAL = METRICS.counter(
+    'live_yukkuri_tts_requests_total',
+    'Number of sentences requested from the TTS server.')
+TTS_REQUEST_RECENT = METRICS.summary(
+    'live_yukkuri_tts_request_recent_seconds',
+    'Quantiles of recent TTS request durations (hedge delay).')
+TTS_HEDGED_TOTAL = METRICS.counter(
+    'live_yukkuri_tts_hedged_total',
+    'Number of TTS requests that were duplicated after the hedge delay.')
+TTS_HEDGE_WINS_TOTAL = METRICS.counter(
+    'live_yukkuri_tts_hedge_wins_total',
+    'Number of hedged TTS requests answered first by the duplicate.')
+TTS_DEADLINE_EXCEEDED_TOTAL = METRICS.counter(
+    'live_yukkuri_tts_deadline_exceeded_total',
+    'Number of TTS requests abandoned at AQUESTALK_REQUEST_DEADLINE.')
+FILLER_PLAYED_TOTAL = METRICS.counter(
+    'live_yukkuri_filler_played_total',
+    'Number of filler lines played while the first sentence was synthesized.')
+SPEAK_JOBS_TOTAL = METRICS.counter(
+    'live_yukkuri_speak_jobs_total',
+    'Number of speak jobs by final state.')
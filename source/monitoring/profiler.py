@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import marshal
+import threading
+import time
+import traceback
+from collections import Counter
+from types import FrameType
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# (filename, firstlineno, funcname) — pstats と同じ関数キー
+FunctionKey = tuple[str, int, str]
+
+
+def _thread_names() -> dict[int, str]:
+    return {t.ident: t.name for t in threading.enumerate() if t.ident is not None}
+
+
+def _frame_stack(frame: FrameType | None) -> tuple[FunctionKey, ...]:
+    """フレームを根から葉の順に並べた関数キーのタプルにする。"""
+    stack: list[FunctionKey] = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def dump_thread_stacks() -> str:
+    """全スレッドの現在のスタックトレースをテキストで返す。"""
+    names = _thread_names()
+    lines: list[str] = []
+    for ident, frame in sys._current_frames().items():
+        lines.append(f'Thread {names.get(ident, "?")} (ident={ident}):')
+        lines.extend(line.rstrip('\n')
+                     for line in traceback.format_stack(frame))
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+class SamplingProfiler:
+    """``sys._current_frames()`` を一定間隔で読み取る全スレッド対象のプロファイラ。
+
+    cProfile は有効化したスレッドしか計測できないため、稼働中の
+    speak worker や Flask のスレッドを外部から計測するためにサンプリングを用いる。
+    結果は flamegraph 用の collapsed-stack 形式、または pstats 形式で取り出せる。
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        self._interval = interval
+        # (thread name, stack) -> sample count
+        self._samples: Counter[tuple[str, tuple[FunctionKey, ...]]] = Counter()
+        self.sample_count = 0
+
+    def run(self, duration: float) -> None:
+        """呼び出し元スレッドで *duration* 秒間サンプリングする。"""
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            names = _thread_names()
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                name = names.get(ident, str(ident))
+                self._samples[(name, _frame_stack(frame))] += 1
+            self.sample_count += 1
+            time.sleep(self._interval)
+
+    def collapsed(self) -> str:
+        """``thread;func;func count`` 形式（flamegraph.pl / speedscope 用）。"""
+        lines = []
+        for (name, stack), count in self._samples.most_common():
+            frames = [name.replace(';', ':')]
+            frames.extend(f'{Path(filename).name}:{func}:{lineno}'
+                          for filename, lineno, func in stack)
+            lines.append(f'{";".join(frames)} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def pstats_bytes(self) -> bytes:
+        """``pstats.Stats`` で読み込める marshal 形式のデータ。
+
+        呼び出し回数の代わりにサンプル数、時間はサンプル数 × 間隔を用いる。
+        """
+        interval = self._interval
+        # key -> [cc, nc, tt, ct, callers]
+        stats: dict[FunctionKey, list] = {}
+        for (_, stack), count in self._samples.items():
+            if not stack:
+                continue
+            seen: set[FunctionKey] = set()
+            seen_edges: set[tuple[FunctionKey, FunctionKey]] = set()
+            for index, key in enumerate(stack):
+                entry = stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+                if key not in seen:
+                    seen.add(key)
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += count * interval
+                if index > 0:
+                    edge = (stack[index - 1], key)
+                    if edge not in seen_edges:
+                        seen_edges.add(edge)
+                        caller = entry[4].setdefault(
+                            stack[index - 1], [0, 0, 0.0, 0.0])
+                        caller[0] += count
+                        caller[1] += count
+                        caller[3] += count * interval
+            stats[stack[-1]][2] += count * interval
+
+        result = {
+            key: (cc, nc, tt, ct,
+                  {caller: tuple(values) for caller, values in callers.items()})
+            for key, (cc, nc, tt, ct, callers) in stats.items()
+        }
+        return marshal.dumps(result)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import threading
+import time
+from typing import Callable
+
+
+class ReadinessTracker:
+    """各サブシステムの起動状態を管理する。
+
+    状態は ``pending`` → ``starting`` → ``ready`` / ``failed`` の順に遷移する。
+    起動処理は ``start_in_background`` で並行に実行できる。
+    """
+
+    PENDING = 'pending'
+    STARTING = 'starting'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._created_at = time.monotonic()
+        # name -> {'state', 'started_at', 'finished_at', 'error'}
+        self._subsystems: dict[str, dict] = {}
+
+    def register(self, name: str) -> None:
+        with self._lock:
+            self._subsystems.setdefault(
+                name, {'state': self.PENDING, 'started_at': None,
+                       'finished_at': None, 'error': None})
+
+    def set_state(self, name: str, state: str, error: str | None = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._subsystems.setdefault(
+                name, {'state': self.PENDING, 'started_at': None,
+                       'finished_at': None, 'error': None})
+            entry['state'] = state
+            if state == self.STARTING:
+                entry['started_at'] = now
+            elif state in (self.READY, self.FAILED):
+                entry['finished_at'] = now
+            entry['error'] = error
+
+    def state(self, name: str) -> str | None:
+        with self._lock:
+            entry = self._subsystems.get(name)
+            return entry['state'] if entry else None
+
+    def is_ready(self) -> bool:
+        with self._lock:
+            return bool(self._subsystems) and all(
+                entry['state'] == self.READY
+                for entry in self._subsystems.values())
+
+    def start_in_background(self, name: str,
+                            task: Callable[[], None]) -> threading.Thread:
+        """*task* を別スレッドで実行し、結果を *name* の状態に反映する。"""
+        self.register(name)
+
+        def _run() -> None:
+            self.set_state(name, self.STARTING)
+            try:
+                task()
+            except Exception as exc:
+                self.set_state(name, self.FAILED, str(exc))
+                print(f'[startup] {name} failed: {exc}', flush=True)
+            else:
+                self.set_state(name, self.READY)
+
+        thread = threading.Thread(
+            target=_run, daemon=True, name=f'startup-{name}')
+        thread.start()
+        return thread
+
+    def snapshot(self) -> dict:
+        """API 応答用の辞書。時刻は tracker 作成からの経過秒数。"""
+        with self._lock:
+            items = [(name, dict(entry))
+                     for name, entry in self._subsystems.items()]
+        subsystems = {}
+        for name, entry in items:
+            info: dict = {'state': entry['state']}
+            if entry['started_at'] is not None:
+                info['started_after'] = entry['started_at'] - self._created_at
+            if entry['finished_at'] is not None:
+                info['ready_after'] = entry['finished_at'] - self._created_at
+                if entry['started_at'] is not None:
+                    info['duration'] = entry['finished_at'] - entry['started_at']
+            if entry['error']:
+                info['error'] = entry['error']
+            subsystems[name] = info
+        return {'ready': self.is_ready(), 'subsystems': subsystems}
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import json
+import threading
+import time
+from datetime import datetime
+
+
+class TrafficRecorder:
+    """/speak と停止要求を到着時刻つきで JSON Lines に追記する。
+
+    各行は ``{"t": 記録開始からの秒数, "op": "speak" | "stop", ...}`` 形式で、
+    ``benchmark/load_generator.py --pattern replay`` と
+    ``benchmark/replay_traffic.py`` でそのまま再生できる。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open('a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    @classmethod
+    def in_directory(cls, directory: Path) -> TrafficRecorder:
+        """*directory* に起動時刻を名前にしたログを作る。"""
+        name = datetime.now().strftime('traffic-%Y%m%d-%H%M%S.jsonl')
+        return cls(Path(directory) / name)
+
+    def record_speak(self, text: str, ttl: float | None) -> None:
+        record: dict = {'op': 'speak', 'text': text}
+        if ttl is not None:
+            record['ttl'] = ttl
+        self._write(record)
+
+    def record_stop(self) -> None:
+        self._write({'op': 'stop'})
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def _write(self, record: dict) -> None:
+        t = round(time.monotonic() - self._started, 3)
+        line = json.dumps({'t': t, **record}, ensure_ascii=False,
+                          separators=(',', ':'))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + '\n')
+            # 異常終了しても直前までの記録が残るよう 1 行ごとに書き出す
+            self._file.flush()
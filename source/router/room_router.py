@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import hashlib
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from flask import Flask, Response, jsonify, request
+
+from source.monitoring.metrics import METRICS, PROMETHEUS_CONTENT_TYPE
+
+from configuration.communication_settings import (
+    HOST_NAME,
+    OUTBOUND_PORT,
+    ROUTER_DEFAULT_ROOM,
+    ROUTER_REQUEST_TIMEOUT,
+    ROUTER_RESTART_BACKOFF_INITIAL,
+    ROUTER_RESTART_BACKOFF_MAX,
+    ROUTER_WORKERS,
+    SPEAK_JOURNAL_PATH,
+)
+from configuration.person_settings import AQUESTALK_PORT_SERVER_ARGS
+
+RUN_SCRIPT = Path(__file__).resolve().parents[2] / 'run.py'
+
+ROUTER_REQUESTS_TOTAL = METRICS.counter(
+    'live_yukkuri_router_requests_total',
+    'Number of requests forwarded to each worker by result.')
+ROUTER_WORKER_RESTARTS_TOTAL = METRICS.counter(
+    'live_yukkuri_router_worker_restarts_total',
+    'Number of worker runner processes restarted by the router.')
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _weight(room: str, worker: str) -> int:
+    digest = hashlib.blake2b(f'{worker}\0{room}'.encode('utf-8'),
+                             digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class RouterWorker:
+    """ルーターが読み上げを振り分ける 1 つのランナー。
+
+    *command* を渡すとルーターがプロセスを起動・再起動する。省略した場合は
+    既に起動しているランナーへ転送するだけにする。起動してもすぐに終了する
+    ランナーは、指数バックオフで再起動の間隔を延ばす。
+    """
+
+    def __init__(self, name: str, outbound_url: str,
+                 visualizer_url: str | None = None,
+                 command: list[str] | None = None) -> None:
+        self.name = name
+        self.outbound_url = outbound_url
+        self.visualizer_url = visualizer_url
+        self._command = command
+        self._process: subprocess.Popen | None = None
+        self._restart_backoff = ROUTER_RESTART_BACKOFF_INITIAL
+        self._next_restart_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def local(cls, name: str) -> RouterWorker:
+        """空いているポートで ``run.py`` を起動するワーカーを作る。
+
+        ランナーごとに別のポートで aquestalk-server を起動させるため、
+        AQUESTALK_PORT_SERVER_ARGS が設定されていなければ ValueError を送出する。
+        """
+        if AQUESTALK_PORT_SERVER_ARGS is None:
+            raise ValueError(
+                'set AQUESTALK_PORT_SERVER_ARGS in '
+                'configuration/person_settings.py to the aquestalk-server '
+                'arguments that select its port before using the router')
+        outbound_port = _free_port()
+        visualizer_port = _free_port()
+        command = [sys.executable, str(RUN_SCRIPT),
+                   '--outbound-port', str(outbound_port),
+                   '--visualizer-port', str(visualizer_port),
+                   '--aquestalk-port', str(_free_port()),
+                   # 停止要求が他のルームの再生を止めないよう再生サーバーも分ける
+                   '--audio-player-port', str(_free_port())]
+        if SPEAK_JOURNAL_PATH:
+            # 同じファイルを複数のプロセスで追記しないよう、ワーカーごとに分ける
+            journal = Path(SPEAK_JOURNAL_PATH)
+            command += ['--journal', str(journal.with_name(
+                f'{journal.stem}.{name}{journal.suffix}'))]
+        return cls(name, f'http://127.0.0.1:{outbound_port}',
+                   f'http://127.0.0.1:{visualizer_port}', command)
+
+    def ensure_running(self) -> None:
+        """プロセスが起動していなければ（終了していれば）起動する。"""
+        if self._command is None:
+            return
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                return
+            now = time.monotonic()
+            if self._process is not None:
+                if now < self._next_restart_at:
+                    return
+                print(f'[room-router] restarting {self.name}', flush=True)
+                ROUTER_WORKER_RESTARTS_TOTAL.inc()
+            self._next_restart_at = now + self._restart_backoff
+            self._restart_backoff = min(self._restart_backoff * 2,
+                                        ROUTER_RESTART_BACKOFF_MAX)
+            self._process = subprocess.Popen(self._command)
+
+    def report_healthy(self) -> None:
+        """ランナーが応答したので、再起動の間隔を初期値に戻す。"""
+        with self._lock:
+            self._restart_backoff = ROUTER_RESTART_BACKOFF_INITIAL
+
+    def terminate(self) -> None:
+        with self._lock:
+            process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def to_dict(self) -> dict:
+        return {'worker': self.name, 'url': self.outbound_url,
+                'visualizer_url': self.visualizer_url}
+
+
+class RoomRouter:
+    """1 つの受付口で /speak を受け、ルームごとに決まったランナーへ転送する。
+
+    ルームの割り当てには rendezvous hashing を使う。同じルームは常に同じ
+    ワーカーへ送られ、ワーカーを増減しても割り当てが変わるのは増減した
+    ワーカーの分のルームだけで済む。各ランナーは別プロセスのため、ルームを
+    増やすと音声合成・解析が CPU コアに分散される。
+    """
+
+    def __init__(self, workers: list[RouterWorker],
+                 host: str = HOST_NAME, port: int = OUTBOUND_PORT) -> None:
+        if not workers:
+            raise ValueError('at least one worker is required')
+        self.workers = list(workers)
+        self._host = host
+        self._port = port
+        self._client = httpx.Client(timeout=ROUTER_REQUEST_TIMEOUT)
+        self._status_executor = ThreadPoolExecutor(
+            max_workers=len(self.workers), thread_name_prefix='router-status')
+        self.app = Flask(__name__ + '_router')
+        self._register_routes()
+
+    @classmethod
+    def spawn_local(cls, count: int = ROUTER_WORKERS, **kwargs) -> RoomRouter:
+        """*count* 個のランナーを空いているポートで起動し、ルーターを作る。"""
+        router = cls([RouterWorker.local(f'worker-{i}')
+                      for i in range(count)], **kwargs)
+        for worker in router.workers:
+            worker.ensure_running()
+        return router
+
+    def worker_for(self, room: str) -> RouterWorker:
+        return max(self.workers, key=lambda w: _weight(room, w.name))
+
+    def close(self) -> None:
+        self._status_executor.shutdown(wait=True)
+        self._client.close()
+        for worker in self.workers:
+            worker.terminate()
+
+    def run(self) -> None:
+        try:
+            self.app.run(host=self._host, port=self._port, debug=False)
+        finally:
+            self.close()
+
+    # ------------------------------------------------------------------
+    # forwarding
+    # ------------------------------------------------------------------
+
+    def _forward(self, worker: RouterWorker, method: str, path: str,
+                 payload=None,
+                 params: list[tuple[str, str]] | None = None
+                 ) -> tuple[dict, int]:
+        worker.ensure_running()
+        try:
+            response = self._client.request(
+                method, worker.outbound_url + path, json=payload,
+                params=params)
+            body = response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            ROUTER_REQUESTS_TOTAL.inc(worker=worker.name, result='error')
+            return {'status': 'error',
+                    'message': f'worker {worker.name} is unavailable: {exc}'}, 503
+        ROUTER_REQUESTS_TOTAL.inc(worker=worker.name,
+                                  result=str(response.status_code))
+        worker.report_healthy()
+        return body, response.status_code
+
+    def _worker_status(self, worker: RouterWorker) -> dict:
+        body, code = self._forward(worker, 'GET', '/status')
+        body.pop('status', None)
+        return {**worker.to_dict(), 'available': code == 200, **body}
+
+    def _register_routes(self) -> None:
+        app = self.app
+
+        @app.route('/speak', methods=['POST'])
+        def speak():
+            data = request.get_json(force=True, silent=True)
+            if not isinstance(data, dict):
+                return jsonify({'status': 'error',
+                                'message': 'JSON object is required'}), 400
+            room = str(data.pop('room', None) or ROUTER_DEFAULT_ROOM)
+            worker = self.worker_for(room)
+            body, code = self._forward(worker, 'POST', '/speak', data)
+            return jsonify({**body, 'room': room, 'worker': worker.name}), code
+
+        @app.route('/speak_status/<room>/<job_id>', methods=['GET'])
+        def speak_status(room: str, job_id: str):
+            body, code = self._forward(
+                self.worker_for(room), 'GET', f'/speak_status/{job_id}')
+            return jsonify(body), code
+
+        @app.route('/voice_output_stop_flag', methods=['POST', 'PUT'])
+        def voice_output_stop_flag():
+            """ルームを指定しなければすべてのワーカーへ送る。
+
+            本文（true / false / {"value": ...} など）とクエリ文字列は
+            ランナーの /voice_output_stop_flag が解釈するので、``room`` を
+            除いてそのまま転送する。ルームは本文かクエリの ``room`` で指定する。
+            """
+            data = request.get_json(silent=True)
+            room = request.args.get('room')
+            if isinstance(data, dict):
+                data = dict(data)
+                room = data.pop('room', room)
+            params = [(key, value)
+                      for key, value in request.args.items(multi=True)
+                      if key != 'room']
+            workers = ([self.worker_for(str(room))] if room is not None
+                       else self.workers)
+            results = [self._forward(w, request.method,
+                                     '/voice_output_stop_flag', data, params)
+                       for w in workers]
+            code = max(code for _, code in results)
+            return jsonify({'status': 'ok' if code == 200 else 'error',
+                            'workers': [body for body, _ in results]}), code
+
+        @app.route('/rooms/<room>', methods=['GET'])
+        def room_info(room: str):
+            return jsonify({'status': 'ok', 'room': room,
+                            **self.worker_for(room).to_dict()})
+
+        @app.route('/status', methods=['GET'])
+        def status():
+            workers = list(self._status_executor.map(
+                self._worker_status, self.workers))
+            jobs: dict[str, int] = {}
+            for worker in workers:
+                for state, count in worker.get('jobs', {}).items():
+                    jobs[state] = jobs.get(state, 0) + count
+            return jsonify({
+                'status': 'ok',
+                'queue_depth': sum(w.get('queue_depth', 0) for w in workers),
+                'jobs': jobs,
+                'workers': workers,
+            })
+
+        @app.route('/metrics', methods=['GET'])
+        def metrics():
+            return Response(METRICS.render(),
+                            content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import os
+import runpy
+import threading
+
+from source.monitoring.metrics import METRICS
+
+import configuration.person_settings as person_settings
+
+PERSON_SETTINGS_PATH = Path(person_settings.__file__).resolve()
+
+SETTINGS_RELOADS_TOTAL = METRICS.counter(
+    'live_yukkuri_settings_reloads_total',
+    'Number of person_settings reloads by result.')
+
+
+class TunableSettings:
+    """実行中に変更できる設定値のスナップショット（変更不可）。
+
+    各コンポーネントは使用のたびに ``LIVE_SETTINGS.current`` を参照するため、
+    再読み込みは参照の差し替えだけで全体に反映される。
+    """
+
+    __slots__ = ('voice_speed', 'voice_scale_factor', 'mouse_delay_time',
+                 'text_replacements')
+
+    def __init__(self, voice_speed: float, voice_scale_factor: float,
+                 mouse_delay_time: float,
+                 text_replacements: dict[str, str]) -> None:
+        if not isinstance(voice_speed, (int, float)) or voice_speed <= 0:
+            raise ValueError(f'VOICE_SPEED must be positive: {voice_speed!r}')
+        if (not isinstance(voice_scale_factor, (int, float))
+                or voice_scale_factor <= 0):
+            raise ValueError(
+                f'VOICE_SCALE_FACTOR must be positive: {voice_scale_factor!r}')
+        if (not isinstance(mouse_delay_time, (int, float))
+                or mouse_delay_time < 0):
+            raise ValueError(
+                f'MOUSE_DELAY_TIME must not be negative: {mouse_delay_time!r}')
+        if not isinstance(text_replacements, dict) or not all(
+                isinstance(k, str) and isinstance(v, str)
+                for k, v in text_replacements.items()):
+            raise ValueError(
+                'TEXT_FOR_SPEAK_REPLACEMENTS must map str to str')
+        self.voice_speed = float(voice_speed)
+        self.voice_scale_factor = float(voice_scale_factor)
+        self.mouse_delay_time = float(mouse_delay_time)
+        # 置換は定義順に適用するため、順序を保ったタプルで持つ
+        self.text_replacements = tuple(text_replacements.items())
+
+    @classmethod
+    def from_namespace(cls, namespace: dict) -> TunableSettings:
+        return cls(
+            voice_speed=namespace['VOICE_SPEED'],
+            voice_scale_factor=namespace['VOICE_SCALE_FACTOR'],
+            mouse_delay_time=namespace['MOUSE_DELAY_TIME'],
+            text_replacements=namespace['TEXT_FOR_SPEAK_REPLACEMENTS'],
+        )
+
+    def replace_text(self, text: str) -> str:
+        for target, replacement in self.text_replacements:
+            text = text.replace(target, replacement)
+        return text
+
+    def to_dict(self) -> dict:
+        return {
+            'VOICE_SPEED': self.voice_speed,
+            'VOICE_SCALE_FACTOR': self.voice_scale_factor,
+            'MOUSE_DELAY_TIME': self.mouse_delay_time,
+            'TEXT_FOR_SPEAK_REPLACEMENTS': dict(self.text_replacements),
+        }
+
+
+class LiveSettings:
+    """person_settings.py を再読み込みし、実行中のコンポーネントへ反映する。
+
+    ファイルは毎回新しい名前空間で実行するため、構文エラーや不正な値が
+    あっても現在の設定はそのまま残る。対象は VOICE_SPEED・VOICE_SCALE_FACTOR・
+    MOUSE_DELAY_TIME・TEXT_FOR_SPEAK_REPLACEMENTS で、それ以外の設定の変更は
+    再起動まで反映されない。
+    """
+
+    def __init__(self, path: Path = PERSON_SETTINGS_PATH) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._current = TunableSettings.from_namespace(
+            runpy.run_path(str(self._path)))
+        self._mtime = self._read_mtime()
+        self._watch_stop_event = threading.Event()
+        self._watch_thread: threading.Thread | None = None
+
+    @property
+    def current(self) -> TunableSettings:
+        return self._current
+
+    def _read_mtime(self) -> float | None:
+        try:
+            return os.stat(self._path).st_mtime
+        except OSError:
+            return None
+
+    def reload(self) -> tuple[TunableSettings, list[str]]:
+        """設定ファイルを読み直して差し替え、(新しい設定, 変更された項目) を返す。
+
+        Raises:
+            Exception: ファイルの実行または値の検証に失敗した場合
+        """
+        with self._lock:
+            mtime = self._read_mtime()
+            try:
+                updated = TunableSettings.from_namespace(
+                    runpy.run_path(str(self._path)))
+            except Exception:
+                SETTINGS_RELOADS_TOTAL.inc(result='error')
+                raise
+            before = self._current.to_dict()
+            changed = [name for name, value in updated.to_dict().items()
+                       if before[name] != value]
+            self._current = updated
+            self._mtime = mtime
+        SETTINGS_RELOADS_TOTAL.inc(result='ok')
+        return updated, changed
+
+    def start_watching(self, interval: float) -> None:
+        """*interval* 秒ごとに更新時刻を確認し、変更があれば再読み込みする。"""
+        if self._watch_thread is not None:
+            return
+
+        def _watch_loop() -> None:
+            while not self._watch_stop_event.wait(interval):
+                if self._read_mtime() == self._mtime:
+                    continue
+                try:
+                    _, changed = self.reload()
+                    print(f'[settings] reloaded: {", ".join(changed) or "no changes"}',
+                          flush=True)
+                except Exception as exc:
+                    # 編集途中のファイルなどは次の変更まで待つ
+                    self._mtime = self._read_mtime()
+                    print(f'[settings] Error: {exc}', flush=True)
+
+        self._watch_thread = threading.Thread(
+            target=_watch_loop, daemon=True, name='settings-watcher')
+        self._watch_thread.start()
+
+    def stop_watching(self) -> None:
+        self._watch_stop_event.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+            self._watch_thread = None
+
+
+LIVE_SETTINGS = LiveSettings()
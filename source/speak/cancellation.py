@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import threading
+from typing import Callable
+
+
+class OperationCancelled(Exception):
+    """CancellationToken によって処理が取り消されたことを表す。"""
+
+
+class CancellationToken:
+    """処理の取り消しを複数のスレッドへ伝える。
+
+    取り消されると登録済みのコールバックを呼ぶため、待機中の処理は
+    ポーリングせずに即座に中断できる。
+    """
+
+    __slots__ = ('_event', '_callbacks', '_lock')
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._callbacks: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """取り消し時に *callback* を呼ぶ。取り消し済みならすぐに呼ぶ。"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled()
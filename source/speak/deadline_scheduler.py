@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import time
+
+from source.monitoring.metrics import METRICS
+from source.speak.duration_estimator import (
+    DURATION_ESTIMATOR,
+    DurationEstimator,
+)
+from source.speak.speak_job import SpeakJob
+
+from configuration.person_settings import (
+    SPEAK_MAX_QUEUE_ETA,
+)
+
+SPEAK_DROPPED_TOTAL = METRICS.counter(
+    'live_yukkuri_speak_dropped_total',
+    'Number of queued texts dropped because they waited past their deadline.')
+SPEAK_LATE_TOTAL = METRICS.counter(
+    'live_yukkuri_speak_late_total',
+    'Number of texts that started speaking after their deadline.')
+SPEAK_REJECTED_TOTAL = METRICS.counter(
+    'live_yukkuri_speak_rejected_total',
+    'Number of texts rejected on arrival because the queue would not finish in time.')
+
+
+class DeadlineScheduler:
+    """期限までに読み始められないジョブを破棄する。
+
+    期限（受付から ttl 秒後）は読み上げを始めるまでの待ち時間にだけ適用する。
+    ``admit`` はジョブを取り出したとき・音声パイプラインで前処理を始めるとき・
+    最初の文を再生する直前に呼ばれ、前で読み上げ中の発話の残り時間の推定
+    （*ahead*）を足しても期限に間に合わなければ破棄する。期限内に読み始めた
+    テキストは長さによらず最後まで読み上げるため、空いているランナーが
+    テキストを破棄することはない。
+    受付時には ``accept`` でキューの完了見込みと比べ、期限までに読み始められない
+    テキストをキューに入れる前に断る。
+    """
+
+    def __init__(self, estimator: DurationEstimator | None = None,
+                 max_queue_eta: float | None = SPEAK_MAX_QUEUE_ETA) -> None:
+        self.estimator = estimator or DURATION_ESTIMATOR
+        self.max_queue_eta = max_queue_eta
+
+    def accept(self, text: str, ttl: float | None,
+               queue_eta: float) -> str | None:
+        """新しいテキストを受け付けるなら None、断るならその理由を返す。
+
+        *queue_eta* は受付済みのテキストをすべて読み上げ終えるまでの推定秒数。
+        キューが空なら（*queue_eta* が 0 なら）期限では断らない。
+        """
+        reason = None
+        if (self.max_queue_eta is not None
+                and queue_eta + self.estimator.estimate(text)
+                > self.max_queue_eta):
+            reason = 'queue is full'
+        elif ttl is not None and queue_eta > ttl:
+            reason = 'cannot be spoken before ttl'
+        if reason is not None:
+            SPEAK_REJECTED_TOTAL.inc()
+        return reason
+
+    def admit(self, job: SpeakJob, now: float | None = None,
+              ahead: float = 0.0) -> bool:
+        """*job* を読み上げるなら True。
+
+        *ahead* は *job* より前の発話を読み上げ終えるまでの推定秒数。
+        再生する直前には 0 を渡す。
+        """
+        if job.deadline is None:
+            return True
+        if now is None:
+            now = time.monotonic()
+        if now + ahead <= job.deadline:
+            return True
+        SPEAK_DROPPED_TOTAL.inc()
+        return False
+
+    def record_finished(self, spoken: SpeakJob,
+                        jobs: list[SpeakJob] | None = None) -> None:
+        """期限内に取り出したが、読み上げ始めたのが期限の後だったジョブを数える。
+
+        *spoken* は実際に読み上げたジョブ、*jobs* はまとめて読み上げた
+        場合の元ジョブ（省略時は *spoken* のみ）。推定の校正は合成した
+        音声の長さで行う（``VoiceGenerator.analyze``）。
+        """
+        started = spoken.marks.get('first_audio')
+        for job in jobs or [spoken]:
+            if (job.deadline is not None and started is not None
+                    and started > job.deadline):
+                SPEAK_LATE_TOTAL.inc()
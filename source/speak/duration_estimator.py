@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import threading
+
+from source.settings.live_settings import LIVE_SETTINGS
+from source.speak.speech_rate import SPEECH_RATE
+
+from configuration.person_settings import (
+    SPEAK_ESTIMATE_OVERHEAD,
+    SPEAK_ESTIMATE_SECONDS_PER_CHAR,
+)
+
+# 実測値を推定に反映する重み（指数移動平均）
+ESTIMATE_SMOOTHING = 0.2
+
+
+class DurationEstimator:
+    """テキストを読み上げる音声の長さを推定する。
+
+    読み上げ用に置換した後の 1 文字あたりの秒数を、実際に合成した WAV の
+    長さの指数移動平均で更新する。音声の長さは話速に反比例するため、
+    話速 1.0 に換算して保持し、推定時に現在の話速（混雑時に上げた分を含む）
+    へ戻す。
+    合成の待ち時間などは文字数によらない *overhead* として扱う。
+    """
+
+    def __init__(self,
+                 seconds_per_char: float = SPEAK_ESTIMATE_SECONDS_PER_CHAR,
+                 overhead: float = SPEAK_ESTIMATE_OVERHEAD) -> None:
+        """
+        Args:
+            seconds_per_char: 現在の話速での 1 文字あたりの秒数の初期値
+            overhead: 1 発話あたりの文字数によらない時間
+        """
+        self._unit_seconds_per_char = seconds_per_char * self._speed()
+        self._overhead = overhead
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _speed() -> float:
+        return SPEECH_RATE.speed()
+
+    @property
+    def seconds_per_char(self) -> float:
+        """現在の話速での 1 文字あたりの秒数。"""
+        with self._lock:
+            return self._unit_seconds_per_char / self._speed()
+
+    def estimate(self, text: str) -> float:
+        """*text*（置換前）の読み上げにかかる秒数。"""
+        chars = len(LIVE_SETTINGS.current.replace_text(text))
+        return self._overhead + chars * self.seconds_per_char
+
+    def observe(self, text: str, seconds: float,
+                speed: float | None = None) -> None:
+        """置換済みの *text* を合成した音声が *seconds* 秒だったことを反映する。
+
+        *speed* は合成したときの話速（省略時は現在の話速）。
+        """
+        if not text:
+            return
+        measured = max(0.0, seconds) / len(text) * (speed or self._speed())
+        with self._lock:
+            self._unit_seconds_per_char += ESTIMATE_SMOOTHING * (
+                measured - self._unit_seconds_per_char)
+
+
+# 音声合成で校正し、期限判定とキューの完了見込みに使う共有の推定器
+DURATION_ESTIMATOR = DurationEstimator()
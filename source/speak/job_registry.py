@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import threading
+from collections import OrderedDict
+
+from source.speak.speak_job import SpeakJob
+
+JOB_REGISTRY_MAX_SIZE = 4096
+
+
+class JobRegistry:
+    """直近の SpeakJob を job_id で参照できるように保持する。
+
+    件数が *max_size* を超えると古いものから破棄するため、
+    長時間の配信でもメモリ使用量は一定に保たれる。
+    """
+
+    def __init__(self, max_size: int = JOB_REGISTRY_MAX_SIZE) -> None:
+        self._max_size = max_size
+        self._jobs: OrderedDict[str, SpeakJob] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, job: SpeakJob) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self._max_size:
+                self._jobs.popitem(last=False)
+
+    def get(self, job_id: str) -> SpeakJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def count_by_state(self) -> dict[str, int]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts: dict[str, int] = {}
+        for job in jobs:
+            counts[job.state] = counts.get(job.state, 0) + 1
+        return counts
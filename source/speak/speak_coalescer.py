@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import queue
+import time
+
+from source.monitoring.metrics import METRICS
+from source.speak.speak_job import SpeakJob
+
+from configuration.person_settings import (
+    SPEAK_COALESCE_MAX_LENGTH,
+    SPEAK_COALESCE_MAX_MESSAGE_LENGTH,
+    SPEAK_COALESCE_SEPARATOR,
+    SPEAK_COALESCE_TERMINATOR,
+    SPEAK_COALESCE_WINDOW,
+)
+
+COALESCED_MESSAGES_TOTAL = METRICS.counter(
+    'live_yukkuri_speak_coalesced_messages_total',
+    'Number of speak jobs merged into another utterance.')
+COALESCED_BATCH_SIZE = METRICS.histogram(
+    'live_yukkuri_speak_coalesced_batch_size',
+    'Number of messages per merged utterance.',
+    buckets=(2, 3, 4, 6, 8, 12, 16, 24, 32))
+
+
+class SpeakCoalescer:
+    """短いメッセージが続けて届いたとき、まとめて 1 つの発話にする。
+
+    最初のメッセージの受付から *window* 秒以内にキューへ届いた短いメッセージを、
+    合計 *max_length* 文字まで *separator* でつないで読み上げる。
+    コメントが殺到したときの TTS リクエストと再生開始の回数を減らす。
+    """
+
+    def __init__(self,
+                 window: float = SPEAK_COALESCE_WINDOW,
+                 max_message_length: int = SPEAK_COALESCE_MAX_MESSAGE_LENGTH,
+                 max_length: int = SPEAK_COALESCE_MAX_LENGTH,
+                 separator: str = SPEAK_COALESCE_SEPARATOR,
+                 terminator: str = SPEAK_COALESCE_TERMINATOR) -> None:
+        self._window = window
+        self._max_message_length = max_message_length
+        self._max_length = max_length
+        self._separator = separator
+        self._terminator = terminator
+
+    def _is_short(self, job: SpeakJob | None) -> bool:
+        return job is not None and len(job.text) <= self._max_message_length
+
+    def collect(self, first: SpeakJob, speak_queue: queue.Queue
+                ) -> tuple[list[SpeakJob], list[SpeakJob | None]]:
+        """*first* にまとめられるジョブを *speak_queue* から取り出す。
+
+        Returns:
+            (まとめるジョブのリスト, 取り出したがまとめられなかった項目)。
+            後者は呼び出し側が次に処理する（終了用の None を含むことがある）
+        """
+        batch = [first]
+        if not self._is_short(first):
+            return batch, []
+        length = len(first.text)
+        # 既にキューで待っていた分は窓から差し引く
+        deadline = first.enqueued_at + self._window
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = speak_queue.get(timeout=remaining)
+                else:
+                    item = speak_queue.get_nowait()
+            except queue.Empty:
+                return batch, []
+            added = len(self._separator) + len(item.text) if item else 0
+            if not self._is_short(item) or length + added > self._max_length:
+                return batch, [item]
+            batch.append(item)
+            length += added
+
+    def join(self, jobs: list[SpeakJob]) -> str:
+        text = self._separator.join(job.text for job in jobs)
+        return text + self._terminator
+
+    def combine(self, jobs: list[SpeakJob]) -> SpeakJob:
+        """*jobs* を 1 つの読み上げジョブにする。1 件ならそのまま返す。"""
+        if len(jobs) == 1:
+            return jobs[0]
+        COALESCED_MESSAGES_TOTAL.inc(len(jobs) - 1)
+        COALESCED_BATCH_SIZE.observe(len(jobs))
+        return SpeakJob.combine(jobs, self.join(jobs))
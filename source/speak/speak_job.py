@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import itertools
+import time
+
+_job_id_counter = itertools.count(1)
+
+
+class SpeakJob:
+    """/speak で受け付けた 1 件の読み上げ要求。
+
+    受付から再生完了までの各段階を ``time.monotonic()`` のタイムスタンプで
+    ``marks`` に記録し、レイテンシ計測に利用する。
+    """
+
+    __slots__ = ('job_id', 'text', 'enqueued_at', 'marks', 'state',
+                 'member_ids', 'deadline', 'speed')
+
+    # state の取り得る値
+    QUEUED = 'queued'
+    SPEAKING = 'speaking'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    EXPIRED = 'expired'
+
+    def __init__(self, text: str, job_id: str | None = None,
+                 ttl: float | None = None) -> None:
+        self.job_id = job_id or str(next(_job_id_counter))
+        self.text = text
+        self.enqueued_at = time.monotonic()
+        # 読み上げを始めるべき時刻（time.monotonic 基準）。None なら期限なし
+        self.deadline = self.enqueued_at + ttl if ttl is not None else None
+        self.marks: dict[str, float] = {'enqueued': self.enqueued_at}
+        self.state = SpeakJob.QUEUED
+        # 複数のジョブをまとめて読み上げる場合の元ジョブの job_id
+        self.member_ids: tuple[str, ...] = ()
+        # 合成に使う話速。None なら VOICE_SPEED
+        self.speed: float | None = None
+
+    @classmethod
+    def combine(cls, jobs: list[SpeakJob], text: str) -> SpeakJob:
+        """*jobs* をまとめて *text* として読み上げるジョブを作る。
+
+        受付時刻は最も古いジョブに合わせ、time-to-first-audio を
+        最初のメッセージから計測できるようにする。
+        """
+        combined = cls(text)
+        combined.enqueued_at = jobs[0].enqueued_at
+        combined.marks['enqueued'] = combined.enqueued_at
+        combined.member_ids = tuple(job.job_id for job in jobs)
+        deadlines = [job.deadline for job in jobs if job.deadline is not None]
+        combined.deadline = min(deadlines) if deadlines else None
+        return combined
+
+    def mark(self, stage: str) -> float:
+        """*stage* の時刻を記録して返す。既に記録済みなら上書きしない。"""
+        now = time.monotonic()
+        return self.marks.setdefault(stage, now)
+
+    def elapsed(self, start: str, end: str) -> float | None:
+        """2 つの段階間の経過秒数。どちらかが未記録なら None。"""
+        if start not in self.marks or end not in self.marks:
+            return None
+        return self.marks[end] - self.marks[start]
+
+    def to_dict(self) -> dict:
+        """API 応答用の辞書。各段階の時刻は受付からの経過秒数で表す。"""
+        result = {
+            'job_id': self.job_id,
+            'state': self.state,
+            'marks': {stage: t - self.enqueued_at
+                      for stage, t in self.marks.items()},
+        }
+        if self.speed is not None:
+            result['speed'] = self.speed
+        return result
+
+    def __repr__(self) -> str:
+        return f'SpeakJob(job_id={self.job_id!r}, text={self.text!r})'
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import json
+import os
+import threading
+import time
+import uuid
+
+from source.monitoring.metrics import METRICS
+from source.speak.speak_job import SpeakJob
+
+from configuration.communication_settings import (
+    SPEAK_JOURNAL_COMPACT_THRESHOLD,
+)
+
+JOURNAL_COMMITS_TOTAL = METRICS.counter(
+    'live_yukkuri_speak_journal_commits_total',
+    'Number of fsyncs of the speak journal (one per group of records).')
+JOURNAL_RECORDS_TOTAL = METRICS.counter(
+    'live_yukkuri_speak_journal_records_total',
+    'Number of records appended to the speak journal.')
+JOURNAL_RECOVERED_TOTAL = METRICS.counter(
+    'live_yukkuri_speak_journal_recovered_total',
+    'Number of unfinished texts recovered from the journal at start-up.')
+JOURNAL_ERRORS_TOTAL = METRICS.counter(
+    'live_yukkuri_speak_journal_errors_total',
+    'Number of times writing the speak journal failed.')
+
+
+class SpeakJournal:
+    """読み上げキューの受付と完了を追記する、クラッシュに耐えるジャーナル。
+
+    各行は ``{"op": "enqueue", "key": ..., "text": ..., "ttl": ..., "t": ...}``
+    または ``{"op": "done", "key": ...}`` の JSON。受付の記録は fsync が
+    終わるまで呼び出し元を待たせるが、書き出しは専用スレッドが溜まった行を
+    まとめて 1 回の fsync で行う（グループコミット）ため、受付が集中しても
+    fsync の回数は増えない。完了の記録は待たない。
+
+    完了した行が *compact_threshold* 件に達すると、未完了の受付だけを
+    一時ファイルに書き出して置き換える。起動時には前回の未完了の受付を
+    ``recover`` で返す。
+
+    書き出しに失敗する（ディスクが一杯など）と以降は記録できないため、
+    待っている受付と以降の受付は OSError で失敗する。
+    """
+
+    def __init__(self, path: Path,
+                 compact_threshold: int = SPEAK_JOURNAL_COMPACT_THRESHOLD
+                 ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._compact_threshold = compact_threshold
+        self._condition = threading.Condition()
+        # 書き出し待ちの行と、受け付けた行・fsync 済みの行の通し番号
+        self._pending: list[str] = []
+        self._appended = 0
+        self._committed = 0
+        # 未完了の受付（key -> 記録）と、実行中のジョブの job_id -> key
+        self._live: dict[str, dict] = {}
+        self._keys: dict[str, str] = {}
+        self._finished_since_compact = 0
+        self._closed = False
+        # 書き出しに失敗したときの例外
+        self._error: OSError | None = None
+
+        self._recovered, damaged = self._load()
+        if self._finished_since_compact or damaged:
+            # 前回の完了分と、書き込み途中で止まった行を起動時に取り除く
+            self._compact(self._recovered)
+            self._finished_since_compact = 0
+        self._file = self.path.open('a', encoding='utf-8')
+        self._writer = threading.Thread(
+            target=self._writer_loop, daemon=True, name='speak-journal')
+        self._writer.start()
+
+    def _load(self) -> tuple[list[dict], bool]:
+        """ファイルを読み、(未完了の受付, 壊れた行があったか) を返す。"""
+        if not self.path.exists():
+            return [], False
+        damaged = False
+        with self.path.open(encoding='utf-8', errors='replace') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 書き込み途中で止まった最後の行
+                    damaged = True
+                    continue
+                if record.get('op') == 'enqueue':
+                    self._live[record['key']] = record
+                elif record.get('op') == 'done':
+                    if self._live.pop(record.get('key'), None) is not None:
+                        self._finished_since_compact += 1
+        return list(self._live.values()), damaged
+
+    def recover(self) -> list[tuple[str, str, float | None]]:
+        """前回の未完了の受付を (key, text, 残りの ttl) として受付順に返す。
+
+        返すのは最初の呼び出しのみ。各 key は ``adopt`` で新しいジョブに結び付ける。
+        """
+        with self._condition:
+            records, self._recovered = self._recovered, []
+        now = time.time()
+        recovered = []
+        for record in records:
+            ttl = record.get('ttl')
+            if ttl is not None:
+                # 停止していた間も期限は進む
+                ttl = max(0.0, ttl - (now - record.get('t', now)))
+            recovered.append((record['key'], record['text'], ttl))
+        JOURNAL_RECOVERED_TOTAL.inc(len(recovered))
+        return recovered
+
+    def adopt(self, job: SpeakJob, key: str) -> None:
+        """復元した受付 *key* を *job* として読み上げる。"""
+        with self._condition:
+            self._keys[job.job_id] = key
+
+    def record_enqueue(self, job: SpeakJob, ttl: float | None) -> None:
+        """*job* の受付を記録し、ディスクに書き出されるまで待つ。
+
+        Raises:
+            OSError: ジャーナルに書き出せなかった場合
+        """
+        key = uuid.uuid4().hex
+        record: dict = {'op': 'enqueue', 'key': key, 'text': job.text,
+                        't': round(time.time(), 3)}
+        if ttl is not None:
+            record['ttl'] = ttl
+        with self._condition:
+            self._raise_if_failed()
+            self._keys[job.job_id] = key
+            self._live[key] = record
+            seq = self._append_locked(record)
+            while (self._committed < seq and not self._closed
+                   and self._error is None):
+                self._condition.wait()
+            if self._committed < seq and self._error is not None:
+                self._keys.pop(job.job_id, None)
+                self._live.pop(key, None)
+                self._raise_if_failed()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise OSError(
+                f'speak journal is not writable: {self._error}') from self._error
+
+    def record_finished(self, jobs: list[SpeakJob]) -> None:
+        """*jobs* の完了（読み上げ・破棄・取り消し）を記録する。"""
+        with self._condition:
+            for job in jobs:
+                key = self._keys.pop(job.job_id, None)
+                if key is None or self._live.pop(key, None) is None:
+                    continue
+                self._append_locked({'op': 'done', 'key': key})
+                self._finished_since_compact += 1
+
+    def flush(self) -> None:
+        """受け付けた記録がすべてディスクに書き出されるまで待つ。"""
+        with self._condition:
+            while (self._committed < self._appended and not self._closed
+                   and self._error is None):
+                self._condition.wait()
+
+    def close(self) -> None:
+        """残りの記録を書き出してファイルを閉じる。"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        try:
+            self._file.close()
+        except OSError:
+            # 書き出しに失敗した後は残りのバッファも書けない
+            if self._error is None:
+                raise
+
+    def _append_locked(self, record: dict) -> int:
+        if self._closed or self._error is not None:
+            return self._appended
+        self._pending.append(json.dumps(record, ensure_ascii=False,
+                                        separators=(',', ':')) + '\n')
+        self._appended += 1
+        self._condition.notify_all()
+        return self._appended
+
+    def _writer_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending and self._closed:
+                    return
+                batch, self._pending = self._pending, []
+                seq = self._appended
+                compact = (self._finished_since_compact
+                           >= self._compact_threshold)
+                if compact:
+                    # 未完了の受付だけを残す。batch の内容も _live に反映済み
+                    snapshot = list(self._live.values())
+                    self._finished_since_compact = 0
+            try:
+                if compact:
+                    self._file.close()
+                    self._compact(snapshot)
+                    self._file = self.path.open('a', encoding='utf-8')
+                else:
+                    self._file.writelines(batch)
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+            except OSError as exc:
+                print(f'[speak-journal] write failed: {exc}', flush=True)
+                JOURNAL_ERRORS_TOTAL.inc()
+                with self._condition:
+                    self._error = exc
+                    self._pending = []
+                    self._condition.notify_all()
+                return
+            JOURNAL_COMMITS_TOTAL.inc()
+            JOURNAL_RECORDS_TOTAL.inc(len(batch))
+            with self._condition:
+                self._committed = seq
+                self._condition.notify_all()
+
+    def _compact(self, records: list[dict]) -> None:
+        temporary = self.path.with_name(self.path.name + '.tmp')
+        with temporary.open('w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False,
+                                   separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        if os.name != 'nt':
+            # 置き換えたこと自体も書き出す（Windows ではディレクトリを開けない）
+            directory = os.open(self.path.parent, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
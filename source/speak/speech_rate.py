@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import threading
+
+from source.settings.live_settings import LIVE_SETTINGS
+
+from configuration.person_settings import (
+    SPEAK_ADAPTIVE_SPEED_BACKLOG_HIGH,
+    SPEAK_ADAPTIVE_SPEED_BACKLOG_LOW,
+    SPEAK_ADAPTIVE_SPEED_ENABLED,
+    SPEAK_ADAPTIVE_SPEED_MAX_RATIO,
+    SPEAK_ADAPTIVE_SPEED_STEP,
+)
+
+
+class SpeechRateController:
+    """読み上げ待ちの長さに応じて話速を上げ下げする。
+
+    VOICE_SPEED に掛ける倍率を、残りの読み上げ時間（基準の話速に換算した
+    秒数）が *backlog_low* 以下なら 1.0、*backlog_high* 以上なら *max_ratio*
+    とし、その間は線形に補間した値へ 1 回の発話につき *step* ずつ近づける。
+    """
+
+    def __init__(self,
+                 enabled: bool = SPEAK_ADAPTIVE_SPEED_ENABLED,
+                 backlog_low: float = SPEAK_ADAPTIVE_SPEED_BACKLOG_LOW,
+                 backlog_high: float = SPEAK_ADAPTIVE_SPEED_BACKLOG_HIGH,
+                 max_ratio: float = SPEAK_ADAPTIVE_SPEED_MAX_RATIO,
+                 step: float = SPEAK_ADAPTIVE_SPEED_STEP) -> None:
+        if backlog_high <= backlog_low:
+            raise ValueError('backlog_high must be greater than backlog_low')
+        if max_ratio < 1.0:
+            raise ValueError('max_ratio must be at least 1.0')
+        self.enabled = enabled
+        self._backlog_low = backlog_low
+        self._backlog_high = backlog_high
+        self._max_ratio = max_ratio
+        self._step = step
+        self._ratio = 1.0
+        self._lock = threading.Lock()
+
+    @property
+    def ratio(self) -> float:
+        """VOICE_SPEED に掛けている倍率。"""
+        with self._lock:
+            return self._ratio
+
+    def speed(self) -> float:
+        """次の発話の合成に使う話速。"""
+        return LIVE_SETTINGS.current.voice_speed * self.ratio
+
+    def _target_ratio(self, backlog: float) -> float:
+        if backlog <= self._backlog_low:
+            return 1.0
+        if backlog >= self._backlog_high:
+            return self._max_ratio
+        position = ((backlog - self._backlog_low)
+                    / (self._backlog_high - self._backlog_low))
+        return 1.0 + (self._max_ratio - 1.0) * position
+
+    def update(self, backlog_seconds: float) -> float:
+        """残りの推定読み上げ秒数 *backlog_seconds* から倍率を更新し、話速を返す。
+
+        *backlog_seconds* は現在の話速での推定値のため、倍率を掛けて基準の
+        話速での秒数に戻してから目標の倍率を決める（速くしたことで残りが
+        短く見え、すぐに遅く戻るのを防ぐ）。
+        """
+        if not self.enabled:
+            return self.speed()
+        with self._lock:
+            target = self._target_ratio(backlog_seconds * self._ratio)
+            change = max(-self._step, min(self._step, target - self._ratio))
+            self._ratio += change
+        return self.speed()
+
+
+# 読み上げ時間の推定と合成で共有する話速
+SPEECH_RATE = SpeechRateController()
@@ -9,9 +9,12 @@ sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 import json
 import threading
+from collections import deque
 
 from flask import Flask, render_template, send_from_directory, Response, stream_with_context
 
+from source.voice.sound_event import SoundEvent
+
 from configuration.communication_settings import (
     HOST_NAME,
     VISUALIZER_PORT
@@ -20,13 +23,19 @@ from configuration.person_settings import (
     MATERIAL_NAME,
 )
 
+# 1 クライアントあたりの未送信イベント上限。タブが停止した場合などに
+# 古いイベントから捨て、メモリが増え続けないようにする
+VISUALIZER_CLIENT_QUEUE_MAX_SIZE = 256
+
 
 class VisualizeManager:
     def __init__(
         self,
         base_directory: str,
+        port: int = VISUALIZER_PORT,
     ) -> None:
         self._base_directory = base_directory
+        self.port = port
         self._image_directory = os.path.join(
             base_directory, 'material', MATERIAL_NAME)
 
@@ -34,11 +43,15 @@ class VisualizeManager:
             base_directory, 'source', 'visualizer', 'templates')
         self.app = Flask(__name__, template_folder=templates_path)
 
-        # queue for delivering sound events to SSE endpoint
-        self._visualizer_sound_queue: list[dict] = []
+        # per-client queues for delivering sound events to SSE endpoint.
+        # Every connected client (browser, load generator, ...) receives
+        # every event.
+        self._visualizer_sound_queues: list[deque[dict]] = []
         self._visualizer_sound_queue_lock = threading.Lock()
         self._visualizer_sound_queue_condition = threading.Condition(
             self._visualizer_sound_queue_lock)
+        # whether the last control event sent was 'stop'
+        self._stopped = False
 
         self._register_routes()
 
@@ -59,60 +72,108 @@ class VisualizeManager:
         def sound_events():
             @stream_with_context
             def generate():
-                while True:
-                    data = self.wait_and_dequeue_visualizer_sound(timeout=15.0)
-                    if data is None:
-                        yield ': keep-alive\n\n'
-                        continue
-
-                    payload = json.dumps(data, ensure_ascii=False)
-                    yield f'data: {payload}\n\n'
+                sound_queue = self.subscribe_visualizer_sound()
+                try:
+                    while True:
+                        data = self.wait_and_dequeue_visualizer_sound(
+                            timeout=15.0, sound_queue=sound_queue)
+                        if data is None:
+                            yield ': keep-alive\n\n'
+                            continue
+
+                        yield self.sse_message(data)
+                finally:
+                    self.unsubscribe_visualizer_sound(sound_queue)
 
             response = Response(generate(), mimetype='text/event-stream')
             response.headers['Cache-Control'] = 'no-cache'
             response.headers['X-Accel-Buffering'] = 'no'
             return response
 
-    def enqueue_visualizer_sound(self, data: dict) -> None:
+    @staticmethod
+    def sse_message(data: SoundEvent | dict) -> str:
+        """イベントを SSE の ``data:`` メッセージにする。
+
+        SoundEvent は作成済みの文字列を全クライアントで共有し、
+        制御イベントなどの辞書はその都度 JSON にする。
+        """
+        if isinstance(data, SoundEvent):
+            return data.sse_message()
+        payload = json.dumps(data, ensure_ascii=False)
+        return f'data: {payload}\n\n'
+
+    def subscribe_visualizer_sound(self) -> deque[SoundEvent | dict]:
+        """SSE クライアント用のキューを作成して登録する。"""
+        sound_queue: deque[SoundEvent | dict] = deque(
+            maxlen=VISUALIZER_CLIENT_QUEUE_MAX_SIZE)
+        with self._visualizer_sound_queue_condition:
+            self._visualizer_sound_queues.append(sound_queue)
+        return sound_queue
+
+    def unsubscribe_visualizer_sound(
+            self, sound_queue: deque[SoundEvent | dict]) -> None:
         with self._visualizer_sound_queue_condition:
-            self._visualizer_sound_queue.append(data)
-            self._visualizer_sound_queue_condition.notify()
+            try:
+                self._visualizer_sound_queues.remove(sound_queue)
+            except ValueError:
+                pass
+
+    def enqueue_visualizer_sound(self, data: SoundEvent | dict) -> None:
+        with self._visualizer_sound_queue_condition:
+            for sound_queue in self._visualizer_sound_queues:
+                sound_queue.append(data)
+            self._visualizer_sound_queue_condition.notify_all()
 
     def set_voice_output_stop_flag(self, flag: bool) -> None:
         """Notify visualizer clients to stop or resume mouth animation.
 
         When stopping, clear pending sound events and enqueue a control
         event so connected clients can immediately halt mouth animation.
+        Resuming only sends 'resume' after a stop and keeps pending events,
+        so it is cheap to call before every utterance.
         """
+        flag = bool(flag)
         with self._visualizer_sound_queue_condition:
-            # clear pending sound events
-            self._visualizer_sound_queue.clear()
+            if not flag and not self._stopped:
+                return
+            self._stopped = flag
             control = {'control': 'stop'} if flag else {'control': 'resume'}
-            self._visualizer_sound_queue.append(control)
+            for sound_queue in self._visualizer_sound_queues:
+                if flag:
+                    # clear pending sound events
+                    sound_queue.clear()
+                sound_queue.append(control)
             # wake any waiting SSE generator(s)
-            try:
-                self._visualizer_sound_queue_condition.notify_all()
-            except Exception:
-                self._visualizer_sound_queue_condition.notify()
+            self._visualizer_sound_queue_condition.notify_all()
 
-    def wait_and_dequeue_visualizer_sound(self, timeout: float) -> dict | None:
+    def wait_and_dequeue_visualizer_sound(
+            self, timeout: float, sound_queue: deque[SoundEvent | dict]
+    ) -> SoundEvent | dict | None:
         with self._visualizer_sound_queue_condition:
-            if not self._visualizer_sound_queue:
+            if not sound_queue:
                 self._visualizer_sound_queue_condition.wait(timeout=timeout)
 
-            if self._visualizer_sound_queue:
-                return self._visualizer_sound_queue.pop(0)
+            if sound_queue:
+                return sound_queue.popleft()
 
         return None
 
+    def visualizer_queue_size(self) -> int:
+        with self._visualizer_sound_queue_condition:
+            return sum(len(q) for q in self._visualizer_sound_queues)
+
+    def visualizer_client_count(self) -> int:
+        with self._visualizer_sound_queue_condition:
+            return len(self._visualizer_sound_queues)
+
     def print_open_message(self) -> None:
         print(
-            f'\nOpen: http://127.0.0.1:{VISUALIZER_PORT}', flush=True)
+            f'\nOpen: http://127.0.0.1:{self.port}', flush=True)
 
     def run(
         self,
         debug: bool = False,
         use_reloader: bool = False
     ) -> None:
-        self.app.run(debug=debug, host=HOST_NAME, port=VISUALIZER_PORT,
+        self.app.run(debug=debug, host=HOST_NAME, port=self.port,
                      use_reloader=use_reloader)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import json
+import time
+from array import array
+
+# visualizer へ送るキー（この順で JSON に書き出す）
+PUBLIC_KEYS = ('sample_time', 'job_id', 'sound_values', 'mouth_levels',
+               'job_ids', 'audio')
+
+
+class SoundEvent:
+    """口パク用の 1 文ぶんのイベント。
+
+    音量値は ``array('d')`` のまま保持し、VoiceManager のキューから
+    forwarder・各 visualizer クライアントのキューまで同じオブジェクトを
+    渡す。SSE で送る文字列は最初に必要になったときに 1 回だけ作り、
+    すべてのクライアントで共有する。値が None のキーは送らない。
+
+    ``enqueued_at`` は forwarder の遅延計測用で、visualizer へは送らない。
+    """
+
+    __slots__ = (*PUBLIC_KEYS, 'enqueued_at', '_message')
+
+    def __init__(self, sample_time: float, job_id: str | None = None,
+                 sound_values: array | None = None,
+                 mouth_levels: list[list[int]] | None = None,
+                 job_ids: list[str] | None = None,
+                 audio: str | None = None) -> None:
+        self.sample_time = sample_time
+        self.job_id = job_id
+        self.sound_values = sound_values
+        self.mouth_levels = mouth_levels
+        self.job_ids = job_ids
+        self.audio = audio
+        self.enqueued_at = time.monotonic()
+        self._message: str | None = None
+
+    def to_dict(self) -> dict:
+        """visualizer へ送る内容を辞書で返す。"""
+        data: dict = {'sample_time': self.sample_time, 'job_id': self.job_id}
+        if self.sound_values is not None:
+            data['sound_values'] = self.sound_values.tolist()
+        if self.mouth_levels is not None:
+            data['mouth_levels'] = self.mouth_levels
+        if self.job_ids:
+            data['job_ids'] = self.job_ids
+        if self.audio is not None:
+            data['audio'] = self.audio
+        return data
+
+    def sse_message(self) -> str:
+        """``data: {...}\\n\\n`` 形式の SSE メッセージ。"""
+        # 複数のクライアントから同時に呼ばれても結果は同じなのでロックしない
+        if self._message is None:
+            payload = json.dumps(self.to_dict(), ensure_ascii=False)
+            self._message = f'data: {payload}\n\n'
+        return self._message
+
@@ -9,65 +9,418 @@ sys.path.append(str(Path(__file__).resolve().parents[3]))
 
 import atexit
 import io
-import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+import socket
+import threading
 import time
 import wave
+import weakref
+from array import array
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import httpx
-from openai import OpenAI
+
+from source.monitoring.metrics import (
+    TTS_CANCELLED_TOTAL,
+    TTS_DEADLINE_EXCEEDED_TOTAL,
+    TTS_HEDGE_WINS_TOTAL,
+    TTS_HEDGED_TOTAL,
+    TTS_REQUEST_RECENT,
+    TTS_REQUESTS_TOTAL,
+    TTS_WASTED_SECONDS_TOTAL,
+)
+from source.settings.live_settings import LIVE_SETTINGS
+from source.speak.cancellation import CancellationToken, OperationCancelled
+from source.voice.speaker.aquestalk_supervisor import AquesTalkSupervisor
 
 from configuration.person_settings import (
+    AQUESTALK_HEDGE_ENABLED,
+    AQUESTALK_HEDGE_INITIAL_DELAY,
+    AQUESTALK_HEDGE_MIN_DELAY,
+    AQUESTALK_HEDGE_MIN_SAMPLES,
+    AQUESTALK_HEDGE_QUANTILE,
+    AQUESTALK_REQUEST_DEADLINE,
+    AQUESTALK_REQUEST_TIMEOUT,
     AQUESTALK_URL,
-    SERVER_EXE,
     SAMPLE_INTERVAL,
-    VOICE_SCALE_FACTOR,
-    VOICE_SPEED
 )
 
+if TYPE_CHECKING:
+    import httpcore
+
+SERVER_STARTUP_TIMEOUT = 10.0  # seconds
+SERVER_POLL_INTERVAL = 0.05  # seconds
+WARMUP_TEXT = "あ"
+# リクエストを実行するスレッド数（ヘッジの 2 本と、取り消し・期限切れで
+# 切断したリクエストが終わるまでの余裕の分）
+REQUEST_WORKERS = 4
+
+
+class _TrackingBackend:
+    """接続したソケットを *transport* に記録する、httpcore のネットワーク層の包み。
+
+    httpcore の NetworkBackend と同じメソッドを持つ（httpcore は
+    httpx.HTTPTransport を作るときに初めて import される）。
+    """
+
+    def __init__(self, transport: _AbortableTransport,
+                 backend: httpcore.NetworkBackend) -> None:
+        self._transport = transport
+        self._backend = backend
+
+    def connect_tcp(self, *args, **kwargs) -> httpcore.NetworkStream:
+        stream = self._backend.connect_tcp(*args, **kwargs)
+        self._transport.track(stream.get_extra_info('socket'))
+        return stream
+
+    def connect_unix_socket(self, *args, **kwargs) -> httpcore.NetworkStream:
+        return self._backend.connect_unix_socket(*args, **kwargs)
+
+    def sleep(self, seconds: float) -> None:
+        self._backend.sleep(seconds)
+
+
+class _AbortableTransport(httpx.HTTPTransport):
+    """通信中の接続を別のスレッドから ``abort`` で切断できるトランスポート。
+
+    aquestalk-server は合成が終わるまで応答ヘッダーを返さず、その間の
+    読み込みはクライアントを close しても中断されない。接続したソケットを
+    記録しておき、shutdown して読み込みを即座に失敗させる。リクエストの
+    処理（httpx の例外への変換、プロキシ・SSL・接続数の設定）は
+    httpx.HTTPTransport のものをそのまま使う。
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._sockets: weakref.WeakSet = weakref.WeakSet()
+        self._lock = threading.Lock()
+        # 実行中のリクエストのトークン。接続前に取り消された場合に使う
+        self.token: CancellationToken | None = None
+        # httpx は接続プールのネットワーク層を指定できないため差し替える
+        self._pool._network_backend = _TrackingBackend(
+            self, self._pool._network_backend)
+
+    def track(self, sock: socket.socket) -> None:
+        with self._lock:
+            self._sockets.add(sock)
+        # abort の後に接続した場合もすぐに切断する（トークンは abort を
+        # 呼ぶ前に取り消し済みになる）
+        token = self.token
+        if token is not None and token.cancelled:
+            self._shutdown(sock)
+
+    def abort(self) -> None:
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            self._shutdown(sock)
+
+    @staticmethod
+    def _shutdown(sock: socket.socket) -> None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            # 既に閉じている
+            pass
+
+
+class _SpeechClient:
+    """1 つのサーバーへの OpenAI クライアントと、その接続を切断する手段。"""
+
+    def __init__(self, url: str) -> None:
+        # openai の import は重いため、実際に必要になるまで遅らせる
+        from openai import OpenAI
+        self._transport = _AbortableTransport()
+        kwargs = {}
+        if AQUESTALK_REQUEST_TIMEOUT is not None:
+            kwargs['timeout'] = AQUESTALK_REQUEST_TIMEOUT
+        self.openai = OpenAI(
+            api_key="a", base_url=f"{url}/v1", max_retries=0,
+            http_client=httpx.Client(transport=self._transport), **kwargs)
+
+    def begin(self, token: CancellationToken) -> None:
+        """*token* が取り消されたら、以降のリクエストの接続を切断する。"""
+        self._transport.token = token
+        token.add_callback(self._transport.abort)
+
+    def end(self, token: CancellationToken) -> None:
+        token.remove_callback(self._transport.abort)
+        self._transport.token = None
+
+    def close(self) -> None:
+        self.openai.close()
+
 
 class AquesTalkGenerator:
     """Manages the AquesTalk server process and generates speech audio from text."""
 
-    def __init__(self) -> None:
-        self._server_process = subprocess.Popen(
-            [str(SERVER_EXE)],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        atexit.register(self._shutdown_server)
-        self._wait_for_server()
-        self._client = OpenAI(api_key="a", base_url=f"{AQUESTALK_URL}/v1")
-
-    def _shutdown_server(self) -> None:
-        if self._server_process.poll() is None:
-            self._server_process.terminate()
-            try:
-                self._server_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self._server_process.kill()
+    def __init__(self,
+                 server_url: str = AQUESTALK_URL,
+                 launch_server: bool = True,
+                 server_args: list[str] | None = None,
+                 standby_url: str | None = None) -> None:
+        """
+        Args:
+            server_url: AquesTalk 互換サーバーの URL
+            launch_server: False の場合は aquestalk-server.exe を起動せず、
+                既に起動しているサーバー（ベンチマーク用の偽サーバーなど）へ接続する
+            server_args: *server_url* で待ち受けさせるための起動引数
+                （省略時は設定の AQUESTALK_SERVER_ARGS と待機系を使う）
+            standby_url: *launch_server* が False のときにヘッジを送る
+                既に起動している待機系の URL
+        """
+        self._server_url = server_url
+        self._standby_url = standby_url
+        self._supervisor: AquesTalkSupervisor | None = None
+        # クライアントはリクエスト用のスレッドごと・URL ごとに遅延生成する
+        # （切断するときに他のスレッドのリクエストを巻き込まないため）
+        self._local = threading.local()
+        self._executor_lock = threading.Lock()
+        self._request_executor: ThreadPoolExecutor | None = None
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        if launch_server:
+            self._supervisor = AquesTalkSupervisor.from_settings(
+                server_url, server_args)
+            self._supervisor.start()
+            atexit.register(self._supervisor.shutdown)
+
+    def _active_url(self) -> str:
+        if self._supervisor is not None:
+            return self._supervisor.active_url
+        return self._server_url
+
+    def wait_until_ready(self, timeout: float = SERVER_STARTUP_TIMEOUT) -> None:
+        """サーバーの起動を待つ。2 回目以降は即座に戻る。"""
+        with self._ready_lock:
+            if self._ready:
+                return
+            if self._supervisor is not None:
+                self._supervisor.wait_until_healthy(timeout)
+            else:
+                self._wait_for_server(timeout)
+            self._ready = True
 
-    def _wait_for_server(self) -> None:
-        for _ in range(20):
+    def warm_up(self) -> None:
+        """短いテキストを合成し、最初の実リクエストが遅くならないようにする。"""
+        self.wait_until_ready()
+        self.generate_audio(WARMUP_TEXT)
+
+    def close(self) -> None:
+        """リクエスト用のスレッドを終了する。"""
+        with self._executor_lock:
+            executor, self._request_executor = self._request_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _wait_for_server(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
             try:
-                httpx.get(AQUESTALK_URL, timeout=0.5)
-                break
+                httpx.get(self._server_url, timeout=0.5)
+                return
             except Exception:
-                time.sleep(0.5)
-        else:
-            raise RuntimeError("aquestalk-server が起動しませんでした")
-
-    def generate_audio(self, text: str) -> bytes:
-        """Generate WAV audio bytes from text via AquesTalk server."""
-        with self._client.audio.speech.with_streaming_response.create(
-            model="tts-1",
-            voice="f1",
-            input=text,
-            speed=VOICE_SPEED,
-        ) as response:
-            return response.read()
-
-    def extract_sound_values(self, audio_data: bytes, interval: float = SAMPLE_INTERVAL) -> list[float]:
+                time.sleep(SERVER_POLL_INTERVAL)
+        raise RuntimeError("aquestalk-server が起動しませんでした")
+
+    def _client_for(self, url: str) -> _SpeechClient:
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        client = clients.get(url)
+        if client is None:
+            client = clients[url] = _SpeechClient(url)
+        return client
+
+    def _request_audio(self, url: str, text: str,
+                       token: CancellationToken | None = None,
+                       speed: float | None = None,
+                       client: _SpeechClient | None = None) -> bytes:
+        """*url* へ合成を依頼する。*token* が取り消されると接続を切断する。"""
+        client = client or self._client_for(url)
+        if token is not None:
+            client.begin(token)
+        try:
+            if token is not None:
+                token.raise_if_cancelled()
+            with client.openai.audio.speech.with_streaming_response.create(
+                model="tts-1",
+                voice="f1",
+                input=text,
+                speed=speed or LIVE_SETTINGS.current.voice_speed,
+            ) as response:
+                return response.read()
+        except Exception:
+            if token is not None and token.cancelled:
+                raise OperationCancelled() from None
+            raise
+        finally:
+            if token is not None:
+                client.end(token)
+
+    def _generate_with_failover(self, text: str,
+                                token: CancellationToken | None,
+                                speed: float | None = None) -> bytes:
+        url = self._active_url()
+        try:
+            return self._request_audio(url, text, token, speed)
+        except OperationCancelled:
+            raise
+        except Exception:
+            if self._supervisor is None:
+                raise
+            self._supervisor.report_failure(url)
+            retry_url = self._supervisor.wait_until_healthy(
+                SERVER_STARTUP_TIMEOUT)
+            if token is not None:
+                token.raise_if_cancelled()
+            return self._request_audio(retry_url, text, token, speed)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._request_executor is None:
+                self._request_executor = ThreadPoolExecutor(
+                    max_workers=REQUEST_WORKERS,
+                    thread_name_prefix='tts-request')
+            return self._request_executor
+
+    def _hedge_delay(self) -> float:
+        """2 本目のリクエストを送るまでの待ち時間（直近の所要時間の分位点）。"""
+        if TTS_REQUEST_RECENT.count() < AQUESTALK_HEDGE_MIN_SAMPLES:
+            return AQUESTALK_HEDGE_INITIAL_DELAY
+        delay = TTS_REQUEST_RECENT.quantile(AQUESTALK_HEDGE_QUANTILE)
+        return max(AQUESTALK_HEDGE_MIN_DELAY, delay or 0.0)
+
+    def _hedge_url(self) -> str | None:
+        """ヘッジを送る待機系の URL。応答する待機系がなければ None。
+
+        稼働系へ同じリクエストを重ねると、遅くなっているサーバーの負荷を
+        さらに増やすだけなので送らない。
+        """
+        if self._supervisor is not None:
+            return self._supervisor.hedge_url()
+        return self._standby_url
+
+    def _timed(self, request, *args) -> bytes:
+        started = time.monotonic()
+        audio = request(*args)
+        TTS_REQUEST_RECENT.observe(time.monotonic() - started)
+        return audio
+
+    def generate_audio(self, text: str,
+                       token: CancellationToken | None = None,
+                       speed: float | None = None) -> bytes:
+        """Generate WAV audio bytes from text via AquesTalk server.
+
+        *speed* を省略すると VOICE_SPEED で合成する。
+        各リクエストには AQUESTALK_REQUEST_TIMEOUT の期限を設ける。
+        サーバーを監視している場合、失敗時は supervisor に通知し、
+        切り替え・再起動後のサーバーへ 1 回だけ再送する。
+
+        AQUESTALK_HEDGE_ENABLED で待機系がある場合、直近の所要時間の分位点を
+        過ぎても応答がなければ同じリクエストを待機系へ送り、先に届いた応答を
+        使う。
+        全体で AQUESTALK_REQUEST_DEADLINE 秒以内に応答がなければ TimeoutError
+        を送出する。
+
+        *token* が取り消されると応答を待たずに OperationCancelled を送出する。
+        使わなかったリクエスト（取り消し・期限切れ・ヘッジで負けた側）は
+        接続を切断して打ち切り、送信から打ち切りまでの時間を無駄になった
+        合成時間として計上する。
+        """
+        if not self._ready:
+            self.wait_until_ready()
+        if token is not None:
+            token.raise_if_cancelled()
+
+        executor = self._executor()
+        started = time.monotonic()
+        deadline = (started + AQUESTALK_REQUEST_DEADLINE
+                    if AQUESTALK_REQUEST_DEADLINE is not None else None)
+        hedge_at = (started + self._hedge_delay()
+                    if AQUESTALK_HEDGE_ENABLED and self._hedge_url() is not None
+                    else None)
+        finished = threading.Event()
+        # 送ったリクエストと、送った時刻・打ち切るためのトークン
+        attempts: dict[Future[bytes], tuple[float, CancellationToken]] = {}
+
+        def _submit(request, *args) -> None:
+            attempt = CancellationToken()
+            future = executor.submit(self._timed, request, *args, text,
+                                     attempt, speed)
+            future.add_done_callback(lambda _: finished.set())
+            attempts[future] = (time.monotonic(), attempt)
+
+        TTS_REQUESTS_TOTAL.inc()
+        _submit(self._generate_with_failover)
+        primary = next(iter(attempts))
+        if token is not None:
+            token.add_callback(finished.set)
+        winner: Future[bytes] | None = None
+        try:
+            while True:
+                finished.clear()
+                winner = next((f for f in attempts
+                               if f.done() and f.exception() is None), None)
+                if winner is not None or (token is not None
+                                          and token.cancelled):
+                    break
+                if all(f.done() for f in attempts):
+                    # すべて失敗した場合は最初のリクエストの例外を伝える
+                    primary.result()
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    break
+                wait = None if deadline is None else deadline - now
+                if hedge_at is not None and len(attempts) == 1:
+                    if now >= hedge_at:
+                        hedge_at = None
+                        hedge_url = self._hedge_url()
+                        if hedge_url is not None:
+                            TTS_HEDGED_TOTAL.inc()
+                            _submit(self._request_audio, hedge_url)
+                        continue
+                    wait = (hedge_at - now if wait is None
+                            else min(wait, hedge_at - now))
+                finished.wait(wait)
+        finally:
+            if token is not None:
+                token.remove_callback(finished.set)
+
+        if winner is not None:
+            if winner is not primary:
+                TTS_HEDGE_WINS_TOTAL.inc()
+            self._discard(attempts, winner)
+            return winner.result()
+        self._discard(attempts, None)
+        if token is not None and token.cancelled:
+            TTS_CANCELLED_TOTAL.inc()
+            raise OperationCancelled()
+        TTS_DEADLINE_EXCEEDED_TOTAL.inc()
+        raise TimeoutError(
+            f'no TTS response within {AQUESTALK_REQUEST_DEADLINE} seconds')
+
+    @staticmethod
+    def _discard(attempts: dict[Future[bytes], tuple[float, CancellationToken]],
+                 winner: Future[bytes] | None) -> None:
+        """使わないリクエストを打ち切り、その所要時間を無駄な合成時間として計上する。"""
+        for future, (submitted_at, attempt) in attempts.items():
+            if future is winner:
+                continue
+            attempt.cancel()
+
+            def _count_wasted(done: Future[bytes],
+                              submitted_at: float = submitted_at) -> None:
+                error = done.exception()
+                # 失敗したリクエストは合成できていないので数えない
+                if error is None or isinstance(error, OperationCancelled):
+                    TTS_WASTED_SECONDS_TOTAL.inc(
+                        time.monotonic() - submitted_at)
+
+            future.add_done_callback(_count_wasted)
+
+    def extract_sound_values(self, audio_data: bytes, interval: float = SAMPLE_INTERVAL) -> array:
         """Extract per-interval volume samples from WAV bytes."""
         audio_stream = io.BytesIO(audio_data)
         with wave.open(audio_stream, 'rb') as wf:
@@ -77,7 +430,7 @@ class AquesTalkGenerator:
             n_frames = wf.getnframes()
             play_time = n_frames / framerate
 
-            volumes = []
+            volumes = array('d')
             for i in range(int(play_time / interval) + 1):
                 time_sec = i * interval
                 target_frame = int(time_sec * framerate)
@@ -106,14 +459,22 @@ class AquesTalkGenerator:
 
         return volumes
 
-    def scale(self, values: list[float]) -> list[float]:
-        """scale values to 0–1 range by dividing by the maximum."""
-        max_val = max(values) if values else 0
+    def scale(self, values: array) -> array:
+        """scale values to 0–1 range by dividing by the maximum.
+
+        The result is an ``array('d')`` that is passed unchanged to the
+        visualizer inside a SoundEvent.
+        """
+        # numpy の import は重いため、実際に必要になるまで遅らせる
+        import numpy as np
+        samples = np.asarray(values, dtype=np.float64)
+        max_val = samples.max() if len(samples) else 0
         if max_val == 0:
-            return [0.0] * len(values)
-        return [v / max_val * VOICE_SCALE_FACTOR for v in values]
+            return array('d', bytes(samples.nbytes))
+        factor = LIVE_SETTINGS.current.voice_scale_factor
+        return array('d', (samples / max_val * factor).tobytes())
 
-    def speak(self, text: str, interval: float = SAMPLE_INTERVAL) -> tuple[list[float], float]:
+    def speak(self, text: str, interval: float = SAMPLE_INTERVAL) -> tuple[array, float]:
         """Generate audio from text and return (scaled_sound_values, sample_time)."""
         audio_data = self.generate_audio(text)
         sound_values = self.extract_sound_values(audio_data, interval)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+import subprocess
+import threading
+import time
+
+import httpx
+
+from source.monitoring.metrics import METRICS
+
+from configuration.person_settings import (
+    AQUESTALK_HEALTH_CHECK_INTERVAL,
+    AQUESTALK_HEALTH_FAILURE_THRESHOLD,
+    AQUESTALK_RESTART_BACKOFF_INITIAL,
+    AQUESTALK_RESTART_BACKOFF_MAX,
+    AQUESTALK_SERVER_ARGS,
+    AQUESTALK_STANDBY_SERVER_ARGS,
+    AQUESTALK_STANDBY_URL,
+    AQUESTALK_URL,
+    SERVER_EXE,
+)
+
+HEALTH_PROBE_TIMEOUT = 0.5  # seconds
+STARTUP_POLL_INTERVAL = 0.05  # seconds
+SHUTDOWN_TIMEOUT = 5.0  # seconds
+# 起動直後、応答しなくても hung とみなさない時間
+SERVER_STARTUP_GRACE = 10.0  # seconds
+
+RESTARTS_TOTAL = METRICS.counter(
+    'live_yukkuri_tts_server_restarts_total',
+    'Number of aquestalk-server restarts by the supervisor.')
+FAILOVERS_TOTAL = METRICS.counter(
+    'live_yukkuri_tts_server_failovers_total',
+    'Number of switches to the standby aquestalk-server.')
+
+
+class _ServerInstance:
+    """監視対象の aquestalk-server プロセス 1 つ分の状態。"""
+
+    def __init__(self, url: str, command: list[str]) -> None:
+        self.url = url
+        self.command = command
+        self.process: subprocess.Popen | None = None
+        self.healthy = False
+        self.consecutive_failures = 0
+        self.restart_backoff = AQUESTALK_RESTART_BACKOFF_INITIAL
+        self.next_restart_at = 0.0
+        self.spawned_at = 0.0
+
+    def spawn(self) -> None:
+        self.process = subprocess.Popen(
+            self.command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.healthy = False
+        self.consecutive_failures = 0
+        self.spawned_at = time.monotonic()
+
+    def terminate(self) -> None:
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+class AquesTalkSupervisor:
+    """aquestalk-server プロセスを監視し、異常時に自動で再起動する。
+
+    - 一定間隔でヘルスチェックを行い、応答しない・終了したプロセスを再起動する。
+      連続して失敗した場合は指数バックオフで再起動間隔を延ばす。
+    - 待機系（warm standby）を設定した場合は、稼働系の異常時に即座に切り替える。
+    - リクエスト失敗を ``report_failure`` で通知すると、次の定期チェックを待たずに
+      確認・切り替えを行う。
+    """
+
+    def __init__(self, instances: list[tuple[str, list[str]]]) -> None:
+        """
+        Args:
+            instances: (URL, 起動コマンド) のリスト。先頭が稼働系、以降が待機系
+        """
+        self._instances = [_ServerInstance(url, command)
+                           for url, command in instances]
+        self._active_index = 0
+        self._lock = threading.Lock()
+        self._healthy_condition = threading.Condition(self._lock)
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        METRICS.set_gauge_callback(
+            'live_yukkuri_tts_server_healthy',
+            'Whether the active aquestalk-server answers health probes.',
+            lambda: float(self.is_healthy()))
+
+    @classmethod
+    def from_settings(cls, url: str = AQUESTALK_URL,
+                      server_args: list[str] | None = None
+                      ) -> AquesTalkSupervisor:
+        """設定どおりのサーバーを監視する。
+
+        *server_args* を指定すると、*url* で待ち受けるよう起動引数を
+        差し替えた 1 台だけを起動する（待機系は使わない）。
+        """
+        if server_args is not None:
+            return cls([(url, [str(SERVER_EXE), *server_args])])
+        instances = [(url, [str(SERVER_EXE), *AQUESTALK_SERVER_ARGS])]
+        if AQUESTALK_STANDBY_URL:
+            instances.append((AQUESTALK_STANDBY_URL,
+                              [str(SERVER_EXE), *AQUESTALK_STANDBY_SERVER_ARGS]))
+        return cls(instances)
+
+    @property
+    def active_url(self) -> str:
+        with self._lock:
+            return self._instances[self._active_index].url
+
+    def hedge_url(self) -> str | None:
+        """稼働系以外で応答している待機系の URL。なければ None。"""
+        with self._lock:
+            for index, instance in enumerate(self._instances):
+                if index != self._active_index and instance.healthy:
+                    return instance.url
+        return None
+
+    def is_healthy(self) -> bool:
+        with self._lock:
+            return self._instances[self._active_index].healthy
+
+    def start(self) -> None:
+        for instance in self._instances:
+            instance.spawn()
+        self._thread = threading.Thread(
+            target=self._monitor_loop,
+            daemon=True,
+            name='aquestalk-supervisor',
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=SHUTDOWN_TIMEOUT)
+        for instance in self._instances:
+            instance.terminate()
+
+    def wait_until_healthy(self, timeout: float) -> str:
+        """稼働系が応答するまで待ち、その URL を返す。"""
+        deadline = time.monotonic() + timeout
+        with self._healthy_condition:
+            while not self._instances[self._active_index].healthy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError("aquestalk-server が起動しませんでした")
+                self._healthy_condition.wait(remaining)
+            return self._instances[self._active_index].url
+
+    def report_failure(self, url: str) -> None:
+        """*url* へのリクエストが失敗したことを通知する。
+
+        待機系が正常なら即座に切り替え、稼働系はすぐに再確認させる。
+        """
+        with self._healthy_condition:
+            for instance in self._instances:
+                if instance.url == url:
+                    instance.healthy = False
+            self._failover_locked()
+        self._wake_event.set()
+
+    # ------------------------------------------------------------------
+    # monitoring
+    # ------------------------------------------------------------------
+
+    def _failover_locked(self) -> None:
+        active = self._instances[self._active_index]
+        if active.healthy:
+            return
+        for index, instance in enumerate(self._instances):
+            if index != self._active_index and instance.healthy:
+                print(f'[aquestalk-supervisor] failover {active.url} -> '
+                      f'{instance.url}', flush=True)
+                self._active_index = index
+                FAILOVERS_TOTAL.inc()
+                self._healthy_condition.notify_all()
+                return
+
+    @staticmethod
+    def _probe(instance: _ServerInstance) -> bool:
+        if not instance.is_running():
+            return False
+        try:
+            httpx.get(instance.url, timeout=HEALTH_PROBE_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    def _check(self, instance: _ServerInstance) -> None:
+        healthy = self._probe(instance)
+        now = time.monotonic()
+        with self._healthy_condition:
+            if healthy:
+                instance.healthy = True
+                instance.consecutive_failures = 0
+                instance.restart_backoff = AQUESTALK_RESTART_BACKOFF_INITIAL
+                self._healthy_condition.notify_all()
+                return
+
+            instance.consecutive_failures += 1
+            instance.healthy = False
+            self._failover_locked()
+
+            crashed = not instance.is_running()
+            # 起動直後は応答しなくても猶予を与える
+            hung = (instance.consecutive_failures
+                    >= AQUESTALK_HEALTH_FAILURE_THRESHOLD
+                    and now - instance.spawned_at >= SERVER_STARTUP_GRACE)
+            if not (crashed or hung) or now < instance.next_restart_at:
+                return
+            instance.next_restart_at = now + instance.restart_backoff
+            instance.restart_backoff = min(
+                instance.restart_backoff * 2, AQUESTALK_RESTART_BACKOFF_MAX)
+
+        print(f'[aquestalk-supervisor] restarting {instance.url}', flush=True)
+        instance.terminate()
+        instance.spawn()
+        RESTARTS_TOTAL.inc()
+
+    def _monitor_loop(self) -> None:
+        while not self._stop_event.is_set():
+            for instance in self._instances:
+                self._check(instance)
+            with self._lock:
+                all_healthy = all(i.healthy for i in self._instances)
+            interval = (AQUESTALK_HEALTH_CHECK_INTERVAL if all_healthy
+                        else STARTUP_POLL_INTERVAL)
+            self._wake_event.wait(interval)
+            self._wake_event.clear()
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+import io
+import threading
+import time
+import wave
+from typing import Protocol
+
+import numpy as np
+
+from configuration.communication_settings import (
+    AUDIO_MIXER_BLOCK_FRAMES,
+    AUDIO_MIXER_CHANNELS,
+    AUDIO_MIXER_SAMPLE_RATE,
+)
+
+# 音源の量子化ビット数ごとの dtype と、-1〜1 に正規化するための値
+_SAMPLE_FORMATS = {
+    1: (np.uint8, 128.0),
+    2: (np.dtype('<i2'), 32768.0),
+    4: (np.dtype('<i4'), 2147483648.0),
+}
+
+
+def decode_wav(audio_data: bytes) -> tuple[np.ndarray, int]:
+    """WAV を (フレーム数 × チャンネル数) の float32 配列とサンプリング周波数にする。"""
+    with wave.open(io.BytesIO(audio_data), 'rb') as wf:
+        n_channels = wf.getnchannels()
+        sampwidth = wf.getsampwidth()
+        framerate = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+    if sampwidth not in _SAMPLE_FORMATS:
+        raise ValueError(f'unsupported sample width: {sampwidth}')
+    dtype, scale = _SAMPLE_FORMATS[sampwidth]
+    samples = np.frombuffer(frames, dtype=dtype).astype(np.float32)
+    if sampwidth == 1:
+        samples -= 128.0
+    samples /= scale
+    return samples.reshape(-1, n_channels), framerate
+
+
+def convert(samples: np.ndarray, sample_rate: int, target_rate: int,
+            target_channels: int) -> np.ndarray:
+    """チャンネル数とサンプリング周波数をミキサーの形式にそろえる。
+
+    チャンネル数はモノラルに平均してから複製し、周波数は線形補間で変換する。
+    """
+    if samples.shape[1] != target_channels:
+        mono = samples.mean(axis=1, keepdims=True)
+        samples = np.repeat(mono, target_channels, axis=1)
+    if sample_rate != target_rate and len(samples) > 0:
+        n_out = max(1, round(len(samples) * target_rate / sample_rate))
+        positions = np.arange(n_out) * (sample_rate / target_rate)
+        source = np.arange(len(samples))
+        samples = np.stack([np.interp(positions, source, samples[:, c])
+                            for c in range(samples.shape[1])], axis=1)
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+class AudioSink(Protocol):
+    """ミックス結果（16bit PCM）の出力先。``write`` は再生が追いつくまでブロックする。"""
+
+    def write(self, pcm: bytes) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SoundDeviceSink:
+    """sounddevice の出力ストリームへ書き出す。"""
+
+    def __init__(self, sample_rate: int = AUDIO_MIXER_SAMPLE_RATE,
+                 channels: int = AUDIO_MIXER_CHANNELS,
+                 block_frames: int = AUDIO_MIXER_BLOCK_FRAMES) -> None:
+        # 任意の依存のため、ミキサーを使う場合にのみ import する
+        import sounddevice
+        self._stream = sounddevice.RawOutputStream(
+            samplerate=sample_rate, channels=channels, dtype='int16',
+            blocksize=block_frames)
+        self._stream.start()
+
+    def write(self, pcm: bytes) -> None:
+        self._stream.write(pcm)
+
+    def close(self) -> None:
+        self._stream.stop()
+        self._stream.close()
+
+
+class MixerStream:
+    """ミキサーで再生中の 1 つの音源。"""
+
+    __slots__ = ('name', 'gain', 'samples', 'position', 'stopped',
+                 'started_at', '_started', '_done')
+
+    def __init__(self, name: str, samples: np.ndarray, gain: float) -> None:
+        self.name = name
+        self.gain = gain
+        self.samples = samples
+        self.position = 0
+        self.stopped = False
+        self.started_at: float | None = None
+        self._started = threading.Event()
+        self._done = threading.Event()
+
+    def _mark_started(self, now: float) -> None:
+        self.started_at = now
+        self._started.set()
+
+    def _finish(self, stopped: bool = False) -> None:
+        self.stopped = stopped
+        self._done.set()
+
+    def wait_started(self, timeout: float | None = None) -> bool:
+        return self._started.wait(timeout)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """再生し終えるか停止されるまで待つ。最後まで再生できたら True。"""
+        return self._done.wait(timeout) and not self.stopped
+
+
+class AudioMixer:
+    """複数の PCM 音源を一定サイズのブロックごとに合成し、1 つの出力先へ書き出す。
+
+    音源ごとに音量（gain）を指定でき、名前を指定して個別に停止できる。
+    音源は追加時にミキサーのサンプリング周波数・チャンネル数へ変換する。
+    再生する音源がない間は出力スレッドは待機し、CPU を使わない。
+    """
+
+    def __init__(self, sink: AudioSink,
+                 sample_rate: int = AUDIO_MIXER_SAMPLE_RATE,
+                 channels: int = AUDIO_MIXER_CHANNELS,
+                 block_frames: int = AUDIO_MIXER_BLOCK_FRAMES) -> None:
+        self._sink = sink
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_frames = block_frames
+        self._streams: list[MixerStream] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> AudioMixer:
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._render_loop, daemon=True, name='audio-mixer')
+                self._thread.start()
+        return self
+
+    def add(self, audio_data: bytes, name: str = 'default',
+            gain: float = 1.0) -> MixerStream:
+        """WAV を音源として追加し、次のブロックから再生を始める。"""
+        samples, sample_rate = decode_wav(audio_data)
+        stream = MixerStream(
+            name, convert(samples, sample_rate, self.sample_rate,
+                          self.channels), gain)
+        with self._condition:
+            self._streams.append(stream)
+            self._condition.notify()
+        return stream
+
+    def set_gain(self, name: str, gain: float) -> None:
+        with self._condition:
+            for stream in self._streams:
+                if stream.name == name:
+                    stream.gain = gain
+
+    def stop(self, name: str | None = None) -> int:
+        """*name* の音源（省略時はすべて）を停止し、停止した数を返す。"""
+        with self._condition:
+            stopped = [s for s in self._streams
+                       if name is None or s.name == name]
+            self._streams = [s for s in self._streams if s not in stopped]
+        for stream in stopped:
+            stream._finish(stopped=True)
+        return len(stopped)
+
+    def active_count(self) -> int:
+        with self._condition:
+            return len(self._streams)
+
+    def close(self) -> None:
+        self.stop()
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self._sink.close()
+
+    def mix_block(self) -> tuple[bytes, list[MixerStream]]:
+        """再生中の音源を 1 ブロック分合成する。
+
+        Returns:
+            (16bit PCM, このブロックで最後まで再生した音源)
+        """
+        block = np.zeros((self.block_frames, self.channels), dtype=np.float32)
+        now = time.monotonic()
+        finished: list[MixerStream] = []
+        with self._condition:
+            streams = list(self._streams)
+        for stream in streams:
+            if stream.started_at is None:
+                stream._mark_started(now)
+            chunk = stream.samples[stream.position:
+                                   stream.position + self.block_frames]
+            block[:len(chunk)] += chunk * stream.gain
+            stream.position += self.block_frames
+            if stream.position >= len(stream.samples):
+                finished.append(stream)
+        if finished:
+            with self._condition:
+                self._streams = [s for s in self._streams
+                                 if s not in finished]
+        np.clip(block, -1.0, 1.0, out=block)
+        return (block * 32767.0).astype('<i2').tobytes(), finished
+
+    def _render_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._streams and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+            pcm, finished = self.mix_block()
+            self._sink.write(pcm)
+            # 最後のブロックを出力先へ渡してから再生完了を通知する
+            for stream in finished:
+                stream._finish()
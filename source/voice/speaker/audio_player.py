@@ -10,16 +10,22 @@ sys.path.append(str(Path(__file__).resolve().parents[2]))
 sys.path.append(str(Path(__file__).resolve().parents[3]))
 
 import multiprocessing
-import winsound
 import httpx
 from flask import Flask, jsonify, request
 
 from configuration.communication_settings import (
+    AUDIO_PLAYER_BACKEND,
     AUDIO_PLAYER_PORT,
     HOST_NAME
 )
+from source.monitoring.metrics import STAGE_SECONDS
+from source.speak.speak_job import SpeakJob
 
 PLAY_TIMEOUT_SECONDS = 5.0
+SERVER_STARTUP_TIMEOUT = 4.0
+SERVER_POLL_INTERVAL = 0.02
+# mixer 再生で音源名を指定しなかった場合の名前
+DEFAULT_STREAM_NAME = 'voice'
 
 
 app = Flask(__name__)
@@ -27,6 +33,8 @@ _server_lock = threading.Lock()
 _server_thread: threading.Thread | None = None
 _current_proc_lock = threading.Lock()
 _current_proc: multiprocessing.Process | None = None
+_mixer_lock = threading.Lock()
+_mixer = None  # AudioMixer（AUDIO_PLAYER_BACKEND = "mixer" のとき遅延生成）
 
 
 def _play_worker(audio_bytes: bytes, result_queue: multiprocessing.Queue) -> None:
@@ -35,6 +43,8 @@ def _play_worker(audio_bytes: bytes, result_queue: multiprocessing.Queue) -> Non
     再生結果を *result_queue* に True(成功) / False(失敗) で通知する。
     """
     try:
+        # Windows 専用モジュールのため、再生プロセス内でのみ import する
+        import winsound
         winsound.PlaySound(audio_bytes, winsound.SND_MEMORY)
         result_queue.put(True)
     except Exception:
@@ -49,12 +59,54 @@ def health() -> tuple[dict[str, str], int]:
     return {'status': 'ok'}, 200
 
 
+def _get_mixer():
+    global _mixer
+    with _mixer_lock:
+        if _mixer is None:
+            # numpy / sounddevice は mixer を使う場合にのみ import する
+            from source.voice.speaker.audio_mixer import AudioMixer, SoundDeviceSink
+            _mixer = AudioMixer(SoundDeviceSink()).start()
+        return _mixer
+
+
 @app.route('/play', methods=['POST'])
 def play_audio() -> tuple[dict[str, bool | str], int]:
+    """WAV を再生し、再生し終えてから応答する。
+
+    Query params (mixer のみ):
+        stream: 音源名。同じ名前の音源は /stop でまとめて停止できる
+        gain: 音量の倍率（既定 1.0）
+    """
     audio_bytes = request.get_data()
     if not audio_bytes:
         return {'status': 'error', 'message': 'No audio data provided'}, 400
+    if AUDIO_PLAYER_BACKEND == 'mixer':
+        try:
+            gain = float(request.args.get('gain', 1.0))
+        except ValueError:
+            return {'status': 'error', 'message': 'invalid gain'}, 400
+        return _play_mixed(
+            audio_bytes, request.args.get('stream', DEFAULT_STREAM_NAME), gain)
+    return _play_in_process(audio_bytes)
+
+
+def _play_mixed(audio_bytes: bytes, name: str,
+                gain: float) -> tuple[dict[str, bool | str], int]:
+    """ミキサーに音源を追加し、再生し終えるか停止されるまで待つ。"""
+    request_started = time.monotonic()
+    try:
+        stream = _get_mixer().add(audio_bytes, name, gain)
+    except Exception as exc:
+        return {'status': 'error', 'message': str(exc)}, 400
+    stream.wait_started()
+    spawn_time = time.monotonic() - request_started
+    played = stream.wait()
+    play_time = time.monotonic() - request_started - spawn_time
+    return {'status': 'success', 'played': played,
+            'spawn_time': spawn_time, 'play_time': play_time}, 200
+
 
+def _play_in_process(audio_bytes: bytes) -> tuple[dict[str, bool | str], int]:
     result_queue: multiprocessing.Queue = multiprocessing.Queue()
     proc = multiprocessing.Process(
         target=_play_worker, args=(audio_bytes, result_queue), daemon=True
@@ -63,8 +115,11 @@ def play_audio() -> tuple[dict[str, bool | str], int]:
         global _current_proc
         _current_proc = proc
 
+    request_started = time.monotonic()
     proc.start()
+    spawn_time = time.monotonic() - request_started
     proc.join()
+    play_time = time.monotonic() - request_started - spawn_time
 
     try:
         played = bool(result_queue.get_nowait())
@@ -74,12 +129,19 @@ def play_audio() -> tuple[dict[str, bool | str], int]:
     with _current_proc_lock:
         _current_proc = None
 
-    return {'status': 'success', 'played': played}, 200
+    return {'status': 'success', 'played': played,
+            'spawn_time': spawn_time, 'play_time': play_time}, 200
 
 
 @app.route('/stop', methods=['POST'])
 def stop_audio() -> tuple[dict[str, bool | str], int]:
-    """外部から再生中のプロセスを強制終了するエンドポイント。"""
+    """外部から再生中のプロセスを強制終了するエンドポイント。
+
+    mixer では ``stream`` を指定するとその音源だけを停止する。
+    """
+    if AUDIO_PLAYER_BACKEND == 'mixer':
+        stopped = _get_mixer().stop(request.args.get('stream'))
+        return {'status': 'ok', 'stopped': stopped > 0}, 200
     try:
         with _current_proc_lock:
             global _current_proc
@@ -99,88 +161,131 @@ def stop_audio() -> tuple[dict[str, bool | str], int]:
         return {'status': 'error', 'message': str(exc)}, 500
 
 
-def _is_server_alive() -> bool:
+def _is_server_alive(port: int = AUDIO_PLAYER_PORT) -> bool:
     try:
         response = httpx.get(
-            f'http://127.0.0.1:{AUDIO_PLAYER_PORT}/health', timeout=0.5)
+            f'http://127.0.0.1:{port}/health', timeout=0.5)
         return response.status_code == 200
     except Exception:
         return False
 
 
-def _run_audio_server() -> None:
+def _run_audio_server(port: int = AUDIO_PLAYER_PORT) -> None:
     app.run(
         host=HOST_NAME,
-        port=AUDIO_PLAYER_PORT,
+        port=port,
         debug=False,
         use_reloader=False,
         threaded=True,
     )
 
 
-def ensure_audio_server_running() -> None:
+def start_audio_server(port: int = AUDIO_PLAYER_PORT) -> None:
+    """*port* で再生サーバーのスレッドを起動する（起動完了は待たない）。"""
     global _server_thread
 
-    if _is_server_alive():
-        return
-
     with _server_lock:
-        if _is_server_alive():
+        if _server_thread is not None and _server_thread.is_alive():
+            return
+        # 別プロセスで既に起動している場合はそちらを使う
+        if _is_server_alive(port):
             return
 
-        if _server_thread is None or not _server_thread.is_alive():
-            _server_thread = threading.Thread(
-                target=_run_audio_server,
-                daemon=True,
-                name='audio-player-server',
-            )
-            _server_thread.start()
+        _server_thread = threading.Thread(
+            target=_run_audio_server,
+            args=(port,),
+            daemon=True,
+            name='audio-player-server',
+        )
+        _server_thread.start()
+
+
+def ensure_audio_server_running(timeout: float = SERVER_STARTUP_TIMEOUT,
+                                port: int = AUDIO_PLAYER_PORT) -> None:
+    start_audio_server(port)
 
-    for _ in range(40):
-        if _is_server_alive():
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if _is_server_alive(port):
             return
-        time.sleep(0.1)
+        time.sleep(SERVER_POLL_INTERVAL)
 
     raise RuntimeError('audio player server failed to start')
 
 
 class AudioPlayer:
-    """Flask の再生サーバーへ音声データを送信して再生するクラス。"""
+    """Flask の再生サーバーへ音声データを送信して再生するクラス。
 
-    def __init__(self) -> None:
-        ensure_audio_server_running()
-        self._play_url = f'http://127.0.0.1:{AUDIO_PLAYER_PORT}/play'
+    *port* の再生サーバーがなければこのプロセス内で起動する。ルーターの
+    ワーカーはそれぞれ別のポートを使い、停止要求が他のルームの再生を
+    止めないようにする。
+    """
+
+    def __init__(self, port: int = AUDIO_PLAYER_PORT) -> None:
+        self._port = port
+        start_audio_server(port)
+        self._play_url = f'http://127.0.0.1:{port}/play'
+        self._ready = False
+
+    def wait_until_ready(self) -> None:
+        """再生サーバーが応答するまで待つ。2 回目以降は即座に戻る。"""
+        if not self._ready:
+            ensure_audio_server_running(port=self._port)
+            self._ready = True
 
-    def stop(self) -> bool:
+    def stop(self, stream: str | None = None) -> bool:
         """再生中のプロセスを強制終了するリクエストを送る。
 
+        mixer では *stream* を指定するとその音源だけを停止する。
+
         Returns:
             True: 再生停止要求を送信できた
             False: 失敗
         """
-        stop_url = f'http://127.0.0.1:{AUDIO_PLAYER_PORT}/stop'
+        stop_url = f'http://127.0.0.1:{self._port}/stop'
         try:
-            response = httpx.post(stop_url, timeout=1.0)
+            response = httpx.post(
+                stop_url, timeout=1.0,
+                params={'stream': stream} if stream is not None else None)
             response.raise_for_status()
             data = response.json()
             return bool(data.get('stopped', False))
         except Exception:
             return False
 
-    def play(self, audio_bytes: bytes) -> bool:
+    def play(self, audio_bytes: bytes, job: SpeakJob | None = None,
+             stream: str | None = None, gain: float | None = None) -> bool:
         """WAV データを再生サーバーへ送信して再生する。
 
+        *job* を渡すと再生開始時刻を ``first_audio`` として記録する。
+        mixer では *stream* / *gain* で音源名と音量を指定でき、
+        他の音源と重ねて再生される。
+
         Returns:
             True: 再生成功  False: 再生失敗
         """
+        self.wait_until_ready()
+        request_started = time.monotonic()
+        params: dict[str, str] = {}
+        if stream is not None:
+            params['stream'] = stream
+        if gain is not None:
+            params['gain'] = str(gain)
         response = httpx.post(
             self._play_url,
             content=audio_bytes,
+            params=params,
             timeout=PLAY_TIMEOUT_SECONDS,
         )
         response.raise_for_status()
 
         data = response.json()
+        spawn_time = float(data.get('spawn_time', 0.0))
+        play_time = float(data.get('play_time', 0.0))
+        STAGE_SECONDS.observe(spawn_time, stage='play_spawn')
+        STAGE_SECONDS.observe(play_time, stage='playback')
+        if job is not None:
+            job.marks.setdefault('first_audio', request_started + spawn_time)
         return bool(data.get('played', False))
 
 
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+import io
+import threading
+import time
+import wave
+
+from source.speak.speak_job import SpeakJob
+
+# ブラウザ側でデコード・スケジュールが間に合うよう、再生位置より先に送る秒数
+BROWSER_AUDIO_LEAD_SECONDS = 0.5
+
+
+def wav_duration(audio_bytes: bytes) -> float:
+    with wave.open(io.BytesIO(audio_bytes), 'rb') as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+class BrowserAudioSink:
+    """ブラウザ再生モード用の出力先。AudioPlayer と同じインターフェースを持つ。
+
+    音声そのものは口パクイベントに添付して visualizer へ送られ、ブラウザの
+    Web Audio で再生される。このクラスはホストで音を出さず、ブラウザ側の
+    再生位置に合わせて次の文の送出を待つ（ペーシング）だけを行う。
+    """
+
+    # VoiceManager はこの属性を見て口パクイベントに WAV を添付する
+    delivers_audio_to_browser = True
+
+    def __init__(self, lead_seconds: float = BROWSER_AUDIO_LEAD_SECONDS) -> None:
+        self._lead_seconds = lead_seconds
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        # 送出済み音声がブラウザで再生し終わる推定時刻（time.monotonic 基準）
+        self._playhead = 0.0
+
+    def wait_until_ready(self) -> None:
+        pass
+
+    def play(self, audio_bytes: bytes, job: SpeakJob | None = None) -> bool:
+        """再生開始時刻を記録し、先行送出分を残して再生時間ぶん待つ。"""
+        duration = wav_duration(audio_bytes)
+        self._stop_event.clear()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._playhead)
+            self._playhead = start + duration
+            release_at = self._playhead - self._lead_seconds
+        if job is not None:
+            job.marks.setdefault('first_audio', start)
+        # 停止要求で待機を打ち切る。停止は失敗ではないので True を返す
+        self._stop_event.wait(max(0.0, release_at - time.monotonic()))
+        return True
+
+    def stop(self) -> bool:
+        with self._lock:
+            self._playhead = 0.0
+        self._stop_event.set()
+        return True
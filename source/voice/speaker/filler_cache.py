@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+import itertools
+import threading
+from array import array
+
+from source.voice.speaker.voice_generator import VoiceGenerator
+
+from configuration.person_settings import (
+    FILLER_TEXTS,
+)
+
+
+class FillerCache:
+    """合成が遅いときにつなぎとして再生する短い音声を、あらかじめ合成して保持する。
+
+    ``render`` で *texts* を合成・解析しておき、``next`` で順番に返す。
+    合成前は None を返すため、つなぎの音声は流れない。
+    """
+
+    def __init__(self, voice_generator: VoiceGenerator,
+                 texts: list[str] = FILLER_TEXTS) -> None:
+        self._voice_generator = voice_generator
+        self._texts = list(texts)
+        self._sounds: list[tuple[bytes, array, float]] = []
+        self._cycle: itertools.cycle | None = None
+        self._lock = threading.Lock()
+
+    def render(self) -> None:
+        """つなぎの音声を合成する（音声合成のウォームアップ後に呼ぶ）。"""
+        sounds = [self._voice_generator.analyze(
+            self._voice_generator.synthesize(text)) for text in self._texts]
+        with self._lock:
+            self._sounds = sounds
+            self._cycle = itertools.cycle(sounds) if sounds else None
+
+    def next(self) -> tuple[bytes, array, float] | None:
+        """次に再生するつなぎの音声。合成前なら None。"""
+        with self._lock:
+            return next(self._cycle) if self._cycle is not None else None
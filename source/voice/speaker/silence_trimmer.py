@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+import io
+import wave
+
+import numpy as np
+
+from configuration.person_settings import (
+    SILENCE_TRIM_MARGIN,
+    SILENCE_TRIM_THRESHOLD,
+)
+
+_SAMPLE_DTYPES = {1: np.uint8, 2: np.dtype('<i2'), 4: np.dtype('<i4')}
+
+
+def speech_bounds(audio_data: bytes,
+                  threshold: float = SILENCE_TRIM_THRESHOLD,
+                  ) -> tuple[int, int, int] | None:
+    """最初と最後の有音フレーム位置を返す。
+
+    Returns:
+        (最初の有音フレーム, 最後の有音フレーム + 1, 総フレーム数)。
+        有音部分がない・未対応の形式の場合は None
+    """
+    with wave.open(io.BytesIO(audio_data), 'rb') as wf:
+        n_channels = wf.getnchannels()
+        sampwidth = wf.getsampwidth()
+        n_frames = wf.getnframes()
+        frames = wf.readframes(n_frames)
+
+    dtype = _SAMPLE_DTYPES.get(sampwidth)
+    if dtype is None or n_frames == 0:
+        return None
+    samples = np.frombuffer(frames, dtype=dtype).astype(np.int64)
+    full_scale = 1 << (8 * sampwidth - 1)
+    if sampwidth == 1:
+        samples -= 128
+    # チャンネルのうち最大の振幅をそのフレームの振幅とする
+    amplitude = np.abs(samples.reshape(-1, n_channels)).max(axis=1)
+    voiced = np.flatnonzero(amplitude > threshold * full_scale)
+    if voiced.size == 0:
+        return None
+    return int(voiced[0]), int(voiced[-1]) + 1, n_frames
+
+
+def trim_silence(audio_data: bytes,
+                 threshold: float = SILENCE_TRIM_THRESHOLD,
+                 margin: float = SILENCE_TRIM_MARGIN) -> bytes:
+    """WAV の前後の無音を *margin* 秒残して切り詰め、ヘッダを書き直して返す。
+
+    音量値は切り詰め後の WAV から抽出するため、口パクも同じだけ前にずれる。
+    無音のみ・未対応の形式の場合はそのまま返す。
+    """
+    bounds = speech_bounds(audio_data, threshold)
+    if bounds is None:
+        return audio_data
+    first, end, n_frames = bounds
+
+    with wave.open(io.BytesIO(audio_data), 'rb') as wf:
+        params = wf.getparams()
+        frame_size = params.nchannels * params.sampwidth
+        margin_frames = int(margin * params.framerate)
+        start = max(0, first - margin_frames)
+        stop = min(n_frames, end + margin_frames)
+        if start == 0 and stop == n_frames:
+            return audio_data
+        wf.setpos(start)
+        frames = wf.readframes(stop - start)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        out.setnchannels(params.nchannels)
+        out.setsampwidth(params.sampwidth)
+        out.setframerate(params.framerate)
+        out.writeframes(frames[:(stop - start) * frame_size])
+    return buffer.getvalue()
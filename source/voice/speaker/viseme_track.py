@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from typing import Sequence
+
+import numpy as np
+
+from configuration.person_settings import (
+    VISEME_ATTACK_TIME,
+    VISEME_HYSTERESIS,
+    VISEME_RELEASE_TIME,
+)
+
+# 口の画像の段階数（00.png 〜 00e.png）
+MOUTH_LEVELS = 6
+
+
+# 累積積で一次遅れを求めるときの 1 ブロックの減衰の上限（exp(-600) は
+# float64 で表せる）
+_MAX_EXPONENT = 600.0
+# 入力と直前の値の差がこれ以下なら、どちらの向きで追従しても結果は
+# ほぼ変わらないので向きの食い違いとみなさない（一定の入力に収束した
+# 区間で丸め誤差によって向きが入れ替わり、計算し直し続けないため）
+_DIRECTION_TOLERANCE = 1e-9
+
+
+def _follow(samples: np.ndarray, gains: np.ndarray,
+            level: float) -> np.ndarray:
+    """*level* から始めてサンプルごとの *gains* で *samples* に追従した値の列。
+
+    ``y[n] = (1 - g[n]) * y[n-1] + g[n] * x[n]`` を、減衰の累積積
+    ``P[n]`` を使った ``y[n] = P[n] * (level + cumsum(g * x / P)[n])`` で
+    求める。各項は正なので桁落ちせず、``1 / P`` が float64 の範囲に収まる
+    ようブロックに分けて計算する。
+    """
+    logs = np.cumsum(np.log(np.maximum(1.0 - gains, 1e-300)))
+    result = np.empty_like(samples)
+    start = 0
+    while start < len(samples):
+        base = logs[start - 1] if start else 0.0
+        stop = start + max(1, int(np.searchsorted(
+            base - logs[start:], _MAX_EXPONENT, side='right')))
+        decay = np.exp(logs[start:stop] - base)
+        result[start:stop] = decay * (level + np.cumsum(
+            gains[start:stop] * samples[start:stop] / decay))
+        level = float(result[stop - 1])
+        start = stop
+    return result
+
+
+def smooth_envelope(values: Sequence[float], sample_time: float,
+                    attack: float = VISEME_ATTACK_TIME,
+                    release: float = VISEME_RELEASE_TIME) -> np.ndarray:
+    """音量値に attack / release の一次遅れを掛ける。口を閉じた状態から始める。
+
+    大きくなる方向は attack、小さくなる方向は release の時定数で追従する。
+    各サンプルの向きを仮に決めて ``_follow`` でまとめて計算し、結果から
+    求め直した向きと食い違った最初の位置までを確定させて、残りを求め直した
+    向きで計算し直す。音量値では 2〜6 回の計算で確定する。
+    """
+    samples = np.asarray(values, dtype=np.float64)
+    attack_gain = 1.0 - np.exp(-sample_time / attack) if attack > 0 else 1.0
+    release_gain = 1.0 - np.exp(-sample_time / release) if release > 0 else 1.0
+    # 最初は直前のサンプルより大きければ大きくなる方向とみなす
+    rising = samples > np.concatenate(([0.0], samples[:-1]))
+    envelope = np.empty_like(samples)
+    level = 0.0
+    start = 0
+    while start < len(samples):
+        rest = samples[start:]
+        followed = _follow(rest, np.where(rising[start:], attack_gain,
+                                          release_gain), level)
+        previous = np.concatenate(([level], followed[:-1]))
+        actual = rest > previous
+        wrong = np.flatnonzero((actual != rising[start:])
+                               & (np.abs(rest - previous)
+                                  > _DIRECTION_TOLERANCE))
+        rising[start:] = actual
+        if len(wrong) == 0:
+            envelope[start:] = followed
+            break
+        # 向きを誤った最初の位置の手前までは正しい（先頭の向きは level
+        # だけで決まり、求め直した向きは必ず正しいので毎回進む）
+        settled = int(wrong[0])
+        if settled:
+            envelope[start:start + settled] = followed[:settled]
+            level = float(followed[settled - 1])
+            start += settled
+    return envelope
+
+
+def quantize_levels(envelope: np.ndarray,
+                    hysteresis: float = VISEME_HYSTERESIS) -> np.ndarray:
+    """0〜1 の値を口の段階に量子化する。
+
+    境界付近で段階が交互に切り替わらないよう、現在の段階の範囲を
+    *hysteresis* 段ぶん超えるまでは段階を変えない。段階ごとに範囲を
+    外れる次の位置をまとめて求めておき、Python のループは段階が
+    変わる回数だけ回る。
+    """
+    positions = np.clip(envelope * MOUTH_LEVELS, 0.0, MOUTH_LEVELS)
+    candidates = np.minimum(positions.astype(np.int64), MOUTH_LEVELS - 1)
+    count = len(candidates)
+    if hysteresis <= 0 or count == 0:
+        return candidates
+    # next_outside[level][i]: i 以降で level の範囲（ヒステリシス込み）を
+    # 外れる最初の位置。なければ count
+    indices = np.arange(count)
+    next_outside = []
+    for level in range(MOUTH_LEVELS):
+        outside = ((positions < level - hysteresis)
+                   | (positions >= level + 1 + hysteresis))
+        marks = np.where(outside, indices, count)
+        next_outside.append(np.minimum.accumulate(marks[::-1])[::-1])
+    levels = np.empty_like(candidates)
+    start = 0
+    level = int(candidates[0])
+    while start < count:
+        stop = int(next_outside[level][start])
+        levels[start:stop] = level
+        if stop == count:
+            break
+        level = int(candidates[stop])
+        start = stop
+    return levels
+
+
+def run_length_encode(levels: np.ndarray) -> list[list[int]]:
+    """段階の列を ``[[段階, 連続するサンプル数], ...]`` に変換する。"""
+    if len(levels) == 0:
+        return []
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(levels)) + 1))
+    counts = np.diff(np.concatenate((starts, [len(levels)])))
+    return [[int(level), int(count)]
+            for level, count in zip(levels[starts], counts)]
+
+
+def viseme_track(sound_values: Sequence[float],
+                 sample_time: float) -> list[list[int]]:
+    """正規化済みの音量値から口の段階の変化点の列を求める。"""
+    return run_length_encode(
+        quantize_levels(smooth_envelope(sound_values, sample_time)))
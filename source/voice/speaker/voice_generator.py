@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import sys
 import re
+import time
+from array import array
 from pathlib import Path
 from typing import Iterator
 
@@ -10,13 +12,27 @@ sys.path.append(str(Path(__file__).resolve().parents[2]))
 sys.path.append(str(Path(__file__).resolve().parents[3]))
 
 from source.voice.speaker.aquestalk_generator import AquesTalkGenerator, SAMPLE_INTERVAL
+from source.voice.speaker.browser_audio_sink import wav_duration
+from source.voice.speaker.silence_trimmer import trim_silence
+from source.monitoring.metrics import STAGE_SECONDS
+from source.speak.cancellation import CancellationToken
+from source.speak.duration_estimator import DURATION_ESTIMATOR
+from source.speak.speak_job import SpeakJob
+
+from configuration.person_settings import (
+    SILENCE_TRIM_ENABLED,
+)
 
 
 class VoiceGenerator:
     """AquesTalkGenerator を利用してテキストから音声データと音量値を生成するクラス。"""
 
-    def __init__(self) -> None:
-        self._generator = AquesTalkGenerator()
+    def __init__(self, generator: AquesTalkGenerator | None = None) -> None:
+        self._generator = generator or AquesTalkGenerator()
+
+    def warm_up(self) -> None:
+        """TTS サーバーの起動を待ち、ウォームアップ合成を行う。"""
+        self._generator.warm_up()
 
     @staticmethod
     def _split_sentences(text: str) -> list[str]:
@@ -31,19 +47,67 @@ class VoiceGenerator:
         parts = re.findall(r'[^。？！!?]+[。？！!?]?', normalized)
         return [part.strip() for part in parts if part.strip()]
 
-    def generate_sequential(self, text: str, interval: float = SAMPLE_INTERVAL
-                            ) -> Iterator[tuple[bytes, list[float], float]]:
-        """テキストを文単位に分割し、順番に音声 WAV データと音量値を生成する。"""
-        sentences = self._split_sentences(text)
-        for sentence in sentences:
-            audio_data = self._generator.generate_audio(sentence)
-            sound_values = self._generator.extract_sound_values(
-                audio_data, interval)
-            scaled = self._generator.scale(sound_values)
-            yield audio_data, scaled, interval
+    def synthesize(self, sentence: str, job: SpeakJob | None = None,
+                   token: CancellationToken | None = None) -> bytes:
+        """1 文を音声合成して WAV データを返す。
+
+        *job* を渡すと最初の文の合成完了時刻を記録し、``job.speed`` の話速で
+        合成する。*token* が取り消されると合成の完了を待たずに
+        OperationCancelled を送出する。
+        """
+        started = time.monotonic()
+        audio_data = self._generator.generate_audio(
+            sentence, token, job.speed if job is not None else None)
+        STAGE_SECONDS.observe(time.monotonic() - started, stage='tts')
+        if job is not None:
+            job.mark('first_synthesized')
+        return audio_data
+
+    def analyze(self, audio_data: bytes, interval: float = SAMPLE_INTERVAL,
+                sentence: str | None = None, speed: float | None = None
+                ) -> tuple[bytes, array, float]:
+        """合成した WAV から口パク用の音量値を求める。
+
+        SILENCE_TRIM_ENABLED の場合は前後の無音を切り詰めてから抽出する。
+        *sentence* を渡すと、再生する音声の長さで読み上げ時間の推定を校正する
+        （*speed* は合成に使った話速。省略時は現在の話速）。
+        音量値は合成後の音声から求めるため、sample_time は話速によらず
+        再生時間上の間隔になる。
+
+        Returns:
+            (audio_bytes, scaled_sound_values, sample_time)
+        """
+        started = time.monotonic()
+        if SILENCE_TRIM_ENABLED:
+            audio_data = trim_silence(audio_data)
+        trimmed = time.monotonic()
+        sound_values = self._generator.extract_sound_values(
+            audio_data, interval)
+        scaled = self._generator.scale(sound_values)
+        STAGE_SECONDS.observe(trimmed - started, stage='trim_silence')
+        STAGE_SECONDS.observe(time.monotonic() - trimmed,
+                              stage='extract_sound_values')
+        if sentence is not None:
+            DURATION_ESTIMATOR.observe(sentence, wav_duration(audio_data),
+                                       speed)
+        return audio_data, scaled, interval
+
+    def generate_sequential(self, text: str, interval: float = SAMPLE_INTERVAL,
+                            job: SpeakJob | None = None,
+                            token: CancellationToken | None = None
+                            ) -> Iterator[tuple[bytes, array, float]]:
+        """テキストを文単位に分割し、順番に音声 WAV データと音量値を生成する。
+
+        *token* が取り消されると、合成中の文も含めてその時点で打ち切る。
+        """
+        for sentence in self._split_sentences(text):
+            if token is not None:
+                token.raise_if_cancelled()
+            yield self.analyze(self.synthesize(sentence, job, token), interval,
+                               sentence, job.speed if job is not None else None)
 
     def generate(self, text: str, interval: float = SAMPLE_INTERVAL
-                 ) -> tuple[bytes, list[float], float]:
+                 ) -> tuple[bytes, array, float]:
         """テキストから音声 WAV データおよび正規化済み音量値を生成する。
 
         Args:
@@ -53,7 +117,7 @@ class VoiceGenerator:
         Returns:
             (audio_bytes, scaled_sound_values, sample_time)
         """
-        all_sound_values: list[float] = []
+        all_sound_values = array('d')
         last_audio_data: bytes | None = None
 
         for audio_data, scaled, sample_time in self.generate_sequential(text, interval):
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import queue
+import threading
+import time
+from array import array
+from typing import Callable
+
+from source.voice.speaker.voice_generator import VoiceGenerator
+from source.voice.speaker.audio_player import AudioPlayer
+from source.monitoring.metrics import (
+    FILLER_PLAYED_TOTAL,
+    STAGE_SECONDS,
+    TIME_TO_FIRST_AUDIO_RECENT,
+    TIME_TO_FIRST_AUDIO_SECONDS,
+    TTS_WASTED_SECONDS_TOTAL,
+)
+from source.speak.cancellation import CancellationToken, OperationCancelled
+from source.speak.speak_job import SpeakJob
+
+# 発話の終わりを後段へ伝える印
+_END = object()
+
+# 再生待ちの音声 (audio_bytes, sound_values, sample_time)
+Sound = tuple[bytes, array, float]
+
+
+class Utterance:
+    """パイプラインに投入した 1 件の発話。完了は ``wait`` で待てる。"""
+
+    __slots__ = ('text', 'job', 'on_played', 'admit', 'token', 'error',
+                 'expired', 'played_count', 'submitted_at', 'filler_played',
+                 '_done', '_callbacks', '_lock')
+
+    def __init__(self, text: str, job: SpeakJob | None = None,
+                 on_played: Callable[[bytes, array, float], None]
+                 | None = None,
+                 admit: Callable[[str], bool] | None = None) -> None:
+        self.text = text
+        self.job = job
+        self.on_played = on_played
+        # 前処理の開始時（'preprocess'）と最初の文の再生直前（'play'）に
+        # 呼ばれ、False を返すと期限切れとして取り消す
+        self.admit = admit
+        # 停止要求で取り消される（合成中の文も含めて合成・再生しない）
+        self.token = CancellationToken()
+        # admit に断られて取り消されたか
+        self.expired = False
+        self.error: Exception | None = None
+        self.played_count = 0
+        self.submitted_at = time.monotonic()
+        # 最初の文が間に合わず、つなぎの音声を再生したか
+        self.filler_played = False
+        self._done = threading.Event()
+        self._callbacks: list[Callable[[Utterance], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    def add_done_callback(self, callback: Callable[[Utterance], None]) -> None:
+        """完了時に *callback* を呼ぶ。完了済みならすぐに呼ぶ。"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def complete(self) -> None:
+        with self._lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as exc:
+                print(f'[speech-pipeline] Error: {exc}', flush=True)
+
+    def wait(self) -> int:
+        """完了まで待ち、再生した文の数を返す。失敗していれば例外を送出する。"""
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.played_count
+
+
+class SpeechPipeline:
+    """前処理 → 音声合成 → 音量解析 → 再生 の常駐スレッドによるパイプライン。
+
+    各段は上限付きのキューでつながっており、再生中の発話の後ろで次の発話の
+    合成を進めるため、発話間の無音が生じない。先読みはキューの上限までに
+    とどまり、再生が追いつかない場合は前段を待たせる。
+
+    取り消された発話は合成中のリクエストを待たずに打ち切り、合成済みで
+    再生されなかった文の合成時間は無駄になった時間として計上する。
+
+    *filler* を渡すと、再生が止まってから *filler_delay* 秒たっても次の発話の
+    最初の文が届かない場合に、*filler* が返す短い音声（「えーっと」など）を
+    口パクつきで 1 回だけ再生し、無音の時間を区切る。*filler_delay* が 0 以下
+    なら待たずに割り込むことになるため、つなぎの音声は使わない。
+    """
+
+    def __init__(self,
+                 voice_generator: VoiceGenerator,
+                 audio_player: AudioPlayer,
+                 preprocess: Callable[[str], str],
+                 emit_sound: Callable[[Utterance, bytes, array, float],
+                                      None],
+                 queue_max_size: int,
+                 text_queue_max_size: int,
+                 filler: Callable[[], Sound | None] | None = None,
+                 filler_delay: float = 0.0) -> None:
+        """
+        Args:
+            preprocess: 読み上げ前のテキスト置換
+            emit_sound: 再生直前に呼ばれ、口パクデータを送出する
+            queue_max_size: 合成・解析・再生の各段の間に置く文の数の上限
+            text_queue_max_size: 前処理を待つ発話の数の上限
+            filler: つなぎの音声を返す（用意できていなければ None）
+            filler_delay: つなぎの音声を再生するまでの無音の秒数（0 以下で無効）
+        """
+        self._voice_generator = voice_generator
+        self._audio_player = audio_player
+        self._preprocess = preprocess
+        self._emit_sound = emit_sound
+        # 待ち時間が 0 だと再生段が get(timeout=0) を空回りし続ける
+        self._filler = filler if filler_delay > 0 else None
+        self._filler_delay = filler_delay
+        # 最後に再生を終えた時刻（つなぎの音声の判定用）
+        self._idle_since = 0.0
+
+        self._text_queue: queue.Queue[Utterance] = queue.Queue(
+            maxsize=text_queue_max_size)
+        self._synthesize_queue: queue.Queue[tuple[Utterance, object]] = \
+            queue.Queue(maxsize=queue_max_size)
+        self._analyze_queue: queue.Queue[tuple[Utterance, object]] = \
+            queue.Queue(maxsize=queue_max_size)
+        self._play_queue: queue.Queue[tuple[Utterance, object]] = \
+            queue.Queue(maxsize=queue_max_size)
+
+        # 投入済みで未完了の発話（停止要求の対象）
+        self._active: set[Utterance] = set()
+        self._active_lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._threads:
+                return
+            for name, target in (('preprocess', self._preprocess_loop),
+                                 ('synthesize', self._synthesize_loop),
+                                 ('analyze', self._analyze_loop),
+                                 ('play', self._play_loop)):
+                thread = threading.Thread(
+                    target=target, daemon=True, name=f'speech-{name}')
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, text: str, job: SpeakJob | None = None,
+               on_played: Callable[[bytes, array, float], None]
+               | None = None,
+               admit: Callable[[str], bool] | None = None) -> Utterance:
+        """発話を投入する。前処理待ちが上限に達している間はブロックする。"""
+        self._ensure_started()
+        utterance = Utterance(text, job, on_played, admit)
+        with self._active_lock:
+            self._active.add(utterance)
+        self._text_queue.put(utterance)
+        return utterance
+
+    def shutdown(self) -> None:
+        """投入済みの発話を取り消し、各段のスレッドを終了させる。"""
+        self.cancel_all()
+        with self._start_lock:
+            threads, self._threads = self._threads, []
+        if not threads:
+            return
+        self._text_queue.put(None)  # type: ignore[arg-type]
+        for thread in threads:
+            thread.join()
+
+    def cancel_all(self) -> None:
+        """投入済みのすべての発話を取り消す。各発話は速やかに完了する。"""
+        with self._active_lock:
+            utterances = list(self._active)
+        for utterance in utterances:
+            utterance.token.cancel()
+
+    def queue_size(self) -> int:
+        """各段のキューに溜まっている項目の合計。"""
+        return (self._text_queue.qsize() + self._synthesize_queue.qsize()
+                + self._analyze_queue.qsize() + self._play_queue.qsize())
+
+    # ------------------------------------------------------------------
+    # stages
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _skipped(utterance: Utterance) -> bool:
+        return utterance.cancelled or utterance.error is not None
+
+    @staticmethod
+    def _admitted(utterance: Utterance, stage: str) -> bool:
+        """*utterance* の admit が断れば期限切れとして取り消し、False を返す。"""
+        if utterance.admit is None or utterance.admit(stage):
+            return True
+        utterance.expired = True
+        utterance.token.cancel()
+        return False
+
+    def _preprocess_loop(self) -> None:
+        while True:
+            utterance = self._text_queue.get()
+            if utterance is None:
+                self._synthesize_queue.put((None, None))  # type: ignore[arg-type]
+                return
+            try:
+                if (not self._skipped(utterance)
+                        and self._admitted(utterance, 'preprocess')):
+                    started = time.monotonic()
+                    text = self._preprocess(utterance.text)
+                    STAGE_SECONDS.observe(time.monotonic() - started,
+                                          stage='replace_text')
+                    for sentence in VoiceGenerator._split_sentences(text):
+                        if self._skipped(utterance):
+                            break
+                        self._synthesize_queue.put((utterance, sentence))
+            except Exception as exc:
+                utterance.error = exc
+            self._synthesize_queue.put((utterance, _END))
+
+    def _synthesize_loop(self) -> None:
+        while True:
+            utterance, item = self._synthesize_queue.get()
+            if utterance is None:
+                self._analyze_queue.put((None, None))  # type: ignore[arg-type]
+                return
+            if item is not _END:
+                if self._skipped(utterance):
+                    continue
+                started = time.monotonic()
+                try:
+                    audio_data = self._voice_generator.synthesize(
+                        item, utterance.job,  # type: ignore[arg-type]
+                        utterance.token)
+                except OperationCancelled:
+                    continue
+                except Exception as exc:
+                    utterance.error = exc
+                    continue
+                item = (audio_data, time.monotonic() - started, item)
+                if self._discarded(utterance, item):
+                    continue
+            self._analyze_queue.put((utterance, item))
+
+    def _analyze_loop(self) -> None:
+        while True:
+            utterance, item = self._analyze_queue.get()
+            if utterance is None:
+                self._play_queue.put((None, None))  # type: ignore[arg-type]
+                return
+            if item is not _END:
+                if self._discarded(utterance, item):
+                    continue
+                audio_data, synthesis_seconds, sentence = item  # type: ignore[misc]
+                job = utterance.job
+                try:
+                    item = (self._voice_generator.analyze(
+                        audio_data, sentence=sentence,
+                        speed=job.speed if job is not None else None),
+                        synthesis_seconds)
+                except Exception as exc:
+                    utterance.error = exc
+                    continue
+            self._play_queue.put((utterance, item))
+
+    def _next_play_item(self) -> tuple[Utterance, object]:
+        """再生する次の項目を取り出す。待っている間に必要ならつなぎの音声を流す。"""
+        if self._filler is None:
+            return self._play_queue.get()
+        while True:
+            waiting = self._waiting_for_first_sentence()
+            if waiting is None:
+                # 新しい発話の投入に気付けるよう、一定間隔で確認する
+                timeout = self._filler_delay
+            else:
+                timeout = (max(waiting.submitted_at, self._idle_since)
+                           + self._filler_delay - time.monotonic())
+                if timeout <= 0:
+                    self._play_filler(waiting)
+                    continue
+            try:
+                return self._play_queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+
+    def _waiting_for_first_sentence(self) -> Utterance | None:
+        """次に再生する発話が、まだ 1 文も再生していなければ返す。"""
+        with self._active_lock:
+            if not self._active:
+                return None
+            oldest = min(self._active, key=lambda u: u.submitted_at)
+        if (oldest.played_count or oldest.filler_played
+                or self._skipped(oldest)):
+            return None
+        return oldest
+
+    def _play_filler(self, utterance: Utterance) -> None:
+        utterance.filler_played = True
+        sound = self._filler()  # type: ignore[misc]
+        if sound is None:
+            return
+        audio_data, sound_values, sample_time = sound
+        if utterance.job is not None:
+            utterance.job.mark('filler_audio')
+        self._emit_sound(utterance, audio_data, sound_values, sample_time)
+        try:
+            # first_audio は本来の音声の再生開始で記録するため job は渡さない
+            self._audio_player.play(audio_data)
+            FILLER_PLAYED_TOTAL.inc()
+        except Exception as exc:
+            print(f'[speech-pipeline] Error: {exc}', flush=True)
+        self._idle_since = time.monotonic()
+
+    def _play_loop(self) -> None:
+        while True:
+            utterance, item = self._next_play_item()
+            if utterance is None:
+                return
+            if item is _END:
+                with self._active_lock:
+                    self._active.discard(utterance)
+                utterance.complete()
+                continue
+            if self._discarded(utterance, item):
+                continue
+            analyzed, synthesis_seconds = item  # type: ignore[misc]
+            # 前の発話の再生が長引き、読み始める前に期限を過ぎた場合
+            if (utterance.played_count == 0 and not utterance.filler_played
+                    and not self._admitted(utterance, 'play')):
+                TTS_WASTED_SECONDS_TOTAL.inc(synthesis_seconds)
+                continue
+            try:
+                if not self._play(utterance, *analyzed):
+                    TTS_WASTED_SECONDS_TOTAL.inc(synthesis_seconds)
+            except Exception as exc:
+                utterance.error = exc
+            self._idle_since = time.monotonic()
+
+    def _discarded(self, utterance: Utterance, item: object) -> bool:
+        """取り消し・失敗した発話の合成済みの文なら破棄して True を返す。"""
+        if not self._skipped(utterance):
+            return False
+        if utterance.cancelled:
+            TTS_WASTED_SECONDS_TOTAL.inc(item[1])  # type: ignore[index]
+        return True
+
+    def _play(self, utterance: Utterance, audio_data: bytes,
+              sound_values: array, sample_time: float) -> bool:
+        """1 文を再生する。再生前に取り消された場合は False を返す。"""
+        job = utterance.job
+        # 停止後に口パクイベントを送らないよう、先に取り消しを確認する
+        if utterance.cancelled:
+            return False
+        self._emit_sound(utterance, audio_data, sound_values, sample_time)
+
+        first = job is not None and 'first_audio' not in job.marks
+        played = self._audio_player.play(audio_data, job)
+        if utterance.cancelled:
+            return True
+        if not played:
+            raise RuntimeError('audio playback failed')
+        if first and 'first_audio' in job.marks:
+            ttfa = job.marks['first_audio'] - job.enqueued_at
+            TIME_TO_FIRST_AUDIO_SECONDS.observe(ttfa)
+            TIME_TO_FIRST_AUDIO_RECENT.observe(ttfa)
+
+        utterance.played_count += 1
+        if utterance.on_played is not None:
+            utterance.on_played(audio_data, sound_values, sample_time)
+        return True
@@ -6,128 +6,204 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
+import base64
 import threading
-import queue
+import time
+from array import array
+from collections import deque
+from typing import Callable
 
 from source.voice.speaker.voice_generator import VoiceGenerator
 from source.voice.speaker.audio_player import AudioPlayer
-
+from source.voice.speaker.browser_audio_sink import BrowserAudioSink
+from source.voice.speaker.filler_cache import FillerCache
+from source.voice.speaker.viseme_track import viseme_track
+from source.voice.sound_event import SoundEvent
+from source.voice.speech_pipeline import SpeechPipeline, Utterance
+from source.monitoring.metrics import STAGE_SECONDS
+from source.settings.live_settings import LIVE_SETTINGS
+from source.speak.speak_job import SpeakJob
+
+from configuration.communication_settings import (
+    AUDIO_OUTPUT_MODE,
+)
 from configuration.person_settings import (
-    TEXT_FOR_SPEAK_REPLACEMENTS,
+    FILLER_DELAY,
+    FILLER_ENABLED,
+    VISEME_TRACK_ENABLED,
 )
 
+# パイプラインの各段の間に置く文の最大数（段ごとの先読み数）
+CHUNK_QUEUE_MAX_SIZE = 2
+# 前処理を待つ発話の最大数
+TEXT_QUEUE_MAX_SIZE = 2
+
 
 class VoiceManager:
     """音声生成・再生・音量キュー管理クラス。
 
     - VoiceGenerator を用いてテキストから WAV データと音量値を生成する。
-    - AudioPlayer を別プロセスで起動して再生する。
+      合成・解析・再生は常駐の SpeechPipeline で並行して行う。
+    - AudioPlayer を別プロセスで起動して再生する。ブラウザ再生モードでは
+      WAV を口パクイベントに添付し、ブラウザ側で再生させる。
     - 生成した音量値を内部キューで管理し、外部から取得できる。
+    - FILLER_ENABLED の場合、最初の文の合成が遅れるとあらかじめ合成した
+      つなぎの音声を先に再生する。
     """
 
-    def __init__(self) -> None:
-        self._voice_generator = VoiceGenerator()
-        self._audio_player = AudioPlayer()
-
-        self._sound_queue: list[dict] = []
+    def __init__(self,
+                 voice_generator: VoiceGenerator | None = None,
+                 audio_player: AudioPlayer | None = None) -> None:
+        self._voice_generator = voice_generator or VoiceGenerator()
+        if audio_player is None:
+            audio_player = (BrowserAudioSink() if AUDIO_OUTPUT_MODE == 'browser'
+                            else AudioPlayer())
+        self._audio_player = audio_player
+        self._attach_audio = getattr(
+            audio_player, 'delivers_audio_to_browser', False)
+
+        self._sound_queue: deque[SoundEvent] = deque()
         self._sound_queue_lock = threading.Lock()
         # When True, ongoing and future voice output should stop
         self._voice_output_stop_flag = False
 
-    def speak(self, text: str) -> tuple[bytes, list[float], float]:
+        self._filler = (FillerCache(self._voice_generator)
+                        if FILLER_ENABLED and FILLER_DELAY > 0 else None)
+        self._pipeline = SpeechPipeline(
+            self._voice_generator,
+            self._audio_player,
+            preprocess=self._replace_text_for_speak,
+            emit_sound=self._emit_sound,
+            queue_max_size=CHUNK_QUEUE_MAX_SIZE,
+            text_queue_max_size=TEXT_QUEUE_MAX_SIZE,
+            filler=self._filler.next if self._filler is not None else None,
+            filler_delay=FILLER_DELAY,
+        )
+
+    def warm_up_synthesis(self) -> None:
+        """音声合成の起動完了を待ち、ウォームアップ合成を行う。
+
+        つなぎの音声を使う場合は、ここで合成しておく。
+        """
+        self._voice_generator.warm_up()
+        if self._filler is not None:
+            self._filler.render()
+
+    def wait_audio_output_ready(self) -> None:
+        """音声出力（再生サーバー）の起動完了を待つ。"""
+        self._audio_player.wait_until_ready()
+
+    def speak(self, text: str, job: SpeakJob | None = None
+              ) -> tuple[bytes, array, float]:
         """テキストから音声を生成・再生し、結果を返す。
 
         Args:
             text: 読み上げテキスト
+            job: レイテンシ計測用のジョブ（省略可）
 
         Returns:
             (audio_bytes, scaled_sound_values, sample_time)
         """
-        chunks: queue.Queue[tuple[bytes, list[float], float]
-                            | None] = queue.Queue()
-        stop_event = threading.Event()
-        errors: list[Exception] = []
-
-        all_sound_values: list[float] = []
+        all_sound_values = array('d')
         last_audio_data: bytes | None = None
         last_sample_time = 0.0
 
-        text_replaced = self._replace_text_for_speak(text)
-
-        def _producer() -> None:
-            try:
-                for chunk in self._voice_generator.generate_sequential(text_replaced):
-                    if stop_event.is_set():
-                        break
-                    chunks.put(chunk)
-            except Exception as exc:
-                errors.append(exc)
-                stop_event.set()
-            finally:
-                chunks.put(None)
-
-        def _consumer() -> None:
+        def _on_played(audio_data: bytes, sound_values: array,
+                       sample_time: float) -> None:
             nonlocal last_audio_data, last_sample_time
-            try:
-                while True:
-                    item = chunks.get()
-                    if item is None:
-                        break
-
-                    audio_data, sound_values, sample_time = item
-
-                    # 文ごとの口パクデータを追加（必要なら遅延を挿入）
-                    self.enqueue_sound(
-                        sound_values, sample_time)
-
-                    if getattr(self, '_voice_output_stop_flag', False):
-                        stop_event.set()
-                        break
-
-                    played = self._audio_player.play(audio_data)
-                    if not played:
-                        raise RuntimeError('audio playback failed')
-
-                    last_audio_data = audio_data
-                    last_sample_time = sample_time
-                    all_sound_values.extend(sound_values)
-            except Exception as exc:
-                errors.append(exc)
-                stop_event.set()
-
-        producer_thread = threading.Thread(target=_producer, daemon=True)
-        consumer_thread = threading.Thread(target=_consumer, daemon=True)
-        producer_thread.start()
-        consumer_thread.start()
-        producer_thread.join()
-        consumer_thread.join()
-
-        if errors:
-            raise errors[0]
+            last_audio_data = audio_data
+            last_sample_time = sample_time
+            all_sound_values.extend(sound_values)
+
+        self._pipeline.submit(text, job, _on_played).wait()
 
         if last_audio_data is None:
             raise ValueError('text is empty')
 
         return last_audio_data, all_sound_values, last_sample_time
 
+    def speak_stream(self, text: str, job: SpeakJob | None = None) -> int:
+        """テキストから音声を生成・再生する。結果は保持・返却しない。
+
+        再生済みの WAV や音量値を溜め込まないため、長文や長時間の配信でも
+        メモリ使用量が増えない。
+
+        Returns:
+            再生した文の数
+        """
+        return self._pipeline.submit(text, job).wait()
+
+    def speak_async(self, text: str, job: SpeakJob | None = None,
+                    admit: Callable[[str], bool] | None = None) -> Utterance:
+        """発話をパイプラインに投入し、再生の完了を待たずに返す。
+
+        前の発話の再生中に次の発話の合成が進むため、speak worker からはこちらを
+        使う。完了は ``Utterance.add_done_callback`` で受け取る。*admit* は
+        前処理の開始時と再生の直前に呼ばれ、False を返すと読み上げずに
+        期限切れ（``Utterance.expired``）にする。
+        """
+        return self._pipeline.submit(text, job, admit=admit)
+
+    def close(self) -> None:
+        """パイプラインのスレッドを終了する。以降は読み上げできない。"""
+        self._pipeline.shutdown()
+
+    def pipeline_queue_size(self) -> int:
+        """パイプラインの各段で処理を待っている項目の合計。"""
+        return self._pipeline.queue_size()
+
+    def _emit_sound(self, utterance: Utterance, audio_data: bytes,
+                    sound_values: array, sample_time: float) -> None:
+        job = utterance.job
+        self.enqueue_sound(
+            sound_values, sample_time,
+            job.job_id if job is not None else None,
+            audio_data if self._attach_audio else None,
+            list(job.member_ids) if job is not None else None)
+
     def enqueue_sound(
         self,
-        sound_values: list[float],
+        sound_values: array,
         sample_time: float,
+        job_id: str | None = None,
+        audio_data: bytes | None = None,
+        member_ids: list[str] | None = None,
     ) -> None:
-        """音量データをキューに追加する。
+        """音量データを SoundEvent としてキューに追加する。
+
+        *audio_data* を渡すとブラウザ再生用に base64 の WAV を ``audio`` に
+        添付する。まとめて読み上げたジョブでは元ジョブの ID を ``job_ids``
+        に入れる。
+
+        VISEME_TRACK_ENABLED の場合は音量値に加えて、平滑化・量子化した
+        口の段階の変化点 ``mouth_levels``（``[[段階, サンプル数], ...]``）を送る。
         """
+        mouth_levels = None
+        if VISEME_TRACK_ENABLED:
+            started = time.monotonic()
+            mouth_levels = viseme_track(sound_values, sample_time)
+            STAGE_SECONDS.observe(time.monotonic() - started,
+                                  stage='viseme_track')
+        event = SoundEvent(
+            sample_time, job_id,
+            sound_values=sound_values,
+            mouth_levels=mouth_levels,
+            job_ids=member_ids or None,
+            audio=(base64.b64encode(audio_data).decode('ascii')
+                   if audio_data is not None else None))
+        with self._sound_queue_lock:
+            self._sound_queue.append(event)
+
+    def sound_queue_size(self) -> int:
+        """未転送の音量データ件数を返す。"""
         with self._sound_queue_lock:
-            self._sound_queue.append({
-                'sound_values': sound_values,
-                'sample_time': sample_time,
-            })
+            return len(self._sound_queue)
 
-    def dequeue_sound(self) -> dict | None:
+    def dequeue_sound(self) -> SoundEvent | None:
         """キューから音量データを 1 件取り出す。キューが空の場合は None を返す。"""
         with self._sound_queue_lock:
             if self._sound_queue:
-                return self._sound_queue.pop(0)
+                return self._sound_queue.popleft()
         return None
 
     def set_voice_output_stop_flag(self, flag: bool) -> None:
@@ -141,6 +217,8 @@ class VoiceManager:
         # and attempt to stop currently playing audio immediately.
         if flag:
             self._voice_output_stop_flag = True
+            # drop everything not yet played
+            self._pipeline.cancel_all()
             # clear queued sound_values
             with self._sound_queue_lock:
                 self._sound_queue.clear()
@@ -156,6 +234,4 @@ class VoiceManager:
         self,
         text: str
     ) -> str:
-        for target, replacement in TEXT_FOR_SPEAK_REPLACEMENTS.items():
-            text = text.replace(target, replacement)
-        return text
+        return LIVE_SETTINGS.current.replace_text(text)
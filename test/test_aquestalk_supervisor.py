@@ -0,0 +1,100 @@
+"""AquesTalkSupervisor のテスト。
+
+aquestalk-server.exe の代わりに偽サーバーを別プロセスで起動し、
+異常終了・応答停止時の再起動と待機系への切り替えを確認する。
+"""
+from __future__ import annotations
+
+import socket
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.voice.speaker import aquestalk_supervisor
+from source.voice.speaker.aquestalk_supervisor import AquesTalkSupervisor
+
+FAKE_SERVER = Path(__file__).resolve().parents[1] / \
+    'benchmark' / 'fake_aquestalk_server.py'
+STARTUP_TIMEOUT = 15.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _fake_server_instance() -> tuple[str, list[str]]:
+    port = _free_port()
+    return (f'http://127.0.0.1:{port}',
+            [sys.executable, str(FAKE_SERVER), '--port', str(port)])
+
+
+def _wait_until(predicate, timeout: float = STARTUP_TIMEOUT) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestAquesTalkSupervisor(unittest.TestCase):
+    """プロセス監視・再起動・切り替えの動作を確認する。"""
+
+    def test_restarts_crashed_server(self) -> None:
+        supervisor = AquesTalkSupervisor([_fake_server_instance()])
+        supervisor.start()
+        try:
+            supervisor.wait_until_healthy(STARTUP_TIMEOUT)
+            restarts = aquestalk_supervisor.RESTARTS_TOTAL.value()
+            supervisor._instances[0].process.kill()  # type: ignore[union-attr]
+
+            self.assertTrue(_wait_until(
+                lambda: aquestalk_supervisor.RESTARTS_TOTAL.value() > restarts))
+            supervisor.wait_until_healthy(STARTUP_TIMEOUT)
+            self.assertTrue(supervisor.is_healthy())
+        finally:
+            supervisor.shutdown()
+
+    def test_fails_over_to_warm_standby(self) -> None:
+        primary, standby = _fake_server_instance(), _fake_server_instance()
+        supervisor = AquesTalkSupervisor([primary, standby])
+        supervisor.start()
+        try:
+            self.assertTrue(_wait_until(
+                lambda: all(i.healthy for i in supervisor._instances)))
+            self.assertEqual(supervisor.active_url, primary[0])
+
+            supervisor._instances[0].process.kill()  # type: ignore[union-attr]
+            switched_at = time.monotonic()
+            supervisor.report_failure(primary[0])
+            self.assertEqual(supervisor.active_url, standby[0])
+            self.assertLess(time.monotonic() - switched_at, 1.0)
+        finally:
+            supervisor.shutdown()
+
+    def test_restarts_hung_server(self) -> None:
+        """起動しても応答しないプロセスは hung とみなして再起動すること。"""
+        hung = ('http://127.0.0.1:9',
+                [sys.executable, '-c', 'import time; time.sleep(60)'])
+        with mock.patch.object(aquestalk_supervisor, 'SERVER_STARTUP_GRACE', 0.0):
+            supervisor = AquesTalkSupervisor([hung])
+            restarts = aquestalk_supervisor.RESTARTS_TOTAL.value()
+            supervisor.start()
+            try:
+                self.assertTrue(_wait_until(
+                    lambda: aquestalk_supervisor.RESTARTS_TOTAL.value() > restarts,
+                    timeout=5.0))
+                with self.assertRaises(RuntimeError):
+                    supervisor.wait_until_healthy(0.1)
+            finally:
+                supervisor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
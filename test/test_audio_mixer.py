@@ -0,0 +1,134 @@
+"""AudioMixer による複数音源の合成のテスト。"""
+from __future__ import annotations
+
+import io
+import sys
+import threading
+import time
+import unittest
+import wave
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.voice.speaker import audio_player
+from source.voice.speaker.audio_mixer import AudioMixer, convert, decode_wav
+
+BLOCK_FRAMES = 64
+
+
+def _wav(value: float, frames: int, rate: int = 8000,
+         channels: int = 1) -> bytes:
+    samples = np.full(frames * channels, int(value * 32767), dtype='<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def _pcm(block: bytes) -> np.ndarray:
+    return np.frombuffer(block, dtype='<i2').reshape(-1, 2) / 32767.0
+
+
+class _PacedSink:
+    """ブロックの再生時間ぶん待つ、音を出さない出力先。"""
+
+    def __init__(self, sample_rate: int) -> None:
+        self._sample_rate = sample_rate
+        self.blocks = 0
+
+    def write(self, pcm: bytes) -> None:
+        self.blocks += 1
+        time.sleep(len(pcm) / 4 / self._sample_rate)
+
+    def close(self) -> None:
+        pass
+
+
+class TestAudioMixer(unittest.TestCase):
+    """音量つきの合成・周波数変換・音源ごとの停止を確認する。"""
+
+    def _mixer(self, sink=None) -> AudioMixer:
+        return AudioMixer(sink or _PacedSink(8000), sample_rate=8000,
+                          channels=2, block_frames=BLOCK_FRAMES)
+
+    def test_streams_are_summed_with_gain(self) -> None:
+        mixer = self._mixer()
+        mixer.add(_wav(0.5, BLOCK_FRAMES), 'voice', gain=1.0)
+        mixer.add(_wav(0.5, BLOCK_FRAMES // 2), 'jingle', gain=0.4)
+        block, finished = mixer.mix_block()
+        pcm = _pcm(block)
+        np.testing.assert_allclose(pcm[0], [0.7, 0.7], atol=1e-3)
+        np.testing.assert_allclose(pcm[-1], [0.5, 0.5], atol=1e-3)
+        self.assertEqual(len(finished), 2)
+        self.assertEqual(mixer.active_count(), 0)
+
+    def test_sum_is_clipped(self) -> None:
+        mixer = self._mixer()
+        mixer.add(_wav(0.8, BLOCK_FRAMES))
+        mixer.add(_wav(0.8, BLOCK_FRAMES))
+        pcm = _pcm(mixer.mix_block()[0])
+        self.assertAlmostEqual(float(pcm.max()), 1.0, places=3)
+
+    def test_sample_rate_and_channels_are_converted(self) -> None:
+        samples, rate = decode_wav(_wav(0.25, 100, rate=16000))
+        converted = convert(samples, rate, 8000, 2)
+        self.assertEqual(converted.shape, (50, 2))
+        np.testing.assert_allclose(converted, 0.25, atol=1e-3)
+
+    def test_stop_only_named_stream(self) -> None:
+        """名前を指定した停止で、他の音源は再生され続けること。"""
+        mixer = self._mixer().start()
+        self.addCleanup(mixer.close)
+        voice = mixer.add(_wav(0.5, 8000), 'voice')
+        jingle = mixer.add(_wav(0.5, 800), 'jingle')
+        self.assertTrue(voice.wait_started(1.0))
+
+        stopper = threading.Timer(0.02, mixer.stop, args=('voice',))
+        stopper.start()
+        started = time.monotonic()
+        self.assertFalse(voice.wait(1.0))
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertTrue(voice.stopped)
+        self.assertTrue(jingle.wait(1.0))
+
+
+class TestMixerPlayRoute(unittest.TestCase):
+    """mixer 再生で /play の音声が重ねて再生されることを確認する。"""
+
+    def test_overlapping_plays_finish_together(self) -> None:
+        mixer = AudioMixer(_PacedSink(8000), sample_rate=8000, channels=2,
+                           block_frames=BLOCK_FRAMES).start()
+        self.addCleanup(mixer.close)
+        patches = (mock.patch.object(audio_player, 'AUDIO_PLAYER_BACKEND', 'mixer'),
+                   mock.patch.object(audio_player, '_mixer', mixer))
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        client = audio_player.app.test_client()
+        audio = _wav(0.3, 2400)  # 0.3 秒
+        results: list[dict] = []
+
+        def _play(name: str) -> None:
+            results.append(client.post(f'/play?stream={name}&gain=0.5',
+                                       data=audio).get_json())
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=_play, args=(name,))
+                   for name in ('reimu', 'marisa')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(time.monotonic() - started, 0.55)
+        self.assertEqual([r['played'] for r in results], [True, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
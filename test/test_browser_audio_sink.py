@@ -0,0 +1,84 @@
+"""BrowserAudioSink のペーシングとブラウザ再生モードのイベントのテスト。"""
+from __future__ import annotations
+
+import base64
+import io
+import sys
+import threading
+import time
+import unittest
+import wave
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.speak.speak_job import SpeakJob
+from source.voice.speaker.browser_audio_sink import BrowserAudioSink
+from source.voice.voice_manager import VoiceManager
+
+
+def _silent_wav(seconds: float, sample_rate: int = 8000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(b'\x00\x00' * int(seconds * sample_rate))
+    return buffer.getvalue()
+
+
+class _StubGenerator:
+    def __init__(self, audio: bytes) -> None:
+        self._audio = audio
+
+    def synthesize(self, sentence, job=None, token=None):
+        return self._audio
+
+    def analyze(self, audio_data, interval=0.01, sentence=None, speed=None):
+        return audio_data, [0.5, 0.0], 0.01
+
+
+class TestBrowserAudioSink(unittest.TestCase):
+    """ブラウザ再生位置に合わせた送出待ちを確認する。"""
+
+    def test_paces_to_playback_minus_lead(self) -> None:
+        """2 文目以降は前の文の再生終了 - 先行秒数まで待つこと。"""
+        sink = BrowserAudioSink(lead_seconds=0.1)
+        audio = _silent_wav(0.3)
+        started = time.monotonic()
+        job = SpeakJob('こんにちは')
+        sink.play(audio, job)
+        sink.play(audio, job)
+        elapsed = time.monotonic() - started
+        # 0.6 秒分の音声を 0.1 秒先行して送るので約 0.5 秒
+        self.assertGreaterEqual(elapsed, 0.45)
+        self.assertLess(elapsed, 0.58)
+        self.assertIn('first_audio', job.marks)
+
+    def test_stop_releases_waiting_play(self) -> None:
+        """stop で待機中の play がすぐ戻ること。"""
+        sink = BrowserAudioSink(lead_seconds=0.0)
+        result: list[bool] = []
+        thread = threading.Thread(
+            target=lambda: result.append(sink.play(_silent_wav(5.0))))
+        thread.start()
+        time.sleep(0.05)
+        sink.stop()
+        thread.join(timeout=1.0)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(result, [True])
+
+    def test_voice_manager_attaches_audio(self) -> None:
+        """ブラウザ再生モードでは口パクイベントに WAV が添付されること。"""
+        audio = _silent_wav(0.01)
+        vm = VoiceManager(voice_generator=_StubGenerator(audio),
+                          audio_player=BrowserAudioSink(lead_seconds=1.0))
+        self.addCleanup(vm.close)
+        vm.speak_stream('あ。い')
+        data = vm.dequeue_sound()
+        self.assertIsNotNone(data)
+        self.assertEqual(base64.b64decode(data.audio), audio)
+
+
+if __name__ == '__main__':
+    unittest.main()
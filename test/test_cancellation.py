@@ -0,0 +1,96 @@
+"""CancellationToken による合成リクエストの取り消しのテスト。"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmark.fake_aquestalk_server import FakeAquesTalkServer
+from source.monitoring.metrics import (
+    TTS_CANCELLED_TOTAL,
+    TTS_WASTED_SECONDS_TOTAL,
+)
+from source.speak.cancellation import CancellationToken, OperationCancelled
+from source.voice.speaker import aquestalk_generator
+from source.voice.speaker.aquestalk_generator import AquesTalkGenerator
+
+SERVER_LATENCY = 0.5
+
+
+class TestCancellationToken(unittest.TestCase):
+
+    def test_callbacks_run_once_on_cancel(self) -> None:
+        token = CancellationToken()
+        calls: list[str] = []
+        token.add_callback(lambda: calls.append('a'))
+        token.cancel()
+        token.cancel()
+        # 取り消し後に登録したコールバックはすぐに呼ばれる
+        token.add_callback(lambda: calls.append('b'))
+        self.assertEqual(calls, ['a', 'b'])
+        with self.assertRaises(OperationCancelled):
+            token.raise_if_cancelled()
+
+
+class TestAbortableSynthesis(unittest.TestCase):
+    """合成中のリクエストが取り消しで即座に打ち切られることを確認する。"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._server = FakeAquesTalkServer(latency=SERVER_LATENCY).start()
+        cls._generator = AquesTalkGenerator(cls._server.url,
+                                            launch_server=False)
+        # openai の import を済ませ、取り消しまでの時間に含めない
+        cls._generator.warm_up()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._generator.close()
+        cls._server.stop()
+
+    def test_cancel_returns_before_response(self) -> None:
+        token = CancellationToken()
+        cancelled_before = TTS_CANCELLED_TOTAL.value()
+        wasted_before = TTS_WASTED_SECONDS_TOTAL.value()
+        threading.Timer(0.05, token.cancel).start()
+
+        started = time.monotonic()
+        with self.assertRaises(OperationCancelled):
+            self._generator.generate_audio('こんにちは', token)
+        self.assertLess(time.monotonic() - started, SERVER_LATENCY / 2)
+        self.assertEqual(TTS_CANCELLED_TOTAL.value(), cancelled_before + 1)
+
+        # 接続を切断してリクエストを打ち切り、打ち切るまでの時間だけが
+        # 無駄な合成時間として計上される（応答を待ち続けない）
+        deadline = time.monotonic() + 3.0
+        while (TTS_WASTED_SECONDS_TOTAL.value() == wasted_before
+               and time.monotonic() < deadline):
+            time.sleep(0.02)
+        wasted = TTS_WASTED_SECONDS_TOTAL.value() - wasted_before
+        self.assertGreater(wasted, 0.0)
+        self.assertLess(wasted, SERVER_LATENCY / 2)
+
+    def test_uncancelled_token_returns_audio(self) -> None:
+        audio = self._generator.generate_audio('あ', CancellationToken())
+        self.assertGreater(len(audio), 44)
+
+    def test_timeout_is_reported_as_openai_timeout(self) -> None:
+        # 切断できるトランスポートでも httpx の例外に変換され、openai が
+        # タイムアウトとして扱う
+        from openai import APITimeoutError
+        with mock.patch.object(aquestalk_generator,
+                               'AQUESTALK_REQUEST_TIMEOUT', 0.05):
+            client = aquestalk_generator._SpeechClient(self._server.url)
+        self.addCleanup(client.close)
+        with self.assertRaises(APITimeoutError):
+            self._generator._request_audio(self._server.url, 'あ',
+                                           client=client)
+
+
+if __name__ == '__main__':
+    unittest.main()
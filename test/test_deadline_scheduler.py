@@ -0,0 +1,178 @@
+"""DeadlineScheduler による期限切れジョブの破棄のテスト。"""
+from __future__ import annotations
+
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.live_yukkuri_runner import LiveYukkuriRunner
+from source.settings.live_settings import LIVE_SETTINGS
+from source.speak.deadline_scheduler import (
+    SPEAK_DROPPED_TOTAL,
+    SPEAK_REJECTED_TOTAL,
+    DeadlineScheduler,
+    DurationEstimator,
+)
+from source.speak.speak_job import SpeakJob
+from source.voice.speech_pipeline import Utterance
+
+
+class _RecordingVoiceManager:
+    def __init__(self) -> None:
+        self.spoken: list[str] = []
+
+    def speak_async(self, text: str, job: SpeakJob | None = None,
+                    admit=None) -> Utterance:
+        self.spoken.append(text)
+        utterance = Utterance(text, job, admit=admit)
+        utterance.played_count = 1
+        utterance.complete()
+        return utterance
+
+    def pipeline_queue_size(self) -> int:
+        return 0
+
+    def sound_queue_size(self) -> int:
+        return 0
+
+    def dequeue_sound(self) -> dict | None:
+        return None
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    """推定所要時間と期限の比較を確認する。"""
+
+    def setUp(self) -> None:
+        self._scheduler = DeadlineScheduler(
+            DurationEstimator(seconds_per_char=0.1, overhead=0.0))
+
+    def test_job_within_deadline_is_unchanged(self) -> None:
+        job = SpeakJob('こんにちは。', ttl=10.0)
+        self.assertTrue(self._scheduler.admit(job))
+        self.assertEqual(job.text, 'こんにちは。')
+
+    def test_job_without_deadline_is_admitted(self) -> None:
+        job = SpeakJob('あ' * 1000)
+        self.assertTrue(self._scheduler.admit(job))
+
+    def test_long_job_taken_in_time_is_read_in_full(self) -> None:
+        """期限内に取り出したテキストは、読み上げに ttl より長くかかっても短縮しないこと。"""
+        text = 'こんにちは。' + 'あ' * 500
+        job = SpeakJob(text, ttl=1.0)
+        self.assertTrue(self._scheduler.admit(job, now=job.enqueued_at + 0.9))
+        self.assertEqual(job.text, text)
+
+    def test_stale_job_is_dropped(self) -> None:
+        """キューで期限を過ぎたテキストは破棄すること。"""
+        job = SpeakJob('こんにちは。', ttl=1.0)
+        before = SPEAK_DROPPED_TOTAL.value()
+        self.assertFalse(self._scheduler.admit(job, now=job.enqueued_at + 1.1))
+        self.assertEqual(SPEAK_DROPPED_TOTAL.value(), before + 1)
+
+    def test_job_that_cannot_start_in_time_is_dropped(self) -> None:
+        """前の発話の残り時間を足すと期限に間に合わないテキストは破棄すること。"""
+        job = SpeakJob('こんにちは。', ttl=1.0)
+        now = job.enqueued_at + 0.5
+        self.assertTrue(self._scheduler.admit(job, now=now, ahead=0.4))
+        self.assertFalse(self._scheduler.admit(job, now=now, ahead=0.6))
+
+    def test_estimator_learns_from_measurements(self) -> None:
+        estimator = DurationEstimator(seconds_per_char=0.1, overhead=0.0)
+        for _ in range(50):
+            estimator.observe('あいうえお', 2.5)
+        self.assertAlmostEqual(estimator.seconds_per_char, 0.5, places=3)
+
+    def test_estimate_follows_voice_speed(self) -> None:
+        """別の話速で測った音声の長さを、現在の話速に換算して使うこと。"""
+        estimator = DurationEstimator(seconds_per_char=0.1, overhead=0.0)
+        for _ in range(50):
+            estimator.observe('あいうえお', 1.0, speed=2.0)
+        speed = LIVE_SETTINGS.current.voice_speed
+        self.assertAlmostEqual(estimator.seconds_per_char, 0.2 * 2.0 / speed,
+                               places=3)
+
+    def test_accept_rejects_when_queue_is_too_long(self) -> None:
+        scheduler = DeadlineScheduler(
+            DurationEstimator(seconds_per_char=0.1, overhead=0.0),
+            max_queue_eta=10.0)
+        before = SPEAK_REJECTED_TOTAL.value()
+        self.assertIsNone(scheduler.accept('あ' * 10, None, queue_eta=5.0))
+        self.assertIsNotNone(scheduler.accept('あ' * 10, None, queue_eta=9.5))
+        # 期限までに読み始められない
+        self.assertIsNotNone(scheduler.accept('こんにちは。', 1.0, queue_eta=2.0))
+        self.assertEqual(SPEAK_REJECTED_TOTAL.value(), before + 2)
+
+    def test_accept_never_rejects_on_empty_queue(self) -> None:
+        """キューが空なら、ttl より長くかかるテキストでも受け付けること。"""
+        self.assertIsNone(self._scheduler.accept('あ' * 500, 1.0, queue_eta=0.0))
+
+
+class TestRunnerDeadline(unittest.TestCase):
+    """speak worker が期限切れのジョブを読み上げないことを確認する。"""
+
+    def test_expired_job_is_not_spoken(self) -> None:
+        voice_manager = _RecordingVoiceManager()
+        # 受付時には間に合う見込みのジョブが、取り出すまでに期限切れになる場合
+        scheduler = DeadlineScheduler(
+            DurationEstimator(seconds_per_char=0.0001, overhead=0.0))
+        runner = LiveYukkuriRunner(voice_manager=voice_manager,
+                                   deadline_scheduler=scheduler)
+        client = runner.outbound_app.test_client()
+        stale_id = client.post('/speak', json={'text': '古いコメント。',
+                                               'ttl': 0.01}).get_json()['job_id']
+        fresh_id = client.post('/speak', json={'text': '新しいコメント。'}
+                               ).get_json()['job_id']
+        time.sleep(0.05)
+
+        runner.start_workers()
+        self.addCleanup(runner.stop_workers)
+        runner.join_speak_queue()
+
+        self.assertEqual(voice_manager.spoken, ['新しいコメント。'])
+        stale = client.get(f'/speak_status/{stale_id}').get_json()['job']
+        fresh = client.get(f'/speak_status/{fresh_id}').get_json()['job']
+        self.assertEqual(stale['state'], SpeakJob.EXPIRED)
+        self.assertEqual(fresh['state'], SpeakJob.DONE)
+
+    def test_queue_eta_and_admission(self) -> None:
+        """受付済みのテキストの推定時間が /status に現れ、上限を超えると 429 になること。"""
+        scheduler = DeadlineScheduler(
+            DurationEstimator(seconds_per_char=0.1, overhead=0.0),
+            max_queue_eta=1.0)
+        runner = LiveYukkuriRunner(voice_manager=_RecordingVoiceManager(),
+                                   deadline_scheduler=scheduler)
+        client = runner.outbound_app.test_client()
+        first = client.post('/speak', json={'text': 'あいうえお'}).get_json()
+        second = client.post('/speak', json={'text': 'かきくけこ'}).get_json()
+        self.assertAlmostEqual(first['queue_eta_seconds'], 0.0)
+        self.assertAlmostEqual(second['queue_eta_seconds'], 0.5)
+        rejected = client.post('/speak', json={'text': 'さしすせそ'})
+        self.assertEqual(rejected.status_code, 429)
+        status = client.get('/status').get_json()
+        self.assertAlmostEqual(status['queue_eta_seconds'], 1.0)
+
+        runner.start_workers()
+        self.addCleanup(runner.stop_workers)
+        runner.join_speak_queue()
+        self.assertEqual(runner.queue_eta(), 0.0)
+
+    def test_invalid_ttl_is_rejected(self) -> None:
+        runner = LiveYukkuriRunner(voice_manager=_RecordingVoiceManager())
+        client = runner.outbound_app.test_client()
+        response = client.post('/speak', json={'text': 'a', 'ttl': -1})
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_object_body_is_rejected(self) -> None:
+        runner = LiveYukkuriRunner(voice_manager=_RecordingVoiceManager())
+        client = runner.outbound_app.test_client()
+        for body in ('"hello"', '[1]', 'true'):
+            response = client.post('/speak', data=body,
+                                   content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+
+
+if __name__ == '__main__':
+    unittest.main()
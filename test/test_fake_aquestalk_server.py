@@ -0,0 +1,92 @@
+"""偽 AquesTalk サーバーを使った VoiceGenerator / VoiceManager のテスト。
+
+aquestalk-server.exe や winsound なしで実行できる。
+"""
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmark.fake_aquestalk_server import FakeAquesTalkServer
+from benchmark.simulated_audio_player import SimulatedAudioPlayer, wav_duration
+from source.speak.speak_job import SpeakJob
+from source.voice.speaker.aquestalk_generator import AquesTalkGenerator
+from source.voice.speaker.voice_generator import VoiceGenerator
+from source.voice.voice_manager import VoiceManager
+
+from configuration.person_settings import (
+    VOICE_SCALE_FACTOR
+)
+
+
+class TestFakeAquesTalkServer(unittest.TestCase):
+    """偽サーバー経由で音声生成パイプラインが動作すること。"""
+
+    _server: FakeAquesTalkServer
+    _generator: VoiceGenerator
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._server = FakeAquesTalkServer(seconds_per_char=0.05).start()
+        cls._generator = VoiceGenerator(
+            AquesTalkGenerator(cls._server.url, launch_server=False))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._server.stop()
+
+    def test_generate_sequential_per_sentence(self) -> None:
+        """文ごとに WAV と正規化済み音量値が生成されること。"""
+        chunks = list(self._generator.generate_sequential(
+            "こんにちは。よろしくね！"))
+        self.assertEqual(len(chunks), 2)
+        for audio_data, sound_values, sample_time in chunks:
+            self.assertGreater(len(audio_data), 44)
+            self.assertGreater(len(sound_values), 0)
+            self.assertGreater(sample_time, 0)
+            for v in sound_values:
+                self.assertGreaterEqual(v, 0.0)
+                self.assertLessEqual(v, VOICE_SCALE_FACTOR)
+
+    def test_duration_scales_with_text_length(self) -> None:
+        """文字数に比例した長さの音声が返ること。"""
+        short, _, _ = self._generator.generate("あい")
+        long, _, _ = self._generator.generate("あいうえおかきくけこ")
+        self.assertGreater(wav_duration(long), wav_duration(short) * 3)
+
+    def test_job_speed_is_used_for_synthesis(self) -> None:
+        """ジョブの話速で合成され、口パクの sample_time は変わらないこと。"""
+        text = "あいうえおかきくけこ"
+        normal = SpeakJob(text)
+        normal.speed = 1.0
+        fast = SpeakJob(text)
+        fast.speed = 2.0
+        [(normal_audio, normal_values, normal_sample_time)] = list(
+            self._generator.generate_sequential(text, job=normal))
+        [(fast_audio, fast_values, fast_sample_time)] = list(
+            self._generator.generate_sequential(text, job=fast))
+        self.assertLess(wav_duration(fast_audio),
+                        wav_duration(normal_audio) * 0.6)
+        self.assertLess(len(fast_values), len(normal_values))
+        self.assertEqual(fast_sample_time, normal_sample_time)
+
+    def test_voice_manager_records_first_audio(self) -> None:
+        """VoiceManager.speak() が再生開始時刻をジョブに記録すること。"""
+        manager = VoiceManager(self._generator,
+                               SimulatedAudioPlayer(speedup=20.0))
+        self.addCleanup(manager.close)
+        job = SpeakJob("テスト")
+        audio_data, sound_values, _ = manager.speak(job.text, job)
+        self.assertGreater(len(audio_data), 0)
+        self.assertGreater(len(sound_values), 0)
+        self.assertIn('first_audio', job.marks)
+        data = manager.dequeue_sound()
+        self.assertIsNotNone(data)
+        self.assertEqual(data.job_id, job.job_id)  # type: ignore[union-attr]
+
+
+if __name__ == '__main__':
+    unittest.main()
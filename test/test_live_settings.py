@@ -0,0 +1,73 @@
+"""LiveSettings による person_settings の再読み込みのテスト。"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.settings.live_settings import LiveSettings
+
+SETTINGS_TEMPLATE = '''
+VOICE_SPEED = {speed}
+VOICE_SCALE_FACTOR = 1.5
+MOUSE_DELAY_TIME = 0.5
+TEXT_FOR_SPEAK_REPLACEMENTS = {{"私": "わたし", "草": "くさ"}}
+'''
+
+
+class TestLiveSettings(unittest.TestCase):
+    """設定の差し替え・検証・ファイル監視を確認する。"""
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = Path(self._directory.name) / 'person_settings.py'
+        self._write(SETTINGS_TEMPLATE.format(speed=1.2))
+        self._settings = LiveSettings(self._path)
+
+    def tearDown(self) -> None:
+        self._settings.stop_watching()
+        self._directory.cleanup()
+
+    def _write(self, text: str) -> None:
+        self._path.write_text(text, encoding='utf-8')
+        # 更新時刻の分解能が粗いファイルシステムでも変更を検出させる
+        stamp = time.time() + getattr(self, '_bump', 0)
+        self._bump = getattr(self, '_bump', 0) + 1
+        os.utime(self._path, (stamp, stamp))
+
+    def test_reload_swaps_values(self) -> None:
+        old = self._settings.current
+        self._write(SETTINGS_TEMPLATE.format(speed=1.5))
+        new, changed = self._settings.reload()
+        self.assertEqual(changed, ['VOICE_SPEED'])
+        self.assertEqual(self._settings.current.voice_speed, 1.5)
+        # 以前のスナップショットは変更されない
+        self.assertEqual(old.voice_speed, 1.2)
+        self.assertEqual(new.replace_text('私は草'), 'わたしはくさ')
+
+    def test_invalid_file_keeps_current_settings(self) -> None:
+        self._write(SETTINGS_TEMPLATE.format(speed=-1))
+        with self.assertRaises(ValueError):
+            self._settings.reload()
+        self._write('VOICE_SPEED = (')
+        with self.assertRaises(SyntaxError):
+            self._settings.reload()
+        self.assertEqual(self._settings.current.voice_speed, 1.2)
+
+    def test_watcher_applies_changes(self) -> None:
+        self._settings.start_watching(0.02)
+        self._write(SETTINGS_TEMPLATE.format(speed=2.0))
+        deadline = time.monotonic() + 2.0
+        while (self._settings.current.voice_speed != 2.0
+               and time.monotonic() < deadline):
+            time.sleep(0.02)
+        self.assertEqual(self._settings.current.voice_speed, 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""load_generator の到着パターン・集計処理のテスト。"""
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmark.load_generator import (
+    bursty_arrivals,
+    constant_arrivals,
+    load_replay_log,
+    queue_growth_rate,
+)
+
+
+class TestLoadGenerator(unittest.TestCase):
+    """到着時刻の生成とキュー増加率の計算を確認する。"""
+
+    def test_constant_arrivals(self) -> None:
+        self.assertEqual(constant_arrivals(2.0, 2.0), [0.0, 0.5, 1.0, 1.5])
+
+    def test_bursty_arrivals(self) -> None:
+        self.assertEqual(bursty_arrivals(3, 5.0, 10.0),
+                         [0.0, 0.0, 0.0, 5.0, 5.0, 5.0])
+
+    def test_queue_growth_rate(self) -> None:
+        samples = [(float(t), 2 * t) for t in range(5)]
+        self.assertAlmostEqual(queue_growth_rate(samples), 2.0)
+        self.assertEqual(queue_growth_rate([(0.0, 3)]), 0.0)
+
+    def test_load_replay_log_sorts_and_defaults_op(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'traffic.jsonl'
+            path.write_text('\n'.join([
+                json.dumps({'t': 1.5, 'op': 'stop'}),
+                json.dumps({'t': 0.5, 'text': '草'}, ensure_ascii=False),
+            ]), encoding='utf-8')
+            events = load_replay_log(path)
+        self.assertEqual(events, [(0.5, 'speak', '草'), (1.5, 'stop', '')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""MetricsRegistry / SpeakJob の単体テスト。
+
+aquestalk-server.exe なしで実行できる。
+"""
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.monitoring.metrics import MetricsRegistry
+from source.speak.speak_job import SpeakJob
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Prometheus テキスト形式の出力を確認する。"""
+
+    def setUp(self) -> None:
+        self._registry = MetricsRegistry()
+
+    def test_counter_with_labels(self) -> None:
+        counter = self._registry.counter('jobs_total', 'Jobs.')
+        counter.inc(state='done')
+        counter.inc(2, state='done')
+        counter.inc(state='failed')
+        text = self._registry.render()
+        self.assertIn('# TYPE jobs_total counter', text)
+        self.assertIn('jobs_total{state="done"} 3', text)
+        self.assertIn('jobs_total{state="failed"} 1', text)
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        histogram = self._registry.histogram(
+            'stage_seconds', 'Stages.', buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage='tts')
+        histogram.observe(0.5, stage='tts')
+        histogram.observe(5.0, stage='tts')
+        text = self._registry.render()
+        self.assertIn('stage_seconds_bucket{stage="tts",le="0.1"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="tts",le="1"} 2', text)
+        self.assertIn('stage_seconds_bucket{stage="tts",le="+Inf"} 3', text)
+        self.assertIn('stage_seconds_count{stage="tts"} 3', text)
+
+    def test_summary_quantiles(self) -> None:
+        summary = self._registry.summary('ttfa_seconds', 'TTFA.')
+        for i in range(100):
+            summary.observe(i / 100)
+        self.assertAlmostEqual(summary.quantile(0.5), 0.5)
+        self.assertAlmostEqual(summary.quantile(0.99), 0.99)
+        self.assertIn('ttfa_seconds{quantile="0.95"} 0.95',
+                      self._registry.render())
+
+    def test_gauge_callback_evaluated_on_render(self) -> None:
+        calls: list[int] = []
+
+        def _depth() -> float:
+            calls.append(1)
+            return 7
+
+        self._registry.set_gauge_callback('queue_depth', 'Depth.', _depth)
+        self.assertEqual(calls, [])
+        self.assertIn('queue_depth 7', self._registry.render())
+        self.assertEqual(len(calls), 1)
+
+    def test_same_name_returns_same_metric(self) -> None:
+        a = self._registry.counter('c_total', 'C.')
+        b = self._registry.counter('c_total', 'C.')
+        self.assertIs(a, b)
+
+
+class TestSpeakJob(unittest.TestCase):
+    """SpeakJob のタイムスタンプ記録を確認する。"""
+
+    def test_mark_is_not_overwritten(self) -> None:
+        job = SpeakJob('テスト')
+        first = job.mark('dequeued')
+        second = job.mark('dequeued')
+        self.assertEqual(first, second)
+        self.assertGreaterEqual(job.elapsed('enqueued', 'dequeued'), 0.0)
+
+    def test_elapsed_missing_stage(self) -> None:
+        job = SpeakJob('テスト')
+        self.assertIsNone(job.elapsed('enqueued', 'finished'))
+
+    def test_job_ids_are_unique(self) -> None:
+        self.assertNotEqual(SpeakJob('a').job_id, SpeakJob('b').job_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""SamplingProfiler / dump_thread_stacks のテスト。"""
+from __future__ import annotations
+
+import io
+import pstats
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.monitoring.profiler import SamplingProfiler, dump_thread_stacks
+
+
+def _busy_loop(stop_event: threading.Event) -> None:
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    """別スレッドの処理がサンプリング結果に現れることを確認する。"""
+
+    def setUp(self) -> None:
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=_busy_loop, args=(self._stop_event,), name='busy-worker')
+        self._thread.start()
+
+    def tearDown(self) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def test_collapsed_contains_thread_and_function(self) -> None:
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.run(0.2)
+        self.assertGreater(profiler.sample_count, 0)
+        collapsed = profiler.collapsed()
+        self.assertTrue(any(line.startswith('busy-worker;')
+                            and '_busy_loop' in line
+                            for line in collapsed.splitlines()))
+
+    def test_pstats_output_is_loadable(self) -> None:
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.run(0.2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'profile.pstats'
+            path.write_bytes(profiler.pstats_bytes())
+            stream = io.StringIO()
+            stats = pstats.Stats(str(path), stream=stream)
+            stats.sort_stats('cumulative').print_stats(5)
+        self.assertIn('_busy_loop', stream.getvalue())
+
+    def test_dump_thread_stacks(self) -> None:
+        dump = dump_thread_stacks()
+        self.assertIn('Thread busy-worker', dump)
+        self.assertIn('_busy_loop', dump)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""ReadinessTracker のテスト。"""
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.monitoring.readiness import ReadinessTracker
+
+
+class TestReadinessTracker(unittest.TestCase):
+    """並行起動したサブシステムの状態遷移を確認する。"""
+
+    def test_ready_after_all_tasks_finish(self) -> None:
+        tracker = ReadinessTracker()
+        release = threading.Event()
+        slow = tracker.start_in_background('synthesis', release.wait)
+        fast = tracker.start_in_background('audio_output', lambda: None)
+        fast.join()
+        self.assertFalse(tracker.is_ready())
+        self.assertEqual(tracker.state('audio_output'), ReadinessTracker.READY)
+
+        release.set()
+        slow.join()
+        snapshot = tracker.snapshot()
+        self.assertTrue(snapshot['ready'])
+        self.assertIn('duration', snapshot['subsystems']['synthesis'])
+
+    def test_failed_task_reports_error(self) -> None:
+        tracker = ReadinessTracker()
+
+        def _fail() -> None:
+            raise RuntimeError('aquestalk-server が起動しませんでした')
+
+        tracker.start_in_background('synthesis', _fail).join()
+        snapshot = tracker.snapshot()
+        self.assertFalse(snapshot['ready'])
+        self.assertEqual(snapshot['subsystems']['synthesis']['state'],
+                         ReadinessTracker.FAILED)
+        self.assertIn('起動しませんでした',
+                      snapshot['subsystems']['synthesis']['error'])
+
+    def test_empty_tracker_is_not_ready(self) -> None:
+        self.assertFalse(ReadinessTracker().is_ready())
+
+
+class TestDeferredImports(unittest.TestCase):
+    """重いライブラリが使うときまで import されないことを確認する。"""
+
+    def test_generator_import_does_not_load_heavy_modules(self) -> None:
+        code = ('import sys\n'
+                'import source.voice.speaker.aquestalk_generator\n'
+                'print(sorted({"openai", "numpy", "httpcore"}'
+                ' & set(sys.modules)))\n')
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parents[1], check=True)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
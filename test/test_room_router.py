@@ -0,0 +1,203 @@
+"""RoomRouter によるルームごとの振り分けのテスト。"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.router import room_router
+from source.router.room_router import (
+    ROUTER_WORKER_RESTARTS_TOTAL,
+    RoomRouter,
+    RouterWorker,
+)
+
+
+class _StubWorker:
+    """受け取った /speak を記録する、ランナーの outbound API の代わり。"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.texts: list[str] = []
+        self.stop_requests: list[tuple[str, object, dict]] = []
+        app = Flask(name)
+
+        @app.route('/speak', methods=['POST'])
+        def speak():
+            self.texts.append(request.get_json()['text'])
+            return jsonify({'status': 'ok', 'job_id': f'{name}-{len(self.texts)}'})
+
+        @app.route('/speak_status/<job_id>', methods=['GET'])
+        def speak_status(job_id: str):
+            return jsonify({'status': 'ok', 'job': {'job_id': job_id}})
+
+        @app.route('/voice_output_stop_flag', methods=['POST', 'PUT'])
+        def voice_output_stop_flag():
+            self.stop_requests.append((request.method,
+                                       request.get_json(silent=True),
+                                       request.args.to_dict()))
+            return jsonify({'status': 'ok'})
+
+        @app.route('/status', methods=['GET'])
+        def status():
+            return jsonify({'status': 'ok', 'queue_depth': len(self.texts),
+                            'jobs': {'done': len(self.texts)}})
+
+        self._server = make_server('127.0.0.1', 0, app, threaded=True)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self.worker = RouterWorker(
+            name, f'http://127.0.0.1:{self._server.server_port}')
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._thread.join()
+
+
+class TestRendezvousHashing(unittest.TestCase):
+    """ルームの割り当てが安定し、ワーカーの追加で一部だけが移ることを確認する。"""
+
+    @staticmethod
+    def _router(count: int) -> RoomRouter:
+        return RoomRouter([RouterWorker(f'worker-{i}', 'http://127.0.0.1:9')
+                           for i in range(count)])
+
+    def test_assignment_is_stable_and_spread(self) -> None:
+        router = self._router(3)
+        self.addCleanup(router.close)
+        rooms = [f'room-{i}' for i in range(300)]
+        first = [router.worker_for(room).name for room in rooms]
+        self.assertEqual(first, [router.worker_for(room).name for room in rooms])
+        for name in ('worker-0', 'worker-1', 'worker-2'):
+            self.assertGreater(first.count(name), 50)
+
+    def test_adding_worker_moves_only_its_rooms(self) -> None:
+        before, after = self._router(3), self._router(4)
+        self.addCleanup(before.close)
+        self.addCleanup(after.close)
+        for i in range(300):
+            room = f'room-{i}'
+            moved_to = after.worker_for(room).name
+            if moved_to != before.worker_for(room).name:
+                self.assertEqual(moved_to, 'worker-3')
+
+
+class TestRouterWorker(unittest.TestCase):
+    """ランナーのプロセスの起動・再起動を確認する。"""
+
+    def test_crashing_worker_is_restarted_with_backoff(self) -> None:
+        for name, value in (('ROUTER_RESTART_BACKOFF_INITIAL', 0.2),
+                            ('ROUTER_RESTART_BACKOFF_MAX', 10.0)):
+            patch = mock.patch.object(room_router, name, value)
+            patch.start()
+            self.addCleanup(patch.stop)
+        worker = RouterWorker('crashing', 'http://127.0.0.1:9',
+                              command=[sys.executable, '-c', 'pass'])
+        self.addCleanup(worker.terminate)
+        before = ROUTER_WORKER_RESTARTS_TOTAL.value()
+
+        # 転送のたびに再起動せず、0.2 秒・0.4 秒…と間隔を空ける
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            worker.ensure_running()
+            time.sleep(0.01)
+        self.assertLessEqual(ROUTER_WORKER_RESTARTS_TOTAL.value() - before, 2)
+
+    def test_local_worker_needs_port_args(self) -> None:
+        with mock.patch.object(room_router, 'AQUESTALK_PORT_SERVER_ARGS', None):
+            with self.assertRaises(ValueError):
+                RouterWorker.local('worker-0')
+
+
+class TestRoomRouter(unittest.TestCase):
+    """/speak が同じルームの同じワーカーへ送られ、/status が集計されることを確認する。"""
+
+    def setUp(self) -> None:
+        self.stubs = [_StubWorker(f'worker-{i}') for i in range(2)]
+        for stub in self.stubs:
+            self.addCleanup(stub.close)
+        self.router = RoomRouter([stub.worker for stub in self.stubs])
+        self.addCleanup(self.router.close)
+        self.client = self.router.app.test_client()
+
+    def test_room_is_sent_to_its_worker(self) -> None:
+        rooms = [f'room-{i}' for i in range(10)]
+        for room in rooms * 2:
+            response = self.client.post('/speak', json={'text': room,
+                                                        'room': room})
+            self.assertEqual(response.status_code, 200)
+            body = response.get_json()
+            self.assertEqual(body['room'], room)
+            self.assertEqual(body['worker'],
+                             self.router.worker_for(room).name)
+        for stub in self.stubs:
+            for text in stub.texts:
+                self.assertEqual(self.router.worker_for(text).name, stub.name)
+        self.assertEqual(sum(len(stub.texts) for stub in self.stubs), 20)
+
+        job_id = body['job_id']
+        response = self.client.get(f'/speak_status/{rooms[-1]}/{job_id}')
+        self.assertEqual(response.get_json()['job']['job_id'], job_id)
+
+    def test_status_is_aggregated(self) -> None:
+        for i in range(6):
+            self.client.post('/speak', json={'text': 'x', 'room': f'r{i}'})
+        body = self.client.get('/status').get_json()
+        self.assertEqual(body['queue_depth'], 6)
+        self.assertEqual(body['jobs'], {'done': 6})
+        self.assertEqual([w['available'] for w in body['workers']],
+                         [True, True])
+
+    def test_unavailable_worker_returns_503(self) -> None:
+        self.stubs[0].close()
+        room = next(f'r{i}' for i in range(100)
+                    if self.router.worker_for(f'r{i}').name == 'worker-0')
+        response = self.client.post('/speak', json={'text': 'x', 'room': room})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['status'], 'error')
+
+    def test_non_object_speak_body_returns_400(self) -> None:
+        for body in ('"hello"', '[1]', 'true', 'not json'):
+            response = self.client.post('/speak', data=body,
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+        self.assertEqual(sum(len(stub.texts) for stub in self.stubs), 0)
+
+    def test_stop_flag_is_forwarded_as_the_runner_parses_it(self) -> None:
+        room = 'room-1'
+        target = next(stub for stub in self.stubs
+                      if stub.name == self.router.worker_for(room).name)
+
+        # 本文が真偽値だけでも転送される（ルームなし → すべてのワーカー）
+        response = self.client.post('/voice_output_stop_flag', data='true',
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        for stub in self.stubs:
+            self.assertEqual(stub.stop_requests.pop(), ('POST', True, {}))
+
+        # 本文なしのクエリ指定と PUT
+        response = self.client.put(
+            f'/voice_output_stop_flag?value=1&room={room}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(target.stop_requests, [('PUT', None, {'value': '1'})])
+
+        target.stop_requests.clear()
+        response = self.client.post('/voice_output_stop_flag',
+                                    json={'room': room, 'value': False})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(target.stop_requests,
+                         [('POST', {'value': False}, {})])
+        self.assertEqual(sum(len(stub.stop_requests) for stub in self.stubs), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""silence_trimmer の無音除去のテスト。"""
+from __future__ import annotations
+
+import io
+import sys
+import unittest
+import wave
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmark.fake_aquestalk_server import generate_speech_wav
+from source.voice.speaker.silence_trimmer import speech_bounds, trim_silence
+
+SAMPLE_RATE = 8000
+
+
+def _frames(audio: bytes) -> int:
+    with wave.open(io.BytesIO(audio), 'rb') as wf:
+        return wf.getnframes()
+
+
+class TestSilenceTrimmer(unittest.TestCase):
+    """前後の無音の切り詰めとヘッダの書き直しを確認する。"""
+
+    def test_trims_padding_keeping_margin(self) -> None:
+        """前後の無音が margin だけ残して切り詰められること。"""
+        speech = generate_speech_wav('ゆっくり', sample_rate=SAMPLE_RATE)
+        padded = generate_speech_wav('ゆっくり', sample_rate=SAMPLE_RATE,
+                                     leading_silence=0.2,
+                                     trailing_silence=0.4)
+        trimmed = trim_silence(padded, threshold=0.02, margin=0.05)
+
+        # wave で読めることがヘッダが正しく書き直された確認になる
+        first, end, n_frames = speech_bounds(trimmed, 0.02)
+        self.assertEqual(n_frames, _frames(trimmed))
+        self.assertAlmostEqual(first / SAMPLE_RATE, 0.05, delta=0.002)
+        self.assertLess(_frames(trimmed),
+                        _frames(speech) + int(0.1 * SAMPLE_RATE) + 1)
+
+    def test_silent_audio_is_unchanged(self) -> None:
+        """無音のみの WAV はそのまま返すこと。"""
+        silent = generate_speech_wav('。', sample_rate=SAMPLE_RATE)
+        self.assertIsNone(speech_bounds(silent, 0.02))
+        self.assertIs(trim_silence(silent), silent)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""SoundEvent による口パクイベントの受け渡しのテスト。"""
+from __future__ import annotations
+
+import json
+import sys
+import unittest
+from array import array
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.live_yukkuri_runner import LiveYukkuriRunner
+from source.visualizer.visualize_manager import VisualizeManager
+from source.voice import voice_manager as voice_manager_module
+from source.voice.sound_event import SoundEvent
+from source.voice.voice_manager import VoiceManager
+
+
+class TestSoundEvent(unittest.TestCase):
+    """公開する内容と、SSE メッセージの共有を確認する。"""
+
+    def test_message_contains_only_public_keys(self) -> None:
+        event = SoundEvent(0.05, 'job', sound_values=array('d', [0.25, 1.0]))
+        message = event.sse_message()
+        self.assertTrue(message.startswith('data: '))
+        self.assertTrue(message.endswith('\n\n'))
+        self.assertEqual(json.loads(message[len('data: '):]),
+                         {'sample_time': 0.05, 'job_id': 'job',
+                          'sound_values': [0.25, 1.0]})
+        self.assertIs(event.sse_message(), message)
+
+    def test_unset_keys_are_not_sent(self) -> None:
+        event = SoundEvent(0.05, None, audio='AAAA')
+        self.assertIsNone(event.job_id)
+        self.assertEqual(event.audio, 'AAAA')
+        self.assertEqual(event.to_dict(), {'sample_time': 0.05,
+                                           'job_id': None, 'audio': 'AAAA'})
+
+
+class TestSoundEventFlow(unittest.TestCase):
+    """VoiceManager から各クライアントまで同じイベントが届くことを確認する。"""
+
+    def test_event_is_shared_from_queue_to_clients(self) -> None:
+        voice_manager = VoiceManager(voice_generator=mock.Mock(),
+                                     audio_player=mock.Mock())
+        self.addCleanup(voice_manager.close)
+        runner = LiveYukkuriRunner(voice_manager=voice_manager)
+        visualizer = runner.visualize_manager
+        clients = [visualizer.subscribe_visualizer_sound() for _ in range(2)]
+
+        with mock.patch.object(voice_manager_module,
+                               'VISEME_TRACK_ENABLED', False):
+            voice_manager.enqueue_sound(array('d', [0.5]), 0.05, 'job')
+        event = voice_manager.dequeue_sound()
+        self.assertIsInstance(event, SoundEvent)
+        runner._forward_to_visualizer(event)
+
+        received = [visualizer.wait_and_dequeue_visualizer_sound(0.1, q)
+                    for q in clients]
+        self.assertIs(received[0], event)
+        self.assertIs(received[1], event)
+        self.assertIs(VisualizeManager.sse_message(received[0]),
+                      VisualizeManager.sse_message(received[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
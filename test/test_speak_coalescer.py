@@ -0,0 +1,131 @@
+"""SpeakCoalescer による短いメッセージのまとめ読みのテスト。"""
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.live_yukkuri_runner import LiveYukkuriRunner
+from source.speak.speak_coalescer import SpeakCoalescer
+from source.speak.speak_job import SpeakJob
+from source.voice.speech_pipeline import Utterance
+
+
+class _RecordingVoiceManager:
+    """読み上げたテキストを記録するだけの VoiceManager 代替。"""
+
+    def __init__(self) -> None:
+        self.spoken: list[str] = []
+
+    def speak_async(self, text: str, job: SpeakJob | None = None,
+                    admit=None) -> Utterance:
+        self.spoken.append(text)
+        utterance = Utterance(text, job, admit=admit)
+        utterance.played_count = 1
+        utterance.complete()
+        return utterance
+
+    def pipeline_queue_size(self) -> int:
+        return 0
+
+    def sound_queue_size(self) -> int:
+        return 0
+
+    def dequeue_sound(self) -> dict | None:
+        return None
+
+
+class TestSpeakCoalescer(unittest.TestCase):
+    """窓・文字数上限・長いメッセージの扱いを確認する。"""
+
+    def setUp(self) -> None:
+        self._coalescer = SpeakCoalescer(window=0.0, max_message_length=5,
+                                         max_length=12, separator='、',
+                                         terminator='。')
+        self._queue: queue.Queue = queue.Queue()
+
+    def test_backlog_is_merged_without_waiting(self) -> None:
+        """キューに溜まっている短いメッセージは窓の経過後でもまとめること。"""
+        for text in ('888', 'かわいい'):
+            self._queue.put(SpeakJob(text))
+        batch, leftover = self._coalescer.collect(SpeakJob('草'), self._queue)
+        self.assertEqual(self._coalescer.join(batch), '草、888、かわいい。')
+        self.assertEqual(leftover, [])
+
+    def test_long_message_is_carried_over(self) -> None:
+        """長いメッセージはまとめず、次に処理する項目として返すこと。"""
+        long_job = SpeakJob('今日もゆっくりしていってね')
+        self._queue.put(long_job)
+        batch, leftover = self._coalescer.collect(SpeakJob('草'), self._queue)
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(leftover, [long_job])
+
+    def test_max_length_splits_batches(self) -> None:
+        """合計文字数が上限を超える分は次の発話に回すこと。"""
+        jobs = [SpeakJob(t) for t in ('12345', '12345', '12345')]
+        for job in jobs[1:]:
+            self._queue.put(job)
+        batch, leftover = self._coalescer.collect(jobs[0], self._queue)
+        self.assertEqual(batch, jobs[:2])
+        self.assertEqual(leftover, [jobs[2]])
+
+    def test_waits_for_messages_within_window(self) -> None:
+        """窓の間に届いたメッセージを待ってまとめること。"""
+        coalescer = SpeakCoalescer(window=0.5, max_message_length=5,
+                                   max_length=40)
+        threading.Timer(0.05, lambda: self._queue.put(SpeakJob('888'))).start()
+        started = time.monotonic()
+        batch, _ = coalescer.collect(SpeakJob('草'), self._queue)
+        self.assertEqual([job.text for job in batch], ['草', '888'])
+        self.assertLess(time.monotonic() - started, 0.6)
+
+
+class TestRunnerCoalescing(unittest.TestCase):
+    """speak worker がまとめて読み上げ、各ジョブの状態を更新することを確認する。"""
+
+    def test_burst_is_spoken_once(self) -> None:
+        voice_manager = _RecordingVoiceManager()
+        runner = LiveYukkuriRunner(voice_manager=voice_manager)
+        runner._coalescer = SpeakCoalescer(window=0.0, max_message_length=10,
+                                           max_length=40)
+        client = runner.outbound_app.test_client()
+        job_ids = [client.post('/speak', json={'text': text}).get_json()['job_id']
+                   for text in ('草', '888', 'かわいい')]
+
+        runner.start_workers()
+        self.addCleanup(runner.stop_workers)
+        runner.join_speak_queue()
+
+        self.assertEqual(voice_manager.spoken, ['草、888、かわいい。'])
+        for job_id in job_ids:
+            job = client.get(f'/speak_status/{job_id}').get_json()['job']
+            self.assertEqual(job['state'], SpeakJob.DONE)
+            self.assertIn('finished', job['marks'])
+
+    def test_clear_keeps_stop_request(self) -> None:
+        """停止でキューを空にしても、終了要求は残って worker が終了すること。"""
+        voice_manager = _RecordingVoiceManager()
+        runner = LiveYukkuriRunner(voice_manager=voice_manager)
+        client = runner.outbound_app.test_client()
+        client.post('/speak', json={'text': '草'})
+        runner._speak_text_queue.put(None)  # type: ignore[arg-type]
+
+        runner._clear_speak_text_queue()
+        self.assertIsNone(runner._speak_text_queue.get_nowait())
+        runner._speak_text_queue.task_done()
+
+        runner.start_workers()
+        worker = threading.Thread(target=runner.stop_workers, daemon=True)
+        worker.start()
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive(), 'stop_workers が終了しません')
+        self.assertEqual(voice_manager.spoken, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""SpeakJournal による読み上げキューの記録と復元のテスト。"""
+from __future__ import annotations
+
+import sys
+import tempfile
+import errno
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.live_yukkuri_runner import LiveYukkuriRunner
+from source.speak.speak_job import SpeakJob
+from source.speak import speak_journal
+from source.speak.speak_journal import (
+    JOURNAL_COMMITS_TOTAL,
+    JOURNAL_ERRORS_TOTAL,
+    SpeakJournal,
+)
+from source.voice.speech_pipeline import Utterance
+
+
+class _RecordingVoiceManager:
+    def __init__(self) -> None:
+        self.spoken: list[str] = []
+
+    def speak_async(self, text: str, job: SpeakJob | None = None,
+                    admit=None) -> Utterance:
+        self.spoken.append(text)
+        utterance = Utterance(text, job, admit=admit)
+        utterance.complete()
+        return utterance
+
+    def set_voice_output_stop_flag(self, flag: bool) -> None:
+        pass
+
+    def pipeline_queue_size(self) -> int:
+        return 0
+
+    def sound_queue_size(self) -> int:
+        return 0
+
+    def dequeue_sound(self) -> dict | None:
+        return None
+
+
+class TestSpeakJournal(unittest.TestCase):
+    """未完了の受付だけが次回の起動時に受付順で復元されることを確認する。"""
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self._path = Path(directory.name) / 'speak.journal'
+
+    def _journal(self, **kwargs) -> SpeakJournal:
+        journal = SpeakJournal(self._path, **kwargs)
+        self.addCleanup(journal.close)
+        return journal
+
+    def test_unfinished_jobs_are_recovered_in_order(self) -> None:
+        journal = self._journal()
+        jobs = [SpeakJob(text) for text in ('一', '二', '三')]
+        for job in jobs:
+            journal.record_enqueue(job, 30.0 if job.text == '三' else None)
+        journal.record_finished([jobs[1]])
+        journal.close()
+
+        recovered = self._journal().recover()
+        self.assertEqual([(text, ttl is None) for _, text, ttl in recovered],
+                         [('一', True), ('三', False)])
+        self.assertLessEqual(recovered[1][2], 30.0)
+
+    def test_concurrent_enqueues_share_fsyncs(self) -> None:
+        journal = self._journal()
+        commits_before = JOURNAL_COMMITS_TOTAL.value()
+        threads = [threading.Thread(target=journal.record_enqueue,
+                                    args=(SpeakJob(str(i)), None))
+                   for i in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self._path.read_text('utf-8').splitlines()), 50)
+        self.assertLess(JOURNAL_COMMITS_TOTAL.value() - commits_before, 50)
+
+    def test_finished_records_are_compacted(self) -> None:
+        journal = self._journal(compact_threshold=2)
+        jobs = [SpeakJob(text) for text in ('一', '二', '三')]
+        for job in jobs:
+            journal.record_enqueue(job, None)
+        journal.record_finished(jobs[:2])
+        journal.flush()
+        lines = self._path.read_text('utf-8').splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn('三', lines[0])
+
+    def test_truncated_last_line_is_ignored(self) -> None:
+        journal = self._journal()
+        journal.record_enqueue(SpeakJob('残る'), None)
+        journal.close()
+        with self._path.open('a', encoding='utf-8') as f:
+            f.write('{"op":"enqueue","key":"x","te')
+
+        journal = self._journal()
+        self.assertEqual([text for _, text, _ in journal.recover()], ['残る'])
+        journal.record_enqueue(SpeakJob('次'), None)
+        journal.close()
+        self.assertEqual([text for _, text, _ in self._journal().recover()],
+                         ['残る', '次'])
+
+    def test_runner_speaks_recovered_texts(self) -> None:
+        journal = self._journal()
+        runner = LiveYukkuriRunner(voice_manager=_RecordingVoiceManager(),
+                                   speak_journal=journal)
+        client = runner.outbound_app.test_client()
+        for text in ('一つ目', '二つ目'):
+            self.assertEqual(client.post('/speak', json={'text': text})
+                             .status_code, 200)
+        # ワーカーを起動しないまま終了した（異常終了の代わり）
+        journal.close()
+
+        manager = _RecordingVoiceManager()
+        journal = self._journal()
+        restarted = LiveYukkuriRunner(voice_manager=manager,
+                                      speak_journal=journal)
+        restarted.start_workers()
+        self.addCleanup(restarted.stop_workers)
+        restarted.join_speak_queue()
+        journal.close()
+        self.assertEqual(manager.spoken, ['一つ目', '二つ目'])
+        self.assertEqual(self._journal().recover(), [])
+
+    def test_write_failure_fails_enqueue_instead_of_blocking(self) -> None:
+        """fsync に失敗すると、待っている受付と以降の受付が OSError になり、/speak は 503 を返すこと。"""
+        journal = self._journal()
+        runner = LiveYukkuriRunner(voice_manager=_RecordingVoiceManager(),
+                                   speak_journal=journal)
+        client = runner.outbound_app.test_client()
+        errors_before = JOURNAL_ERRORS_TOTAL.value()
+        full = OSError(errno.ENOSPC, 'No space left on device')
+        results: list[int] = []
+
+        def _speak() -> None:
+            results.append(client.post('/speak', json={'text': 'あ'})
+                           .status_code)
+
+        with mock.patch.object(speak_journal.os, 'fsync', side_effect=full):
+            thread = threading.Thread(target=_speak)
+            thread.start()
+            thread.join(timeout=5.0)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(results, [503])
+        self.assertEqual(JOURNAL_ERRORS_TOTAL.value(), errors_before + 1)
+        with self.assertRaises(OSError):
+            journal.record_enqueue(SpeakJob('い'), None)
+        self.assertEqual(client.get('/status').get_json()['queue_depth'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
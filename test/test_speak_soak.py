@@ -0,0 +1,111 @@
+"""VoiceManager.speak_stream() のメモリ使用量のソークテスト。
+
+合成・再生をスタブに置き換え、数千件の読み上げを行っても
+RSS が増え続けないことを確認する。aquestalk-server.exe は不要。
+"""
+from __future__ import annotations
+
+import gc
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.monitoring.memory_usage import current_rss_bytes, peak_rss_bytes
+from source.speak.speak_job import SpeakJob
+from source.voice.speaker.voice_generator import VoiceGenerator
+from source.voice.voice_manager import CHUNK_QUEUE_MAX_SIZE, VoiceManager
+
+SOAK_UTTERANCES = 3000
+WARMUP_UTTERANCES = 300
+# 16 kHz / 16bit / 1 秒相当の WAV サイズ
+CHUNK_BYTES = 32000
+ALLOWED_RSS_GROWTH_BYTES = 8 * 1024 * 1024
+TEXT = "今日もゆっくりしていってね。よろしくお願いします！"
+
+
+class _StubVoiceGenerator:
+    """文ごとに新しいバッファを返す合成スタブ。"""
+
+    def __init__(self) -> None:
+        self.produced = 0
+
+    def synthesize(self, sentence, job=None, token=None):
+        self.produced += 1
+        return bytearray(CHUNK_BYTES)
+
+    def analyze(self, audio_data, interval=0.1, sentence=None, speed=None):
+        return audio_data, [0.5] * 20, interval
+
+
+class _NullAudioPlayer:
+    def __init__(self, result: bool = True) -> None:
+        self._result = result
+        self.played = 0
+
+    def play(self, audio_bytes, job=None) -> bool:
+        self.played += 1
+        return self._result
+
+    def stop(self) -> bool:
+        return True
+
+
+class TestSpeakSoak(unittest.TestCase):
+    """長時間の読み上げでメモリが増えないことを確認する。"""
+
+    def _speak_many(self, manager: VoiceManager, count: int) -> None:
+        for _ in range(count):
+            manager.speak_stream(TEXT, SpeakJob(TEXT))
+            # forwarder の代わりに音量キューを消費する
+            while manager.dequeue_sound() is not None:
+                pass
+
+    @unittest.skipIf(current_rss_bytes() is None, 'RSS is not available')
+    def test_rss_stays_flat(self) -> None:
+        manager = VoiceManager(_StubVoiceGenerator(),  # type: ignore[arg-type]
+                               _NullAudioPlayer())  # type: ignore[arg-type]
+        self.addCleanup(manager.close)
+        self._speak_many(manager, WARMUP_UTTERANCES)
+        gc.collect()
+        baseline = current_rss_bytes()
+
+        self._speak_many(manager, SOAK_UTTERANCES)
+        gc.collect()
+        growth = current_rss_bytes() - baseline  # type: ignore[operator]
+        self.assertLess(growth, ALLOWED_RSS_GROWTH_BYTES,
+                        f'RSS grew by {growth} bytes')
+        self.assertIsNotNone(peak_rss_bytes())
+
+    def test_producer_does_not_outrun_player(self) -> None:
+        """合成の先行が各段のキューの上限までにとどまること。"""
+        generator = _StubVoiceGenerator()
+        release = threading.Event()
+        lead: list[int] = []
+
+        class _SlowPlayer(_NullAudioPlayer):
+            def play(self, audio_bytes, job=None) -> bool:
+                release.wait(0.05)
+                lead.append(generator.produced - self.played)
+                return super().play(audio_bytes, job)
+
+        manager = VoiceManager(generator,  # type: ignore[arg-type]
+                               _SlowPlayer())  # type: ignore[arg-type]
+        self.addCleanup(manager.close)
+        manager.speak_stream('あ。' * 10)
+        # 再生中 + 再生待ちキュー + 解析中 + 解析待ちキュー + 投入待ちの 1 文
+        self.assertLessEqual(max(lead), 2 * CHUNK_QUEUE_MAX_SIZE + 3)
+
+    def test_playback_failure_does_not_hang(self) -> None:
+        """再生失敗時も合成スレッドが詰まらずに例外が返ること。"""
+        manager = VoiceManager(_StubVoiceGenerator(),  # type: ignore[arg-type]
+                               _NullAudioPlayer(result=False))  # type: ignore[arg-type]
+        self.addCleanup(manager.close)
+        with self.assertRaises(RuntimeError):
+            manager.speak_stream('あ。' * 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""SpeechPipeline の段間の重なりと停止のテスト。"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.voice.speech_pipeline import SpeechPipeline, Utterance
+
+
+class _RecordingGenerator:
+    def __init__(self) -> None:
+        self.synthesized_at: dict[str, float] = {}
+
+    def synthesize(self, sentence, job=None, token=None):
+        self.synthesized_at[sentence] = time.monotonic()
+        return sentence.encode('utf-8')
+
+    def analyze(self, audio_data, interval=0.1, sentence=None, speed=None):
+        return audio_data, [0.5], interval
+
+
+class _BlockingPlayer:
+    """release されるまで再生を終えないプレイヤー。"""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.started: list[tuple[bytes, float]] = []
+
+    def play(self, audio_bytes, job=None) -> bool:
+        self.started.append((audio_bytes, time.monotonic()))
+        self.release.wait(2.0)
+        return True
+
+    def stop(self) -> bool:
+        self.release.set()
+        return True
+
+
+class TestSpeechPipeline(unittest.TestCase):
+    """常駐パイプラインの動作を確認する。"""
+
+    def setUp(self) -> None:
+        self._generator = _RecordingGenerator()
+        self._player = _BlockingPlayer()
+        self._pipeline = SpeechPipeline(
+            self._generator, self._player,  # type: ignore[arg-type]
+            preprocess=lambda text: text,
+            emit_sound=lambda *args: None,
+            queue_max_size=2, text_queue_max_size=2)
+        self.addCleanup(self._pipeline.shutdown)
+
+    def test_next_utterance_is_synthesized_during_playback(self) -> None:
+        """前の発話の再生中に次の発話の合成が済んでいること。"""
+        first = self._pipeline.submit('一つ目。')
+        second = self._pipeline.submit('二つ目。')
+        deadline = time.monotonic() + 2.0
+        while ('二つ目。' not in self._generator.synthesized_at
+               and time.monotonic() < deadline):
+            time.sleep(0.01)
+        self.assertIn('二つ目。', self._generator.synthesized_at)
+        self.assertFalse(first.is_done())
+
+        self._player.release.set()
+        self.assertEqual(first.wait(), 1)
+        self.assertEqual(second.wait(), 1)
+
+    def test_cancel_all_completes_pending_utterances(self) -> None:
+        """停止要求で未再生の発話が取り消され、完了が通知されること。"""
+        utterances = [self._pipeline.submit('あ。い。う。') for _ in range(2)]
+        time.sleep(0.05)
+        self._pipeline.cancel_all()
+        self._player.stop()
+        for utterance in utterances:
+            utterance.wait()
+            self.assertTrue(utterance.cancelled)
+        self.assertEqual(len(self._player.started), 1)
+
+    def test_cancelled_sentence_sends_no_mouth_event(self) -> None:
+        """取り消し後の文は口パクイベントも送らないこと。"""
+        emitted: list = []
+        pipeline = SpeechPipeline(
+            self._generator, self._player,  # type: ignore[arg-type]
+            preprocess=lambda text: text,
+            emit_sound=lambda *args: emitted.append(args),
+            queue_max_size=2, text_queue_max_size=2)
+        utterance = Utterance('あ。')
+        utterance.token.cancel()
+        self.assertFalse(pipeline._play(utterance, b'a', [0.5], 0.1))
+        self.assertEqual(emitted, [])
+        self.assertEqual(self._player.started, [])
+
+    def test_utterance_refused_before_playback_expires(self) -> None:
+        """前の発話の再生中に期限を過ぎた発話は、合成済みでも再生しないこと。"""
+        stages: list[str] = []
+
+        def _admit(stage: str) -> bool:
+            stages.append(stage)
+            return stage != 'play'
+
+        first = self._pipeline.submit('一つ目。')
+        second = self._pipeline.submit('二つ目。', admit=_admit)
+        self._player.release.set()
+        self.assertEqual(first.wait(), 1)
+        self.assertEqual(second.wait(), 0)
+        self.assertTrue(second.expired)
+        self.assertEqual(stages, ['preprocess', 'play'])
+        self.assertEqual([audio for audio, _ in self._player.started],
+                         ['一つ目。'.encode()])
+
+
+class _SlowGenerator(_RecordingGenerator):
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self._delay = delay
+
+    def synthesize(self, sentence, job=None, token=None):
+        time.sleep(self._delay)
+        return super().synthesize(sentence, job, token)
+
+
+class _RecordingPlayer:
+    def __init__(self) -> None:
+        self.played: list[bytes] = []
+
+    def play(self, audio_bytes, job=None) -> bool:
+        self.played.append(audio_bytes)
+        return True
+
+    def stop(self) -> bool:
+        return True
+
+
+class TestFiller(unittest.TestCase):
+    """最初の文の合成が遅いときだけ、つなぎの音声を先に再生することを確認する。"""
+
+    def _pipeline(self, synthesis_delay: float, filler_delay: float = 0.1
+                  ) -> tuple[SpeechPipeline, _RecordingPlayer, list]:
+        player = _RecordingPlayer()
+        emitted: list = []
+        pipeline = SpeechPipeline(
+            _SlowGenerator(synthesis_delay), player,  # type: ignore[arg-type]
+            preprocess=lambda text: text,
+            emit_sound=lambda utterance, *sound: emitted.append(sound),
+            queue_max_size=2, text_queue_max_size=2,
+            filler=lambda: (b'filler', [0.5, 0.2], 0.1),
+            filler_delay=filler_delay)
+        self.addCleanup(pipeline.shutdown)
+        return pipeline, player, emitted
+
+    def test_filler_precedes_slow_first_sentence(self) -> None:
+        pipeline, player, emitted = self._pipeline(0.4)
+        self.assertEqual(pipeline.submit('一つ目。二つ目。').wait(), 2)
+        self.assertEqual(player.played,
+                         [b'filler', '一つ目。'.encode(), '二つ目。'.encode()])
+        # つなぎの音声にも口パクを送る
+        self.assertEqual(emitted[0], (b'filler', [0.5, 0.2], 0.1))
+
+    def test_no_filler_when_synthesis_is_fast(self) -> None:
+        pipeline, player, _ = self._pipeline(0.0)
+        pipeline.submit('一つ目。').wait()
+        self.assertEqual(player.played, ['一つ目。'.encode()])
+
+    def test_zero_delay_disables_filler(self) -> None:
+        pipeline, player, _ = self._pipeline(0.2, filler_delay=0.0)
+        pipeline.submit('一つ目。').wait()
+        self.assertEqual(player.played, ['一つ目。'.encode()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""SpeechRateController による読み上げ待ちに応じた話速の調整のテスト。"""
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.settings.live_settings import LIVE_SETTINGS
+from source.speak.speech_rate import SpeechRateController
+
+
+class TestSpeechRateController(unittest.TestCase):
+    """倍率が上限・刻み幅の範囲で読み上げ待ちに追従することを確認する。"""
+
+    def _controller(self, **kwargs) -> SpeechRateController:
+        options = dict(enabled=True, backlog_low=10.0, backlog_high=30.0,
+                       max_ratio=1.5, step=0.1)
+        options.update(kwargs)
+        return SpeechRateController(**options)
+
+    def test_short_backlog_keeps_configured_speed(self) -> None:
+        controller = self._controller()
+        self.assertEqual(controller.update(5.0),
+                         LIVE_SETTINGS.current.voice_speed)
+
+    def test_ratio_rises_by_step_up_to_max(self) -> None:
+        controller = self._controller()
+        controller.update(100.0)
+        self.assertAlmostEqual(controller.ratio, 1.1)
+        for _ in range(10):
+            controller.update(100.0)
+        self.assertAlmostEqual(controller.ratio, 1.5)
+        self.assertAlmostEqual(controller.speed(),
+                               LIVE_SETTINGS.current.voice_speed * 1.5)
+
+    def test_backlog_is_compared_at_configured_speed(self) -> None:
+        """速くした分で短く見える残り時間では倍率を下げないこと。"""
+        controller = self._controller(step=1.0)
+        controller.update(20.0)
+        self.assertAlmostEqual(controller.ratio, 1.25)
+        # 基準の話速では 20 秒分の残り
+        controller.update(20.0 / 1.25)
+        self.assertAlmostEqual(controller.ratio, 1.25)
+
+    def test_ratio_returns_to_one_when_queue_drains(self) -> None:
+        controller = self._controller(step=0.5)
+        controller.update(100.0)
+        controller.update(0.0)
+        controller.update(0.0)
+        self.assertEqual(controller.ratio, 1.0)
+
+    def test_disabled_controller_keeps_ratio(self) -> None:
+        controller = self._controller(enabled=False)
+        controller.update(100.0)
+        self.assertEqual(controller.ratio, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""TrafficRecorder による記録と replay_traffic による再生のテスト。"""
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmark.fake_aquestalk_server import FakeAquesTalkServer
+from benchmark.load_generator import load_replay_log
+from benchmark.replay_traffic import load_trace, replay
+from source.live_yukkuri_runner import LiveYukkuriRunner
+from source.monitoring.traffic_recorder import TrafficRecorder
+from source.speak.speak_job import SpeakJob
+from source.voice.speech_pipeline import Utterance
+
+
+class _RecordingVoiceManager:
+    def speak_async(self, text: str, job: SpeakJob | None = None,
+                    admit=None) -> Utterance:
+        utterance = Utterance(text, job, admit=admit)
+        utterance.complete()
+        return utterance
+
+    def set_voice_output_stop_flag(self, flag: bool) -> None:
+        pass
+
+    def pipeline_queue_size(self) -> int:
+        return 0
+
+    def sound_queue_size(self) -> int:
+        return 0
+
+    def dequeue_sound(self) -> dict | None:
+        return None
+
+
+class TestTrafficRecorder(unittest.TestCase):
+    """受け付けた要求が再生可能な形式で記録されることを確認する。"""
+
+    def test_runner_records_speak_and_stop(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'traffic.jsonl'
+            recorder = TrafficRecorder(path)
+            runner = LiveYukkuriRunner(voice_manager=_RecordingVoiceManager(),
+                                       traffic_recorder=recorder)
+            client = runner.outbound_app.test_client()
+            client.post('/speak', json={'text': 'こんにちは', 'ttl': 5})
+            client.post('/speak', json={'text': ''})
+            client.post('/voice_output_stop_flag',
+                        json={'voice_output_stop_flag': True})
+            recorder.close()
+
+            self.assertEqual([(op, text) for _, op, text
+                              in load_replay_log(path)],
+                             [('speak', 'こんにちは'), ('stop', '')])
+            trace = load_trace(path)
+        self.assertEqual(trace[0]['ttl'], 5)
+        self.assertLessEqual(trace[0]['t'], trace[1]['t'])
+
+
+class TestReplayTraffic(unittest.TestCase):
+    """記録を偽サーバーのランナーへ再生し、レイテンシが集計されることを確認する。"""
+
+    def test_replay_reports_latency(self) -> None:
+        trace = [
+            {'t': 0.0, 'op': 'speak', 'text': 'こんにちは。'},
+            {'t': 0.1, 'op': 'speak', 'text': '草'},
+            {'t': 0.2, 'op': 'speak', 'text': 'また明日ね！'},
+        ]
+        with FakeAquesTalkServer(latency=0.01) as server:
+            report = replay(trace, server.url, speed=20.0, drain_timeout=10.0)
+        self.assertTrue(report['drained'])
+        self.assertEqual(report['accepted'], 3)
+        self.assertEqual(report['job_states'], {'done': 3})
+        self.assertEqual(report['time_to_first_audio_seconds']['count'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
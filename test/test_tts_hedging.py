@@ -0,0 +1,106 @@
+"""合成リクエストのヘッジと全体の期限のテスト。"""
+from __future__ import annotations
+
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmark.fake_aquestalk_server import FakeAquesTalkServer
+from source.monitoring.metrics import (
+    TTS_DEADLINE_EXCEEDED_TOTAL,
+    TTS_HEDGE_WINS_TOTAL,
+    TTS_HEDGED_TOTAL,
+)
+from source.voice.speaker import aquestalk_generator
+from source.voice.speaker.aquestalk_generator import AquesTalkGenerator
+
+SLOW_LATENCY = 1.0
+HEDGE_DELAY = 0.2
+
+
+class TestTtsHedging(unittest.TestCase):
+    """遅い応答を待たずに 2 本目のリクエストの応答を使うことを確認する。"""
+
+    def _generator(self, server: FakeAquesTalkServer,
+                   standby: FakeAquesTalkServer | None = None
+                   ) -> AquesTalkGenerator:
+        generator = AquesTalkGenerator(
+            server.url, launch_server=False,
+            standby_url=standby.url if standby is not None else None)
+        generator.wait_until_ready()
+        self.addCleanup(generator.close)
+        return generator
+
+    def _patch(self, **settings) -> None:
+        for name, value in settings.items():
+            patch = mock.patch.object(aquestalk_generator, name, value)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _hedge_settings(self) -> None:
+        self._patch(AQUESTALK_HEDGE_ENABLED=True,
+                    AQUESTALK_HEDGE_INITIAL_DELAY=HEDGE_DELAY,
+                    AQUESTALK_HEDGE_MIN_SAMPLES=10 ** 9)
+
+    def test_hedge_answers_slow_request(self) -> None:
+        self._hedge_settings()
+        server = FakeAquesTalkServer(latency=SLOW_LATENCY).start()
+        self.addCleanup(server.stop)
+        standby = FakeAquesTalkServer().start()
+        self.addCleanup(standby.stop)
+        generator = self._generator(server, standby)
+        hedged_before = TTS_HEDGED_TOTAL.value()
+        wins_before = TTS_HEDGE_WINS_TOTAL.value()
+
+        started = time.monotonic()
+        audio = generator.generate_audio('こんにちは')
+        elapsed = time.monotonic() - started
+        self.assertGreater(len(audio), 44)
+        self.assertGreaterEqual(elapsed, HEDGE_DELAY)
+        self.assertLess(elapsed, SLOW_LATENCY * 0.8)
+        self.assertEqual(TTS_HEDGED_TOTAL.value(), hedged_before + 1)
+        self.assertEqual(TTS_HEDGE_WINS_TOTAL.value(), wins_before + 1)
+        # ヘッジは待機系へ送り、遅い稼働系へは重ねない
+        self.assertEqual(server.request_count, 1)
+        self.assertEqual(standby.request_count, 1)
+        # 負けた側の接続は切断済みで、リクエスト用のスレッドを占有しない
+        started = time.monotonic()
+        generator.close()
+        self.assertLess(time.monotonic() - started, SLOW_LATENCY / 2)
+
+    def test_no_hedge_without_standby(self) -> None:
+        self._hedge_settings()
+        server = FakeAquesTalkServer(latency=SLOW_LATENCY / 2).start()
+        self.addCleanup(server.stop)
+        generator = self._generator(server)
+        hedged_before = TTS_HEDGED_TOTAL.value()
+
+        generator.generate_audio('こんにちは')
+        self.assertEqual(TTS_HEDGED_TOTAL.value(), hedged_before)
+        self.assertEqual(server.request_count, 1)
+
+    def test_deadline_raises_timeout(self) -> None:
+        self._patch(AQUESTALK_HEDGE_ENABLED=False,
+                    AQUESTALK_REQUEST_DEADLINE=0.2)
+        server = FakeAquesTalkServer(latency=SLOW_LATENCY).start()
+        self.addCleanup(server.stop)
+        generator = self._generator(server)
+        exceeded_before = TTS_DEADLINE_EXCEEDED_TOTAL.value()
+
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            generator.generate_audio('こんにちは')
+        self.assertLess(time.monotonic() - started, SLOW_LATENCY / 2)
+        self.assertEqual(TTS_DEADLINE_EXCEEDED_TOTAL.value(),
+                         exceeded_before + 1)
+        started = time.monotonic()
+        generator.close()
+        self.assertLess(time.monotonic() - started, SLOW_LATENCY / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
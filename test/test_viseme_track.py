@@ -0,0 +1,93 @@
+"""viseme_track による口の段階の平滑化・量子化・ランレングス化のテスト。"""
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.voice.speaker.viseme_track import (
+    MOUTH_LEVELS,
+    quantize_levels,
+    run_length_encode,
+    smooth_envelope,
+    viseme_track,
+)
+
+
+def _smooth_reference(values, sample_time, attack, release):
+    """サンプルごとのループによる一次遅れ（ベクトル化前の実装）。"""
+    attack_gain = 1.0 - np.exp(-sample_time / attack)
+    release_gain = 1.0 - np.exp(-sample_time / release)
+    level = 0.0
+    envelope = []
+    for value in values:
+        gain = attack_gain if value > level else release_gain
+        level += gain * (value - level)
+        envelope.append(level)
+    return envelope
+
+
+def _quantize_reference(envelope, hysteresis):
+    """サンプルごとのループによるヒステリシス付きの量子化。"""
+    levels = []
+    for value in envelope:
+        position = min(max(value * MOUTH_LEVELS, 0.0), MOUTH_LEVELS)
+        candidate = min(int(position), MOUTH_LEVELS - 1)
+        if levels and (levels[-1] - hysteresis <= position
+                       < levels[-1] + 1 + hysteresis):
+            candidate = levels[-1]
+        levels.append(candidate)
+    return levels
+
+
+class TestVisemeTrack(unittest.TestCase):
+    """口の段階の列が滑らかで、変化点だけが残ることを確認する。"""
+
+    def test_release_is_slower_than_attack(self) -> None:
+        envelope = smooth_envelope([1.0, 0.0], 0.1, attack=0.01, release=0.1)
+        self.assertGreater(envelope[0], 0.99)
+        self.assertGreater(envelope[1], 0.3)
+
+    def test_hysteresis_suppresses_flicker_at_boundary(self) -> None:
+        """段階の境界をまたいで揺れる値で段階が切り替わり続けないこと。"""
+        boundary = 1.0 / MOUTH_LEVELS
+        envelope = np.array([boundary - 0.01, boundary + 0.01] * 5)
+        self.assertEqual(len(set(quantize_levels(envelope, 0.0).tolist())), 2)
+        self.assertEqual(set(quantize_levels(envelope, 0.3).tolist()), {0})
+
+    def test_large_change_switches_level(self) -> None:
+        levels = quantize_levels(np.array([0.0, 0.9, 0.9, 0.0]), 0.3)
+        self.assertEqual(levels.tolist(), [0, 5, 5, 0])
+
+    def test_run_length_encode(self) -> None:
+        self.assertEqual(run_length_encode(np.array([0, 0, 3, 3, 3, 0])),
+                         [[0, 2], [3, 3], [0, 1]])
+        self.assertEqual(run_length_encode(np.array([], dtype=np.int64)), [])
+
+    def test_matches_per_sample_loop(self) -> None:
+        """ベクトル化した計算がサンプルごとのループと同じ結果になること。"""
+        rng = np.random.default_rng(0)
+        # 長い区間でブロックの境目と窓の拡大も通るよう、話し声と無音を混ぜる
+        values = np.concatenate([rng.random(500) * 1.2, np.zeros(2000),
+                                 np.full(300, 0.7), rng.random(50)])
+        for attack, release in ((0.02, 0.08), (0.001, 0.5), (0.05, 0.05)):
+            envelope = smooth_envelope(values, 0.05, attack, release)
+            np.testing.assert_allclose(
+                envelope, _smooth_reference(values, 0.05, attack, release),
+                rtol=1e-9, atol=1e-12)
+            self.assertEqual(quantize_levels(envelope, 0.3).tolist(),
+                             _quantize_reference(envelope, 0.3))
+
+    def test_track_covers_every_sample(self) -> None:
+        values = [0.0, 0.4, 0.8, 1.2, 0.5, 0.1, 0.0]
+        track = viseme_track(values, 0.1)
+        self.assertEqual(sum(count for _, count in track), len(values))
+        self.assertTrue(all(0 <= level < MOUTH_LEVELS for level, _ in track))
+
+
+if __name__ == '__main__':
+    unittest.main()
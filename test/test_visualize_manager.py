@@ -0,0 +1,65 @@
+"""VisualizeManager の SSE キュー配信のテスト。"""
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from source.visualizer.visualize_manager import VisualizeManager
+
+BASE_DIRECTORY = str(Path(__file__).resolve().parents[1])
+
+
+class TestVisualizeManager(unittest.TestCase):
+    """複数クライアントへの口パクイベント配信を確認する。"""
+
+    def setUp(self) -> None:
+        self._vm = VisualizeManager(BASE_DIRECTORY)
+
+    def test_every_subscriber_receives_event(self) -> None:
+        """接続中のすべてのクライアントが同じイベントを受け取ること。"""
+        browser = self._vm.subscribe_visualizer_sound()
+        monitor = self._vm.subscribe_visualizer_sound()
+        self._vm.enqueue_visualizer_sound({'sound_values': [0.5]})
+        for sound_queue in (browser, monitor):
+            data = self._vm.wait_and_dequeue_visualizer_sound(0.1, sound_queue)
+            self.assertEqual(data, {'sound_values': [0.5]})
+
+    def test_stop_flag_replaces_pending_events(self) -> None:
+        """停止要求で未送信イベントが破棄され、stop 制御イベントが届くこと。"""
+        sound_queue = self._vm.subscribe_visualizer_sound()
+        self._vm.enqueue_visualizer_sound({'sound_values': [0.5]})
+        self._vm.set_voice_output_stop_flag(True)
+        data = self._vm.wait_and_dequeue_visualizer_sound(0.1, sound_queue)
+        self.assertEqual(data, {'control': 'stop'})
+        self.assertIsNone(
+            self._vm.wait_and_dequeue_visualizer_sound(0.01, sound_queue))
+
+    def test_resume_is_sent_only_after_stop(self) -> None:
+        """停止していなければ再開要求で何も送らず、未送信イベントも残ること。"""
+        sound_queue = self._vm.subscribe_visualizer_sound()
+        self._vm.enqueue_visualizer_sound({'sound_values': [0.5]})
+        self._vm.set_voice_output_stop_flag(False)
+        self.assertEqual(list(sound_queue), [{'sound_values': [0.5]}])
+
+        self._vm.set_voice_output_stop_flag(True)
+        self._vm.enqueue_visualizer_sound({'sound_values': [0.25]})
+        self._vm.set_voice_output_stop_flag(False)
+        self._vm.set_voice_output_stop_flag(False)
+        self.assertEqual(list(sound_queue),
+                         [{'control': 'stop'}, {'sound_values': [0.25]},
+                          {'control': 'resume'}])
+
+    def test_unsubscribed_queue_no_longer_receives(self) -> None:
+        """購読解除したキューにはイベントが届かないこと。"""
+        sound_queue = self._vm.subscribe_visualizer_sound()
+        self._vm.unsubscribe_visualizer_sound(sound_queue)
+        self._vm.enqueue_visualizer_sound({'sound_values': [0.5]})
+        self.assertEqual(len(sound_queue), 0)
+        self.assertEqual(self._vm.visualizer_client_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
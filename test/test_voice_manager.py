@@ -13,6 +13,7 @@ from __future__ import annotations
 
 import sys
 import unittest
+from array import array
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
@@ -20,6 +21,7 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 from source.voice.voice_manager import VoiceManager
 
 from configuration.person_settings import (
+    VISEME_TRACK_ENABLED,
     VOICE_SCALE_FACTOR
 )
 
@@ -46,7 +48,7 @@ class TestVoiceManager(unittest.TestCase):
     def test_speak_returns_sample_count(self) -> None:
         """speak() が長さ > 0 の sound_values を返すこと。"""
         _, sound_values, _ = self._vm.speak("こんにちは")
-        self.assertIsInstance(sound_values, list)
+        self.assertIsInstance(sound_values, array)
         self.assertGreater(len(sound_values), 0, "sound_values が空です")
 
     def test_speak_returns_sample_time(self) -> None:
@@ -74,7 +76,10 @@ class TestVoiceManager(unittest.TestCase):
 
         data = self._vm.dequeue_sound()
         self.assertIsNotNone(data, "dequeue_sound() が None を返しました")
-        sound_values = data.get("sound_values", [])  # type: ignore[union-attr]
+        if VISEME_TRACK_ENABLED:
+            mouth_levels = data.mouth_levels or []  # type: ignore[union-attr]
+            self.assertGreater(len(mouth_levels), 0, "mouth_levels が空です")
+        sound_values = data.sound_values or []  # type: ignore[union-attr]
         self.assertGreater(len(sound_values), 0, "sound_values が空です")
 
     def test_dequeue_empty_returns_none(self) -> None: